@@ -1,24 +1,60 @@
 # app/api/auth.py
+import io
+import os
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, status, Body
+from fastapi import APIRouter, Depends, Security, status, Body, File, Path, Query, UploadFile
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.errors import BadRequestError, UnauthorizedError, ConflictError
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.errors import BadRequestError, UnauthorizedError, ConflictError, NotFoundError
+from app.core.security import password_hasher, create_access_token, oauth2_scheme
+from app.core.provisioning import provision_users, read_user_records
+from app.core.cache import invalidate_token_cache, revoke_token, set_username
+from app.core.tracing import TracedRoute
+from app.api.dependencies import get_current_user, require_admin
 from app.config import settings
 from app.db.session import get_db
 from app.models.user import User
 from app.models.game import Leaderboard
-from app.schemas.auth import UserCreate, UserResponse, Token
-from app.schemas.base import ResponseBase
+from app.schemas.auth import UserCreate, UserResponse, Token, ProvisioningResult
+from app.schemas.base import MessageResponse, ResponseBase
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TracedRoute)
+
+# signup and login are async so they can await the password hasher; their
+# blocking SQLAlchemy calls go through these helpers on the thread pool
+
+def _get_user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(User.username == username).first()
+
+def _create_user(db: Session, username: str, hashed_password: str) -> User:
+    user = User(
+        username=username,
+        hashed_password=hashed_password
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def _update_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+def _deactivate_user(db: Session, user_id: int) -> bool:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return False
+    user.is_active = False
+    db.commit()
+    return True
 
 @router.post("/signup", response_model=ResponseBase[UserResponse], status_code=status.HTTP_201_CREATED)
-def signup(
+async def signup(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate = Body(...)
@@ -34,27 +70,26 @@ def signup(
         ResponseBase with user data
     """
     # Check if username already exists
-    if db.query(User).filter(User.username == user_in.username).first():
+    if await run_in_threadpool(_get_user_by_username, db, user_in.username):
         raise ConflictError(detail="Username already registered")
     
+    # Hash on the dedicated worker pool so bcrypt does not block this worker
+    hashed_password = await password_hasher.hash(user_in.password)
+    
     # Create new user
-    user = User(
-        username=user_in.username,
-        hashed_password=get_password_hash(user_in.password)
-    )
+    user = await run_in_threadpool(_create_user, db, user_in.username, hashed_password)
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Leaderboard responses resolve usernames from this cache
+    set_username(user.id, user.username)
     
     return ResponseBase[UserResponse](
         success=True,
         message="User created successfully",
-        data=UserResponse.model_validate(user)
+        data=UserResponse.model_validate(user, from_attributes=True)
     )
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -69,16 +104,122 @@ def login(
         JWT token
     """
     # Get user by username
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    
+    if not user:
+        raise UnauthorizedError(detail="Incorrect username or password")
     
-    # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Verify password on the worker pool
+    verified, new_hash = await password_hasher.verify_and_update(
+        form_data.password, user.hashed_password
+    )
+    if not verified:
         raise UnauthorizedError(detail="Incorrect username or password")
     
+    # Rehash if the bcrypt cost factor has changed since this hash was created
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+        # Cached tokens hold the user with the old hash
+        invalidate_token_cache(user.id)
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         subject=user.id, expires_delta=access_token_expires
     )
     
-    return Token(access_token=access_token)
\ No newline at end of file
+    return Token(access_token=access_token)
+
+@router.post("/logout", response_model=ResponseBase[MessageResponse])
+async def logout(
+    token: str = Security(oauth2_scheme),
+    _: User = Depends(get_current_user)
+) -> Any:
+    """
+    Revoke the bearer token until it expires.
+    Revocations are held in this worker's memory, like the token cache.
+    
+    Args:
+        token: JWT token from authorization header
+        
+    Returns:
+        ResponseBase with a confirmation message
+    """
+    # get_current_user has verified the signature
+    revoke_token(token, jwt.get_unverified_claims(token).get("exp"))
+    
+    return ResponseBase[MessageResponse](
+        success=True,
+        message="Logged out",
+        data=MessageResponse(message="Token revoked")
+    )
+
+@router.post("/users/{user_id}/deactivate", response_model=ResponseBase[MessageResponse])
+def deactivate_user(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int = Path(..., description="User to deactivate"),
+    _: bool = Depends(require_admin)
+) -> Any:
+    """
+    Deactivate a user (admin only). Their cached tokens are dropped, so
+    the next request with any of them is rejected as inactive.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user to deactivate
+        
+    Returns:
+        ResponseBase with a confirmation message
+    """
+    if not _deactivate_user(db, user_id):
+        raise NotFoundError(detail="User not found")
+    invalidate_token_cache(user_id)
+    
+    return ResponseBase[MessageResponse](
+        success=True,
+        message="User deactivated",
+        data=MessageResponse(message=f"User {user_id} deactivated")
+    )
+
+@router.post("/provision", response_model=ResponseBase[ProvisioningResult])
+def provision(
+    *,
+    db: Session = Depends(get_db),
+    file: UploadFile = File(..., description="NDJSON or CSV file of users"),
+    batch_size: int = Query(5000, ge=1, le=50000, description="Users inserted per transaction"),
+    workers: Optional[int] = Query(None, ge=1, le=os.cpu_count() or 1, description="Password hashing processes (at most one per CPU)"),
+    _: bool = Depends(require_admin)
+) -> Any:
+    """
+    Bulk-create users from an uploaded file (admin only).
+    Passwords are hashed in parallel across processes and users are inserted
+    with their initial leaderboard rows in batches; existing usernames are skipped.
+    The new players are ranked once the last batch is in.
+    
+    Args:
+        db: Database session
+        file: Uploaded NDJSON or CSV file
+        batch_size: Number of users inserted per transaction
+        workers: Number of hashing processes
+        
+    Returns:
+        ResponseBase with provisioning stats
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8")
+    
+    try:
+        stats = provision_users(
+            db,
+            read_user_records(lines),
+            batch_size=batch_size,
+            workers=workers
+        )
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    
+    return ResponseBase[ProvisioningResult](
+        success=True,
+        message="Users provisioned successfully",
+        data=ProvisioningResult(**stats.as_dict())
+    )
\ No newline at end of file
@@ -1,15 +1,17 @@
 # app/api/dependencies.py
+import hmac
 from typing import Optional
 from jose import jwt, JWTError
-from fastapi import Depends, Security
+from fastapi import Depends, Security, Header
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
 
 from app.db.session import get_db
-from app.core.errors import UnauthorizedError, NotFoundError
+from app.core.errors import UnauthorizedError, NotFoundError, ForbiddenError
 from app.models.user import User
 from app.schemas.auth import TokenPayload
 from app.core.security import oauth2_scheme
+from app.core.cache import get_cached_token_user, cache_token_user, is_token_revoked
 from app.config import settings
 
 async def get_current_user(
@@ -18,6 +20,9 @@ async def get_current_user(
 ) -> User:
     """
     Get the current authenticated user.
+    Verified tokens are cached with the resolved user until the token's
+    exp (or TOKEN_CACHE_TTL), so steady-state requests skip both the
+    signature check and the users lookup.
     
     Args:
         db: Database session
@@ -29,6 +34,14 @@ async def get_current_user(
     Raises:
         UnauthorizedError: If token is invalid or user not found
     """
+    # Cache hit: token already verified and user already resolved
+    cached_user = get_cached_token_user(token)
+    if cached_user is not None:
+        return cached_user
+    
+    if is_token_revoked(token):
+        raise UnauthorizedError()
+    
     try:
         payload = jwt.decode(
             token, 
@@ -48,6 +61,10 @@ async def get_current_user(
         raise NotFoundError(detail="User not found")
     if not user.is_active:
         raise UnauthorizedError(detail="Inactive user")
+    
+    # Detach the user so it can be shared by later requests with this token
+    db.expunge(user)
+    cache_token_user(token, user, payload.get("exp"))
         
     return user
 
@@ -68,4 +85,25 @@ async def get_current_active_user(
     """
     # if not current_user.is_active:
     #     raise UnauthorizedError(detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def require_admin(
+    x_admin_key: Optional[str] = Header(None)
+) -> bool:
+    """
+    Guard for admin-only endpoints.
+    
+    Args:
+        x_admin_key: Value of the X-Admin-Key header
+        
+    Returns:
+        True if the key matches ADMIN_API_KEY
+        
+    Raises:
+        ForbiddenError: If admin access is disabled or the key is wrong
+    """
+    if not settings.ADMIN_API_KEY:
+        raise ForbiddenError(detail="Admin API is disabled")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise ForbiddenError()
+    return True
\ No newline at end of file
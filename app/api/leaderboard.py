@@ -1,59 +1,301 @@
 # app/api/leaderboard.py
-from typing import Any, List
-from fastapi import APIRouter, Depends, Path, Query, BackgroundTasks
+from typing import Any, List, Optional, Literal
+from fastapi import APIRouter, Depends, Header, Path, Query, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, desc
+from sqlalchemy import and_, text, func, desc
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db.session import get_db
+from app.config import settings
+from app.db.session import get_db, get_read_db, replica_router, leaderboard_shards
+from app.db.writer import single_writer
 from app.core.errors import NotFoundError, BadRequestError
 from app.models.user import User
-from app.models.game import GameSession, Leaderboard
-from app.schemas.leaderboard import ScoreSubmit, LeaderboardResponse, LeaderboardEntry, PlayerRank
+from app.models.game import GameSession, Leaderboard, ModeLeaderboard, Season, WindowLeaderboard
+from app.schemas.leaderboard import (
+    ScoreSubmit, LeaderboardResponse, PlayerRank, RankBatchRequest, RankBatchResponse, SeasonInfo
+)
 from app.schemas.base import MessageResponse, ResponseBase
-from app.api.dependencies import get_current_active_user
+from app.api.dependencies import get_current_active_user, require_admin
 from app.core.cache import (
     cached_leaderboard, cached_player_rank, 
-    invalidate_leaderboard_cache, invalidate_player_rank_cache
+    invalidate_leaderboard_cache, invalidate_player_rank_cache,
+    get_usernames, player_rank_cache
+)
+from app.core.metrics import rank_update_duration, rank_updates
+from app.core.query_stats import detach_query_stats
+from app.core.tracing import TracedRoute, current_span, span, tracer
+from app.core.ranking import LeaderboardReranker
+from app.core.sharding import (
+    add_shard_score, season_total, set_shard_score, sharded_page, sharded_player_entries, sharded_player_entry
+)
+from app.core.seasons import (
+    rollover_season, get_archived_season, season_page, season_player_entry
 )
+from app.core.windows import add_window_scores, rotate_windows, period_start
 from app.core.rate_limiter import submit_score_limiter, get_player_rank_limiter, get_leaderboard_limiter
+from app.core.export import MEDIA_TYPES, accepts_gzip, export_chunks
 
 import time
-router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"], route_class=TracedRoute)
+
+def _leaderboard_page(db: Session, game_mode: Optional[str], window: str, offset: int, limit: int):
+    """
+    Return (total_entries, rows) for one page of the selected leaderboard.
+    Rows have rank, total_score and user_id, ordered by rank.
+    """
+    if window != "all":
+        # Windowed boards rank on read; the (period, period_start, total_score)
+        # index serves the ordered scan for the current period
+        start = period_start(window)
+        filters = (WindowLeaderboard.period == window, WindowLeaderboard.period_start == start)
+        total_entries = db.query(func.count(WindowLeaderboard.id)).filter(*filters).scalar()
+        rows = db.query(
+            func.rank().over(order_by=WindowLeaderboard.total_score.desc()).label('rank'),
+            WindowLeaderboard.total_score.label('total_score'),
+            WindowLeaderboard.user_id.label('user_id')
+        ).filter(*filters).order_by(
+            WindowLeaderboard.total_score.desc(), WindowLeaderboard.user_id
+        ).offset(offset).limit(limit).all()
+        return total_entries, rows
+    
+    board = ModeLeaderboard if game_mode else Leaderboard
+    filters = (ModeLeaderboard.game_mode == game_mode,) if game_mode else ()
+    
+    # Rows added since the last re-rank have no rank yet and are left out
+    # of both the count and the pages
+    filters += (board.rank.isnot(None),)
+    
+    # Use count query optimization for total entries
+    total_entries = db.query(func.count(board.id)).filter(*filters).scalar()
+    
+    # Read only the leaderboard table; usernames come from the
+    # in-process username cache instead of a join on users
+    rows = db.query(
+        board.rank.label('rank'),
+        board.total_score.label('total_score'),
+        board.user_id.label('user_id')
+    ).filter(*filters).order_by(
+        board.rank
+    ).offset(offset).limit(limit).all()
+    return total_entries, rows
 
-async def update_leaderboard_ranks_background(db: Session):
+def _leaderboard_json(total_entries: int, entries, usernames: dict) -> ORJSONResponse:
+    """
+    Render a LeaderboardResponse body straight from (rank, total_score,
+    user_id) rows with orjson. Building a pydantic object per row only for
+    FastAPI to validate it again against response_model cost more than the
+    queries on a cache miss; the response_model stays on the route for the
+    OpenAPI schema. Rows without a known user are left out.
+    """
+    return ORJSONResponse({
+        "total_entries": total_entries,
+        "leaderboard": [
+            {
+                "rank": entry.rank,
+                "user_id": entry.user_id,
+                "username": usernames[entry.user_id],
+                "total_score": entry.total_score
+            } for entry in entries if entry.user_id in usernames
+        ]
+    })
+
+def _player_entry(db: Session, user_id: int, game_mode: Optional[str], window: str):
+    """Return the user's (rank, total_score) row on the selected leaderboard, or None"""
+    if window != "all":
+        start = period_start(window)
+        filters = (WindowLeaderboard.period == window, WindowLeaderboard.period_start == start)
+        total_score = db.query(WindowLeaderboard.total_score).filter(
+            *filters, WindowLeaderboard.user_id == user_id
+        ).scalar()
+        if total_score is None:
+            return None
+        # Rank is one more than the number of players ahead in this period
+        ahead = db.query(func.count(WindowLeaderboard.id)).filter(
+            *filters, WindowLeaderboard.total_score > total_score
+        ).scalar()
+        return ahead + 1, total_score
+    
+    board = ModeLeaderboard if game_mode else Leaderboard
+    filters = (ModeLeaderboard.game_mode == game_mode,) if game_mode else ()
+    
+    # Read only the leaderboard table; the username comes from the cache
+    entry = db.query(
+        board.rank.label('rank'),
+        board.total_score.label('total_score')
+    ).filter(
+        board.user_id == user_id, *filters
+    ).first()
+    # A player added since the last re-rank is not ranked yet
+    return (entry.rank, entry.total_score) if entry and entry.rank is not None else None
+
+def _player_entries(db: Session, user_ids: List[int], game_mode: Optional[str]):
+    """
+    Return {user_id: (username, rank, total_score)} for every existing user
+    among user_ids in one query; rank and total_score are None for a user
+    not ranked on the selected leaderboard.
+    """
+    board = ModeLeaderboard if game_mode else Leaderboard
+    on = (board.user_id == User.id,) + ((ModeLeaderboard.game_mode == game_mode,) if game_mode else ())
+    rows = db.query(
+        User.id, User.username, board.rank, board.total_score
+    ).outerjoin(board, and_(*on)).filter(User.id.in_(user_ids)).all()
+    return {user_id: (username, rank, total_score) for user_id, username, rank, total_score in rows}
+
+def _rank_result(user_id: int, status: str, username=None, rank=None, total_score=None) -> dict:
+    """One RankBatchEntry, with every field present"""
+    return {"user_id": user_id, "status": status, "username": username, "rank": rank, "total_score": total_score}
+
+def _rerank_mode(db: Session, game_mode: Optional[str] = None):
+    """Rotate day/week periods and re-rank one mode's leaderboard if given"""
+    # Drop day/week periods that fell out of retention (once per period)
+    rotate_windows(db)
+    
+    if game_mode is None:
+        return
+    
+    if db.get_bind().dialect.name == "postgresql":
+        # Obtain an advisory lock to prevent concurrent rank updates across
+        # workers; on SQLite the single writer already serializes them
+        with span("lock.advisory"):
+            db.execute(text("SELECT pg_advisory_xact_lock(42)"))
+    
+    # Re-rank only the mode that received the score, writing changed rows only
+    db.execute(text("""
+        UPDATE mode_leaderboard
+        SET rank = ranks.rank
+        FROM (
+            SELECT 
+                id, 
+                RANK() OVER (ORDER BY total_score DESC) as rank
+            FROM mode_leaderboard
+            WHERE game_mode = :game_mode
+        ) ranks
+        WHERE mode_leaderboard.id = ranks.id
+          AND (mode_leaderboard.rank IS NULL OR mode_leaderboard.rank <> ranks.rank)
+    """), {"game_mode": game_mode})
+    db.commit()
+
+async def update_leaderboard_ranks_background(db: Session, game_mode: Optional[str] = None):
     """
     Update ALL ranks in the leaderboard based on total scores.
     This runs as a background task to avoid blocking the API response.
+    Each chunk is a separate write, so submits queued on the single
+    writer are not held up for the whole pass.
     
     Args:
         db: Database session
+        game_mode: Also re-rank this mode's leaderboard
+    """
+    # The re-rank is not part of the submit request's query budget
+    detach_query_stats()
+    
+    # Traced on its own, linked to the submit request that scheduled it
+    with tracer.start_trace("rank_update", links=[current_span()], game_mode=game_mode):
+        start_time = time.perf_counter()
+        try:
+            # A sharded global leaderboard is ranked on read, so only the
+            # primary's copy is re-ranked here
+            reranker = LeaderboardReranker(settings.RERANK_CHUNK_SIZE)
+            while not leaderboard_shards and await single_writer.run(db, reranker.step):
+                pass
+            
+            await single_writer.run(db, _rerank_mode, game_mode)
+            
+            if settings.DEBUG:
+                print(f"Leaderboard re-rank: {reranker.stats.as_dict()}")
+            
+            # Invalidate caches after ranks update
+            invalidate_leaderboard_cache()
+            rank_updates.inc("ok")
+            
+        except SQLAlchemyError as e:
+            db.rollback()
+            rank_updates.inc("error")
+            print(f"Error updating leaderboard ranks: {str(e)}")
+        finally:
+            rank_update_duration.observe(time.perf_counter() - start_time)
+
+async def reconcile_shard_score_background(db: Session, user_id: int):
     """
+    Rebuild a user's total on its shard from the primary's game sessions,
+    after the shard write of a committed score failed.
+    
+    Args:
+        db: Database session (the primary)
+        user_id: User whose shard total is rebuilt
+    """
+    detach_query_stats()
+    
+    shard_db = leaderboard_shards.session_for(user_id)
     try:
-        # First, obtain an advisory lock to prevent concurrent rank updates
-        db.execute(text("SELECT pg_advisory_xact_lock(42)"))
-        
-        # Update all ranks using window function in raw SQL
-        db.execute(text("""
-            UPDATE leaderboard
-            SET rank = ranks.rank
-            FROM (
-                SELECT 
-                    user_id, 
-                    RANK() OVER (ORDER BY total_score DESC) as rank
-                FROM leaderboard
-            ) ranks
-            WHERE leaderboard.user_id = ranks.user_id
-        """))
-        
-        db.commit()
-        
-        # Invalidate caches after ranks update
+        total_score = season_total(db, user_id)
+        await single_writer.run(shard_db, set_shard_score, user_id, total_score)
         invalidate_leaderboard_cache()
-        
+        invalidate_player_rank_cache(user_id)
+        print(f"Reconciled shard total for user {user_id}: {total_score}")
     except SQLAlchemyError as e:
+        print(f"Error reconciling shard total for user {user_id}: {str(e)}")
+    finally:
+        shard_db.close()
+
+def _apply_score(db: Session, score_data: ScoreSubmit, game_mode: str, update_global: bool = True):
+    """
+    Record a game session and add it to every leaderboard in one transaction.
+    With update_global False the global total is left to the owning shard.
+    """
+    try:
+        # Insert the new game session
+        new_session = GameSession(
+            user_id=score_data.user_id,
+            score=score_data.score,
+            game_mode=game_mode
+        )
+        db.add(new_session)
+        
+        if update_global:
+            # Update the global total with row-level locking
+            with span("lock.leaderboard_row"):
+                leaderboard_entry = db.query(Leaderboard).filter(
+                    Leaderboard.user_id == score_data.user_id
+                ).with_for_update().first()
+            
+            if leaderboard_entry:
+                # Update existing leaderboard entry
+                leaderboard_entry.total_score += score_data.score
+            else:
+                # Create new leaderboard entry
+                new_leaderboard_entry = Leaderboard(
+                    user_id=score_data.user_id,
+                    total_score=score_data.score
+                )
+                db.add(new_leaderboard_entry)
+        
+        # Maintain the per-mode leaderboard in the same transaction
+        with span("lock.mode_row"):
+            mode_entry = db.query(ModeLeaderboard).filter(
+                ModeLeaderboard.game_mode == game_mode,
+                ModeLeaderboard.user_id == score_data.user_id
+            ).with_for_update().first()
+        
+        if mode_entry:
+            mode_entry.total_score += score_data.score
+        else:
+            db.add(ModeLeaderboard(
+                game_mode=game_mode,
+                user_id=score_data.user_id,
+                total_score=score_data.score
+            ))
+        
+        # Add to today's and this week's totals
+        add_window_scores(db, score_data.user_id, score_data.score)
+        
+        # Commit the transaction to save the score update
+        with span("db.commit"):
+            db.commit()
+    except SQLAlchemyError:
         db.rollback()
-        print(f"Error updating leaderboard ranks: {str(e)}")
+        raise
 
 @router.post("/submit", response_model=ResponseBase[MessageResponse], status_code=201)
 async def submit_score(
@@ -74,70 +316,62 @@ async def submit_score(
         score_data: Score data (score must be between 0 and 10000)
         current_user: Current authenticated user
         background_tasks: FastAPI background tasks
-        
+    
     Returns:
         Message that score was submitted successfully
     """
-    # Validate user in db
-    user = db.query(User).filter(User.id == score_data.user_id)
-    if not user:
+    # Validate user in db; the username cache answers for known players
+    # (the score range was already checked by ScoreSubmit)
+    if score_data.user_id not in get_usernames(db, [score_data.user_id]):
         raise NotFoundError(f"User not found")
-
-    # Validate score range
-    if score_data.score < 0 or score_data.score > 10000:
-        raise BadRequestError(f"Score must be between 0 and 10000, got {score_data.score}")
+    
+    game_mode = score_data.game_mode or "default"
     
     try:
-        # Start transaction for score update with row-level locking
-        leaderboard_entry = db.query(Leaderboard).filter(
-            Leaderboard.user_id == score_data.user_id
-        ).with_for_update().first()
+        # Writes go through the single writer on SQLite
+        await single_writer.run(db, _apply_score, score_data, game_mode, not leaderboard_shards)
         
-        # Insert the new game session
-        new_session = GameSession(
-            user_id=score_data.user_id,
-            score=score_data.score,
-            game_mode=score_data.game_mode
-        )
-        db.add(new_session)
+        if leaderboard_shards:
+            # The global total lives on the user's shard. The score is already
+            # committed on the primary, so a failed shard write is not reported
+            # (a client retry would count the score twice); the shard total is
+            # rebuilt from the primary's game sessions instead
+            shard_db = leaderboard_shards.session_for(score_data.user_id)
+            try:
+                await single_writer.run(shard_db, add_shard_score, score_data.user_id, score_data.score)
+            except SQLAlchemyError as e:
+                print(f"Error adding score to shard for user {score_data.user_id}, reconciling: {str(e)}")
+                background_tasks.add_task(reconcile_shard_score_background, db, score_data.user_id)
+            finally:
+                shard_db.close()
         
-        if leaderboard_entry:
-            # Update existing leaderboard entry
-            leaderboard_entry.total_score += score_data.score
-        else:
-            # Create new leaderboard entry
-            new_leaderboard_entry = Leaderboard(
-                user_id=score_data.user_id,
-                total_score=score_data.score
-            )
-            db.add(new_leaderboard_entry)
-        
-        # Commit the transaction to save the score update
-        db.commit()
+        # Keep this user's reads on the primary until replicas catch up
+        replica_router.record_write(score_data.user_id)
         
         # Immediately invalidate this user's rank cache
         invalidate_player_rank_cache(score_data.user_id)
         
         # Schedule rank updates as a background task
         # This prevents the API from blocking while ranks are recalculated
-        background_tasks.add_task(update_leaderboard_ranks_background, db)
-       
+        background_tasks.add_task(update_leaderboard_ranks_background, db, game_mode)
+        
         return ResponseBase[MessageResponse](
             success=True,
             message="Score submitted successfully",
             data=MessageResponse(message="Score submitted successfully and ranks will be updated shortly")
         )
     except SQLAlchemyError as e:
-        db.rollback()
         raise BadRequestError(f"Error submitting score: {str(e)}")
 
 @router.get("/top", response_model=LeaderboardResponse)
 @cached_leaderboard
 async def get_leaderboard(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(10, ge=1, le=100, description="Number of entries to return"),
     page: int = Query(1, ge=1, description="Page number"),
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    window: Literal["all", "day", "week"] = Query("all", description="Time window: all-time, today or this week"),
     _: bool = Depends(get_leaderboard_limiter) 
 ) -> Any:
     """
@@ -148,42 +382,27 @@ async def get_leaderboard(
         db: Database session
         limit: Maximum number of entries to return
         page: Page number for pagination
-        
+        game_mode: Read this mode's leaderboard instead of the global one
+        window: Read today's or this week's leaderboard instead of the all-time one
+    
     Returns:
         Leaderboard entries
     """
+    if game_mode and window != "all":
+        raise BadRequestError("game_mode and window cannot be combined")
+    
     offset = (page - 1) * limit
     
     try:
-        # Use count query optimization for total entries
-        total_entries = db.query(func.count(Leaderboard.id)).scalar()
-        
-        # Use a single optimized query with joins and explicit columns to select
-        # This reduces the amount of data transferred from the database
-        entries = db.query(
-            Leaderboard.rank.label('rank'),
-            Leaderboard.total_score.label('total_score'),
-            Leaderboard.user_id.label('user_id'),
-            User.username.label('username')
-        ).join(
-            User, Leaderboard.user_id == User.id
-        ).order_by(
-            Leaderboard.rank
-        ).offset(offset).limit(limit).all()
+        if leaderboard_shards and not game_mode and window == "all":
+            total_entries, entries = await sharded_page(leaderboard_shards, offset, limit)
+        else:
+            total_entries, entries = _leaderboard_page(db, game_mode, window, offset, limit)
         
-        leaderboard_entries = [
-            LeaderboardEntry(
-                rank=entry.rank,
-                user_id=entry.user_id,
-                username=entry.username,
-                total_score=entry.total_score
-            ) for entry in entries
-        ]
+        usernames = get_usernames(db, [entry.user_id for entry in entries])
         
-        return LeaderboardResponse(
-            total_entries=total_entries,
-            leaderboard=leaderboard_entries
-        )
+        # The rendered response is what gets cached, so hits skip encoding too
+        return _leaderboard_json(total_entries, entries, usernames)
     except SQLAlchemyError as e:
         raise BadRequestError(f"Error retrieving leaderboard: {str(e)}")
 
@@ -191,8 +410,10 @@ async def get_leaderboard(
 @cached_player_rank
 async def get_player_rank(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Path(..., description="User ID to get rank for"),
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    window: Literal["all", "day", "week"] = Query("all", description="Time window: all-time, today or this week"),
     _: bool = Depends(get_player_rank_limiter) 
 ) -> Any:
     """
@@ -202,36 +423,298 @@ async def get_player_rank(
     Args:
         db: Database session
         user_id: ID of the user to get rank for
-        
+        game_mode: Rank within this mode's leaderboard instead of the global one
+        window: Rank within today's or this week's leaderboard
+    
     Returns:
         Player rank
     """
+    if game_mode and window != "all":
+        raise BadRequestError("game_mode and window cannot be combined")
+    
     try:
-        # Use a single optimized query with a direct join rather than two separate queries
-        entry = db.query(
-            Leaderboard.rank.label('rank'),
-            Leaderboard.total_score.label('total_score'),
-            User.username.label('username'),
-            User.id.label('user_id')
-        ).join(
-            User, Leaderboard.user_id == User.id
-        ).filter(
-            User.id == user_id
-        ).first()
+        if leaderboard_shards and not game_mode and window == "all":
+            entry = await sharded_player_entry(leaderboard_shards, user_id)
+        else:
+            entry = _player_entry(db, user_id, game_mode, window)
         
+        usernames = get_usernames(db, [user_id])
+        if user_id not in usernames:
+            raise NotFoundError(detail="User not found")
         if not entry:
-            # Check if user exists but has no rank
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                raise NotFoundError(detail="User not found")
+            raise NotFoundError(detail="Player has not yet been ranked")
+        
+        rank, total_score = entry
+        
+        return PlayerRank(
+            user_id=user_id,
+            username=usernames[user_id],
+            rank=rank,
+            total_score=total_score
+        )
+    except SQLAlchemyError as e:
+        raise BadRequestError(f"Error retrieving player rank: {str(e)}")
+
+@router.post("/rank/batch", response_model=RankBatchResponse)
+async def get_player_ranks(
+    *,
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_db),
+    batch: RankBatchRequest,
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    _: bool = Depends(get_player_rank_limiter)
+) -> Any:
+    """
+    Get the current ranks of up to 200 players at once, e.g. a friend list.
+    Counts as one request against the player rank rate limit.
+    Players cached by /rank/{user_id} are served from the cache; the rest
+    are resolved with a single query and cached in turn.
+    
+    Args:
+        db: Database session
+        primary: Primary session, for players inside their read-your-writes window
+        batch: User IDs to look up
+        game_mode: Rank within this mode's leaderboard instead of the global one
+        
+    Returns:
+        One result per requested ID, in request order; status marks users
+        that do not exist or have not been ranked yet
+    """
+    results = {}
+    missing = []
+    with span("cache_lookup", cache="player_rank") as lookup:
+        for user_id in dict.fromkeys(batch.user_ids):
+            cached = player_rank_cache.get((user_id, game_mode, "all"))
+            if cached is None:
+                missing.append(user_id)
+            else:
+                results[user_id] = _rank_result(
+                    user_id, "ok", cached.username, cached.rank, cached.total_score
+                )
+        lookup.set(hits=len(results), misses=len(missing))
+    
+    if missing:
+        try:
+            if leaderboard_shards and not game_mode:
+                # Shards are not replicated; ranks are counted on read
+                usernames = get_usernames(db, missing)
+                ranked = await sharded_player_entries(leaderboard_shards, list(usernames))
+                entries = {
+                    user_id: (username,) + ranked.get(user_id, (None, None))
+                    for user_id, username in usernames.items()
+                }
             else:
-                raise NotFoundError(detail="Player has not yet been ranked")
+                # Players who submitted recently are read from the primary, as
+                # /rank/{user_id} does, so no stale replica rank gets cached
+                recent = [
+                    user_id for user_id in missing
+                    if db is not primary and replica_router.wrote_recently(user_id)
+                ]
+                replica_ids = [user_id for user_id in missing if user_id not in recent]
+                entries = _player_entries(db, replica_ids, game_mode) if replica_ids else {}
+                if recent:
+                    entries.update(_player_entries(primary, recent, game_mode))
+        except SQLAlchemyError as e:
+            raise BadRequestError(f"Error retrieving player ranks: {str(e)}")
+        
+        for user_id in missing:
+            if user_id not in entries:
+                results[user_id] = _rank_result(user_id, "user_not_found")
+                continue
+            username, rank, total_score = entries[user_id]
+            if rank is None:
+                results[user_id] = _rank_result(user_id, "not_ranked", username)
+                continue
+            results[user_id] = _rank_result(user_id, "ok", username, rank, total_score)
+            # Shared with /rank/{user_id}, and dropped with it on the player's next submit
+            player_rank_cache[(user_id, game_mode, "all")] = PlayerRank(
+                user_id=user_id, username=username, rank=rank, total_score=total_score
+            )
+    
+    return ORJSONResponse({"results": [results[user_id] for user_id in batch.user_ids]})
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}}
+)
+async def export_leaderboard(
+    *,
+    db: Session = Depends(get_read_db),
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    min_rank: Optional[int] = Query(None, ge=1, description="First rank to include"),
+    max_rank: Optional[int] = Query(None, ge=1, description="Last rank to include"),
+    accept_encoding: Optional[str] = Header(None),
+    _: bool = Depends(require_admin)
+) -> Any:
+    """
+    Stream the full ranked leaderboard for analytics and rewards jobs.
+    Requires the X-Admin-Key header. Rows come from a server-side cursor
+    and are encoded a batch at a time, so memory stays constant; the next
+    batch is only fetched once the previous chunk has been sent, so a slow
+    client slows the cursor instead of buffering the board. The body is
+    gzip-compressed on the fly when the client accepts it.
+    
+    Args:
+        db: Database session (its engine runs the export on its own connection)
+        fmt: Output format, one JSON object per line or CSV with a header
+        game_mode: Export this mode's leaderboard instead of the global one
+        min_rank: Only players ranked at or below this number
+        max_rank: Only players ranked at or above this number
+        accept_encoding: Accept-Encoding header
+    
+    Returns:
+        Rows of rank, user_id, username and total_score in rank order
+    """
+    if leaderboard_shards and not game_mode:
+        raise BadRequestError("Export of a sharded global leaderboard is not supported")
+    if min_rank is not None and max_rank is not None and min_rank > max_rank:
+        raise BadRequestError("min_rank cannot be greater than max_rank")
+    
+    compress = accepts_gzip(accept_encoding)
+    headers = {
+        "Content-Disposition": f'attachment; filename="leaderboard.{fmt}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    
+    # Starlette iterates this generator in the thread pool, so cursor
+    # fetches and encoding stay off the event loop
+    chunks = export_chunks(
+        db.get_bind(), fmt, game_mode, min_rank, max_rank,
+        batch_rows=settings.EXPORT_BATCH_ROWS, compress=compress
+    )
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+@router.get("/seasons", response_model=List[SeasonInfo])
+async def list_seasons(
+    *,
+    db: Session = Depends(get_read_db),
+    _: bool = Depends(get_leaderboard_limiter)
+) -> Any:
+    """
+    List leaderboard seasons, newest first.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Seasons, including the running one (no ended_at)
+    """
+    seasons = db.query(Season).order_by(Season.id.desc()).all()
+    return [SeasonInfo.model_validate(season, from_attributes=True) for season in seasons]
+
+@router.post("/seasons/rollover", response_model=ResponseBase[SeasonInfo])
+async def start_new_season(
+    *,
+    db: Session = Depends(get_db),
+    name: Optional[str] = Query(None, description="Name of the new season"),
+    _: bool = Depends(require_admin)
+) -> Any:
+    """
+    Archive the current season's leaderboards and start an empty season.
+    Requires the X-Admin-Key header. Only this worker's leaderboard and
+    rank caches are cleared; other workers keep serving the old season's
+    standings until their cache TTL expires.
+    
+    Args:
+        db: Database session
+        name: Name of the new season
+    
+    Returns:
+        The season that was closed
+    """
+    if leaderboard_shards:
+        raise BadRequestError("Season rollover is not supported with a sharded leaderboard")
+    
+    try:
+        # Writes go through the single writer on SQLite
+        closed = await single_writer.run(db, rollover_season, name)
+    except SQLAlchemyError as e:
+        raise BadRequestError(f"Error rolling over season: {str(e)}")
+    
+    return ResponseBase[SeasonInfo](
+        success=True,
+        message=f"{closed.name} archived",
+        data=SeasonInfo.model_validate(closed, from_attributes=True)
+    )
+
+@router.get("/seasons/{season_id}/top", response_model=LeaderboardResponse)
+async def get_season_leaderboard(
+    *,
+    db: Session = Depends(get_read_db),
+    season_id: int = Path(..., description="Archived season ID"),
+    limit: int = Query(10, ge=1, le=100, description="Number of entries to return"),
+    page: int = Query(1, ge=1, description="Page number"),
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    _: bool = Depends(get_leaderboard_limiter)
+) -> Any:
+    """
+    Get the final standings of an archived season.
+    
+    Args:
+        db: Database session
+        season_id: ID of a season that has ended
+        limit: Maximum number of entries to return
+        page: Page number for pagination
+        game_mode: Read this mode's leaderboard instead of the global one
+    
+    Returns:
+        Leaderboard entries
+    """
+    if not get_archived_season(db, season_id):
+        raise NotFoundError(detail="Archived season not found")
+    
+    try:
+        total_entries, entries = season_page(db, season_id, game_mode, (page - 1) * limit, limit)
+        usernames = get_usernames(db, [entry.user_id for entry in entries])
+        
+        return _leaderboard_json(total_entries, entries, usernames)
+    except SQLAlchemyError as e:
+        raise BadRequestError(f"Error retrieving season leaderboard: {str(e)}")
+
+@router.get("/seasons/{season_id}/rank/{user_id}", response_model=PlayerRank)
+async def get_season_player_rank(
+    *,
+    db: Session = Depends(get_read_db),
+    season_id: int = Path(..., description="Archived season ID"),
+    user_id: int = Path(..., description="User ID to get rank for"),
+    game_mode: Optional[str] = Query(None, description="Game mode leaderboard (all modes if omitted)"),
+    _: bool = Depends(get_player_rank_limiter)
+) -> Any:
+    """
+    Get a player's final rank in an archived season.
+    
+    Args:
+        db: Database session
+        season_id: ID of a season that has ended
+        user_id: ID of the user to get rank for
+        game_mode: Rank within this mode's leaderboard instead of the global one
+    
+    Returns:
+        Player rank
+    """
+    if not get_archived_season(db, season_id):
+        raise NotFoundError(detail="Archived season not found")
+    
+    try:
+        entry = season_player_entry(db, season_id, user_id, game_mode)
+        
+        usernames = get_usernames(db, [user_id])
+        if user_id not in usernames:
+            raise NotFoundError(detail="User not found")
+        if not entry:
+            raise NotFoundError(detail="Player was not ranked in this season")
+        
+        rank, total_score = entry
         
         return PlayerRank(
-            user_id=entry.user_id,
-            username=entry.username,
-            rank=entry.rank,
-            total_score=entry.total_score
+            user_id=user_id,
+            username=usernames[user_id],
+            rank=rank,
+            total_score=total_score
         )
     except SQLAlchemyError as e:
-        raise BadRequestError(f"Error retrieving player rank: {str(e)}")
\ No newline at end of file
+        raise BadRequestError(f"Error retrieving season rank: {str(e)}")
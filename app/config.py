@@ -14,12 +14,89 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./leaderboard_db")
+    # Comma-separated read replica URLs for /top and /rank (primary only if empty)
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # "round_robin" or "least_connections"
+    REPLICA_SELECTION: str = os.getenv("REPLICA_SELECTION", "round_robin")
+    # A replica that fails to connect is skipped for this many seconds
+    REPLICA_RETRY_SECONDS: int = int(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+    # Comma-separated databases the global leaderboard is sharded across by
+    # user_id hash (empty keeps it in DATABASE_URL)
+    LEADERBOARD_SHARD_URLS: str = os.getenv("LEADERBOARD_SHARD_URLS", "")
+    # After a submit, that user's reads stay on the primary for this many seconds (0 disables)
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", "0"))
+    
+    # SQLite tuning (applied to every connection when DATABASE_URL is sqlite)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Negative values are KiB, so -65536 is a 64 MiB page cache
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    
+    # game_sessions partitioning (PostgreSQL only)
+    # Monthly partitions are created this many months ahead
+    GAME_SESSION_PARTITIONS_AHEAD: int = int(os.getenv("GAME_SESSION_PARTITIONS_AHEAD", "3"))
+    # Partitions older than this are rolled up into game_session_daily
+    GAME_SESSION_RETENTION_DAYS: int = int(os.getenv("GAME_SESSION_RETENTION_DAYS", "90"))
+    # What happens to expired raw partitions: "drop" or "detach"
+    GAME_SESSION_RETENTION_MODE: str = os.getenv("GAME_SESSION_RETENTION_MODE", "drop")
+    
+    # Leaderboard rows re-ranked per transaction (each chunk commits on its own)
+    RERANK_CHUNK_SIZE: int = int(os.getenv("RERANK_CHUNK_SIZE", "5000"))
+    
+    # Day/week leaderboards keep the current period plus this many previous ones
+    WINDOW_RETAINED_PERIODS: int = int(os.getenv("WINDOW_RETAINED_PERIODS", "1"))
+    
+    # Rows fetched per server-side cursor round trip (and encoded per chunk)
+    # by GET /leaderboard/export
+    EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
     
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified tokens kept in memory, and how long a resolved user may be reused
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL: int = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+    
+    # Admin endpoints are disabled unless a key is configured
+    ADMIN_API_KEY: Optional[str] = os.getenv("ADMIN_API_KEY")
+    
+    # Password hashing settings
+    # Changing BCRYPT_ROUNDS rehashes existing passwords on their next login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Size of the dedicated bcrypt process pool (0 hashes on the thread pool)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # Hash jobs allowed to wait for a worker before requests get a 503
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
 
+    # Requests running more SQL statements or DB time than this are logged
+    # with their normalized SQL (0 disables either check)
+    QUERY_BUDGET_STATEMENTS: int = int(os.getenv("QUERY_BUDGET_STATEMENTS", "20"))
+    QUERY_BUDGET_DB_MS: int = int(os.getenv("QUERY_BUDGET_DB_MS", "250"))
+    # Add a Server-Timing header with per-request DB time (defaults to DEBUG)
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", os.getenv("DEBUG", "False")).lower() == "true"
+    
+    # Sampling profiler: off unless enabled, then profiles this fraction of
+    # requests plus any request sent with "X-Profile: 1" and the admin key
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "False").lower() == "true"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL_MS: int = int(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    
+    # Fraction of requests traced (0 disables tracing). Finished spans are kept
+    # in a ring buffer of TRACE_BUFFER_SIZE and appended to TRACE_FILE if set
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "1000"))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "")
+    
+    # Expose Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # Cache settings
+    # user_id -> username entries kept in memory for leaderboard responses
+    USERNAME_CACHE_SIZE: int = int(os.getenv("USERNAME_CACHE_SIZE", "1000000"))
+    
     # CORS settings
     CORS_ORIGINS: list = ["*"]
     CORS_METHODS: list = ["*"]
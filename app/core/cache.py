@@ -1,10 +1,17 @@
 # app/core/cache.py
 import time
+import threading
 from functools import wraps
-from cachetools import TTLCache, cached
+from typing import Optional, Any, Dict, Iterable
+from cachetools import TTLCache, LRUCache, cached
 import hashlib
 import json
 
+from app.config import settings
+from app.models.user import User
+from app.core.tracing import span
+from app.core.windows import period_start
+
 # Simple in-memory cache using cachetools
 # TTLCache provides time-based expiration
 # Default: 1024 items with 5-minute (300s) expiration
@@ -32,6 +39,130 @@ def invalidate_player_rank_cache(user_id=None):
         for key in keys_to_remove:
             player_rank_cache.pop(key, None)
 
+# user_id -> username map, filled lazily
+# Usernames never change, so leaderboard queries can skip the users join
+username_cache = LRUCache(maxsize=settings.USERNAME_CACHE_SIZE)
+username_cache_lock = threading.Lock()
+
+def get_usernames(db, user_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Resolve usernames for the given user IDs.
+    IDs missing from the cache are loaded with a single IN query;
+    IDs with no matching user are left out of the result.
+    """
+    usernames = {}
+    missing = []
+    with username_cache_lock:
+        for user_id in user_ids:
+            username = username_cache.get(user_id)
+            if username is None:
+                missing.append(user_id)
+            else:
+                usernames[user_id] = username
+    
+    if missing:
+        rows = db.query(User.id, User.username).filter(User.id.in_(missing)).all()
+        with username_cache_lock:
+            for user_id, username in rows:
+                username_cache[user_id] = username
+                usernames[user_id] = username
+    
+    return usernames
+
+def set_username(user_id: int, username: str):
+    """Record a username, e.g. right after signup"""
+    with username_cache_lock:
+        username_cache[user_id] = username
+
+def invalidate_username_cache(user_id=None):
+    """
+    Clear the username cache
+    If user_id is provided, only drop that user's entry
+    """
+    with username_cache_lock:
+        if user_id is None:
+            username_cache.clear()
+        else:
+            username_cache.pop(user_id, None)
+
+# Verified JWT cache: token digest -> (expires_at, user_id, user)
+# Entries never outlive the token's own exp claim
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+# Explicitly revoked tokens: token digest -> expires_at
+revoked_tokens = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+token_cache_lock = threading.Lock()
+
+def token_digest(token: str) -> str:
+    """Digest used as the cache key so raw tokens are never kept in memory"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def get_cached_token_user(token: str) -> Optional[Any]:
+    """Return the user resolved for a verified token, or None on a miss"""
+    digest = token_digest(token)
+    now = time.time()
+    with token_cache_lock:
+        entry = token_cache.get(digest)
+        if entry is None:
+            return None
+        expires_at, _, user = entry
+        if expires_at <= now:
+            token_cache.pop(digest, None)
+            return None
+        return user
+
+def cache_token_user(token: str, user: Any, token_expires_at: Optional[float] = None):
+    """
+    Cache a verified token and the user it resolved to.
+    The entry expires at the token's exp or after TOKEN_CACHE_TTL, whichever is first.
+    """
+    expires_at = time.time() + settings.TOKEN_CACHE_TTL
+    if token_expires_at is not None:
+        expires_at = min(token_expires_at, expires_at)
+    with token_cache_lock:
+        token_cache[token_digest(token)] = (expires_at, user.id, user)
+
+def is_token_revoked(token: str) -> bool:
+    """Check whether a token was explicitly revoked"""
+    digest = token_digest(token)
+    with token_cache_lock:
+        expires_at = revoked_tokens.get(digest)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            revoked_tokens.pop(digest, None)
+            return False
+        return True
+
+def revoke_token(token: str, token_expires_at: Optional[float] = None):
+    """
+    Revoke a token (e.g. on logout).
+    It is evicted from the token cache and rejected until it expires.
+    """
+    digest = token_digest(token)
+    if token_expires_at is None:
+        token_expires_at = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    with token_cache_lock:
+        token_cache.pop(digest, None)
+        revoked_tokens[digest] = token_expires_at
+
+def invalidate_token_cache(user_id=None):
+    """
+    Clear cached tokens
+    If user_id is provided, only drop that user's tokens (e.g. after deactivation)
+    Otherwise clear the whole cache
+    """
+    with token_cache_lock:
+        if user_id is None:
+            token_cache.clear()
+            return
+        
+        keys_to_remove = [
+            key for key, (_, cached_user_id, _) in token_cache.items()
+            if cached_user_id == user_id
+        ]
+        for key in keys_to_remove:
+            token_cache.pop(key, None)
+
 def cache_key_builder(*args, **kwargs):
     """
     Build a cache key from args and kwargs
@@ -41,14 +172,24 @@ def cache_key_builder(*args, **kwargs):
     return hashlib.md5(key.encode()).hexdigest()
 
 def cached_leaderboard(func):
-    """Decorator to cache leaderboard results"""
+    """Decorator to cache leaderboard results (one entry per board and page)"""
     @wraps(func)
     async def wrapper(*args, **kwargs):
         # Simplified key generation for leaderboard
-        key = f"leaderboard:{kwargs.get('limit', 10)}:{kwargs.get('page', 1)}"
+        window = kwargs.get('window', 'all')
+        key = (
+            f"leaderboard:{kwargs.get('game_mode')}:{window}:"
+            f"{kwargs.get('limit', 10)}:{kwargs.get('page', 1)}"
+        )
+        if window != "all":
+            # A new day or week is a new board, not a stale copy of the last one
+            key += f":{period_start(window)}"
         
         # Check if result is in cache
-        if key in leaderboard_cache:
+        with span("cache_lookup", cache="leaderboard") as lookup:
+            hit = key in leaderboard_cache
+            lookup.set(hit=hit)
+        if hit:
             return leaderboard_cache[key]
         
         # Get result from function
@@ -61,18 +202,25 @@ def cached_leaderboard(func):
     return wrapper
 
 def cached_player_rank(func):
-    """Decorator to cache player rank results"""
+    """Decorator to cache player rank results (one entry per user and board)"""
     @wraps(func)
     async def wrapper(*args, **kwargs):
         user_id = kwargs.get('user_id')
         if not user_id and len(args) > 2:  # Check if user_id is in args
             user_id = args[2]
         
-        # Create key based on user_id
-        key = f"player_rank:{user_id}"
+        # Key on (user_id, game_mode, window) so invalidate_player_rank_cache(user_id)
+        # drops every board for that user; day/week ranks also key on the period
+        window = kwargs.get('window', 'all')
+        key = (user_id, kwargs.get('game_mode'), window)
+        if window != "all":
+            key += (period_start(window),)
         
         # Check if result is in cache
-        if key in player_rank_cache:
+        with span("cache_lookup", cache="player_rank") as lookup:
+            hit = key in player_rank_cache
+            lookup.set(hit=hit)
+        if hit:
             return player_rank_cache[key]
         
         # Get result from function
@@ -35,4 +35,12 @@ class ConflictError(HTTPException):
         super().__init__(
             status_code=status.HTTP_409_CONFLICT,
             detail=detail
+        )
+
+class ServiceUnavailableError(HTTPException):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
         )
\ No newline at end of file
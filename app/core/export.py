@@ -0,0 +1,108 @@
+# app/core/export.py
+import csv
+import io
+import zlib
+from typing import Iterable, Iterator, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app.models.game import Leaderboard, ModeLeaderboard
+from app.models.user import User
+
+EXPORT_COLUMNS = ("rank", "user_id", "username", "total_score")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def export_query(game_mode: Optional[str] = None, min_rank: Optional[int] = None, max_rank: Optional[int] = None):
+    """
+    Ranked rows of the global or one mode's leaderboard in rank order,
+    joined to usernames (a full export would only churn the username cache).
+    Rows added since the last re-rank have no rank yet and are left out.
+    """
+    board = ModeLeaderboard if game_mode else Leaderboard
+    query = select(
+        board.rank, board.user_id, User.username, board.total_score
+    ).join(User, User.id == board.user_id).where(board.rank.isnot(None))
+    
+    if game_mode:
+        query = query.where(ModeLeaderboard.game_mode == game_mode)
+    if min_rank is not None:
+        query = query.where(board.rank >= min_rank)
+    if max_rank is not None:
+        query = query.where(board.rank <= max_rank)
+    return query.order_by(board.rank, board.user_id)
+
+def stream_rows(bind: Engine, query, batch_rows: int) -> Iterator[list]:
+    """
+    Yield the query's rows in batches from a server-side cursor on a
+    dedicated connection, so memory stays flat however large the board is.
+    The export is one statement, which sees one snapshot of the table on
+    both PostgreSQL and SQLite (WAL) while re-ranks keep committing.
+    """
+    with bind.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_rows).execute(query)
+        for batch in result.partitions():
+            yield batch
+
+def encode_ndjson(batches: Iterable[list]) -> Iterator[bytes]:
+    """One JSON object per row, one chunk per batch"""
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_COLUMNS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+def encode_csv(batches: Iterable[list]) -> Iterator[bytes]:
+    """A header line, then one chunk of CSV rows per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Only the header when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a stream of chunks into one gzip member as they are produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows a gzip response"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "x-gzip"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def export_chunks(
+    bind: Engine,
+    fmt: str,
+    game_mode: Optional[str] = None,
+    min_rank: Optional[int] = None,
+    max_rank: Optional[int] = None,
+    batch_rows: int = 1000,
+    compress: bool = False
+) -> Iterator[bytes]:
+    """The encoded (and optionally gzip-compressed) export, chunk by chunk"""
+    chunks = ENCODERS[fmt](stream_rows(bind, export_query(game_mode, min_rank, max_rank), batch_rows))
+    return gzip_chunks(chunks) if compress else chunks
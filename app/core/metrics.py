@@ -0,0 +1,275 @@
+# app/core/metrics.py
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow re-ranks
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Child:
+    """
+    One labelled series. Each thread updates its own list of values, so
+    recording never takes a lock; collection sums the per-thread lists.
+    """
+    __slots__ = ("_size", "_shards", "_lock")
+    
+    def __init__(self, size: int):
+        self._size = size
+        self._shards: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def _shard(self) -> List[float]:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(ident, [0.0] * self._size)
+        return shard
+    
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards.values())
+        return [sum(values) for values in zip(*shards)] if shards else [0.0] * self._size
+
+class _Metric:
+    """Base for metrics with a fixed set of label names"""
+    kind = ""
+    size = 1
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _Child] = {}
+        self._lock = threading.Lock()
+    
+    def _child(self, values: Tuple[str, ...]) -> _Child:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, _Child(self.size))
+        return child
+    
+    def _series(self) -> Iterable[Tuple[Tuple[str, ...], List[float]]]:
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield values, child.totals()
+    
+    def reset(self):
+        with self._lock:
+            self._children = {}
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(suffix, formatted labels, value) for each exposed sample"""
+        for values, totals in self._series():
+            yield "", _format_labels(self.labelnames, values), totals[0]
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._child(labels)._shard()[0] += amount
+
+class Gauge(_Metric):
+    """A gauge whose value is the sum of increments and decrements"""
+    kind = "gauge"
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._child(labels)._shard()[0] += amount
+    
+    def dec(self, *labels: str, amount: float = 1.0):
+        self._child(labels)._shard()[0] -= amount
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # One count per bucket plus +Inf, then the sum of observations
+        self.size = len(self.buckets) + 2
+    
+    def observe(self, value: float, *labels: str):
+        shard = self._child(labels)._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for values, totals in self._series():
+            cumulative = 0.0
+            for bound, count in zip(bounds, totals[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), values + (bound,))
+                yield "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield "_sum", labels, totals[-1]
+            yield "_count", labels, cumulative
+
+# A collector returns (name, kind, documentation, [(labels dict, value)])
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+class Registry:
+    """Metrics and on-demand collectors rendered in Prometheus text format"""
+    
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def register_collector(self, collector: Collector):
+        self._collectors.append(collector)
+    
+    def reset(self):
+        """Clear recorded values (used by tests)"""
+        for metric in self._metrics:
+            metric.reset()
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {str(e)}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_names = tuple(labels)
+                    label_values = tuple(labels[key] for key in label_names)
+                    lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ("method",)
+))
+rate_limit_rejections = registry.register(Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by each rate limiter",
+    ("limiter",)
+))
+security_blocks = registry.register(Counter(
+    "security_blocks_total",
+    "Requests rejected by the API security middleware",
+    ("reason",)
+))
+rank_update_duration = registry.register(Histogram(
+    "rank_update_duration_seconds",
+    "Duration of background leaderboard rank updates",
+    (),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+))
+rank_updates = registry.register(Counter(
+    "rank_updates_total",
+    "Background leaderboard rank updates by result",
+    ("result",)
+))
+
+def pool_collector(engines: Callable[[], Dict[str, object]]) -> Collector:
+    """
+    Collector for SQLAlchemy connection pool gauges. engines returns the
+    engines to report keyed by a label such as "primary" or "replica0";
+    pools without size accounting (SQLite in-memory pools) are skipped.
+    """
+    gauges = (
+        ("db_pool_size", "Configured connection pool size", "size"),
+        ("db_pool_checked_out", "Connections currently checked out", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+        ("db_pool_overflow", "Connections open beyond the pool size", "overflow"),
+    )
+    
+    def collect():
+        pools = [
+            (name, engine.pool) for name, engine in engines().items()
+            if hasattr(engine.pool, "checkedout")
+        ]
+        for metric, documentation, method in gauges:
+            yield metric, "gauge", documentation, [
+                ({"engine": name}, getattr(pool, method)()) for name, pool in pools
+            ]
+    
+    return collect
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency and in-flight requests.
+    Requests are labelled with the matched route template, so path
+    parameters do not create new series; unmatched paths share one label.
+    """
+    
+    def __init__(self, app, exclude_paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self.exclude_paths = set(exclude_paths or ())
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        http_requests_in_flight.inc(method)
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - start, method, route_path, str(status))
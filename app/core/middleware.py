@@ -3,9 +3,99 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import time
 import re
-from typing import Pattern, List, Set, Dict
+import threading
+from typing import Pattern, List, Set, Dict, Iterable, Optional
+from urllib.parse import unquote_plus
 import hashlib
 
+from app.core.metrics import security_blocks
+from app.core.tracing import span
+
+# Suspicious patterns in request paths or query parameters.
+# They are joined into a single alternation so a request is scanned in one pass.
+SUSPICIOUS_PATTERNS: List[str] = [
+    r"SELECT\s+.*\s+FROM",   # SQL injection attempt
+    r"<script.*?>",           # XSS attempt
+    r"\.\./\.\./",            # Path traversal
+    r"^\s*\$\{.+\}$",         # Template injection
+]
+
+# Routes that never need scanning: fixed paths, and templates whose
+# parameters are all typed as integers (each {param} only matches digits)
+DEFAULT_SCAN_EXEMPT_ROUTES: List[str] = [
+    "/",
+    "/health",
+]
+
+_ROUTE_PARAM = re.compile(r"\{[^}/]+\}")
+
+
+def compile_suspicious_patterns(patterns: Iterable[str]) -> Pattern:
+    """Combine the suspicious patterns into a single alternation regex"""
+    return re.compile(
+        "|".join(f"(?:{pattern})" for pattern in patterns),
+        re.IGNORECASE
+    )
+
+
+def compile_exempt_routes(routes: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compile route templates into one anchored regex.
+    Each {param} placeholder only matches digits, so a request can only
+    bypass the scan when every path parameter is numeric.
+    """
+    alternatives = []
+    for route in routes:
+        parts = _ROUTE_PARAM.split(route)
+        alternatives.append(r"\d+".join(re.escape(part) for part in parts))
+    
+    if not alternatives:
+        return None
+    return re.compile("^(?:" + "|".join(alternatives) + ")$")
+
+
+class ScanStats:
+    """Cumulative cost of the suspicious-pattern scan"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.scanned = 0
+            self.skipped = 0
+            self.blocked = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+    
+    def record(self, elapsed: float, blocked: bool):
+        with self.lock:
+            self.scanned += 1
+            self.total_seconds += elapsed
+            if elapsed > self.max_seconds:
+                self.max_seconds = elapsed
+            if blocked:
+                self.blocked += 1
+    
+    def record_skip(self):
+        with self.lock:
+            self.skipped += 1
+    
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "scanned": self.scanned,
+                "skipped": self.skipped,
+                "blocked": self.blocked,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+                "avg_seconds": self.total_seconds / self.scanned if self.scanned else 0.0
+            }
+
+# Global scan statistics, shared by every middleware instance
+scan_stats = ScanStats()
+
 class APISecurityMiddleware(BaseHTTPMiddleware):
     """
     Middleware for additional API security measures:
@@ -14,15 +104,15 @@ class APISecurityMiddleware(BaseHTTPMiddleware):
     - Basic anti-automation measures
     """
     
-    def __init__(self, app):
+    def __init__(self, app, scan_exempt_routes: Optional[Iterable[str]] = None):
         super().__init__(app)
-        # Suspicious patterns in request paths or query parameters
-        self.suspicious_patterns: List[Pattern] = [
-            re.compile(r"SELECT\s+.*\s+FROM", re.IGNORECASE),  # SQL injection attempt
-            re.compile(r"<script.*?>", re.IGNORECASE),          # XSS attempt
-            re.compile(r"../../", re.IGNORECASE),               # Path traversal
-            re.compile(r"^\s*\$\{.+\}$", re.IGNORECASE),        # Template injection
-        ]
+        # Single combined scanner for all suspicious patterns
+        self.suspicious_pattern: Pattern = compile_suspicious_patterns(SUSPICIOUS_PATTERNS)
+        
+        # Routes that opt out of the scan (fixed paths or all-numeric parameters)
+        if scan_exempt_routes is None:
+            scan_exempt_routes = DEFAULT_SCAN_EXEMPT_ROUTES
+        self.scan_exempt_routes: Optional[Pattern] = compile_exempt_routes(scan_exempt_routes)
         
         # Track request counts by IP for anomaly detection
         self.request_tracker: Dict[str, Dict] = {}
@@ -45,7 +135,11 @@ class APISecurityMiddleware(BaseHTTPMiddleware):
         self._track_request(client_ip, request)
         
         # Check for suspicious patterns
-        if self._has_suspicious_patterns(request):
+        with span("security_scan") as scan_span:
+            suspicious = self._has_suspicious_patterns(request)
+            scan_span.set(blocked=suspicious)
+        if suspicious:
+            security_blocks.inc("suspicious_pattern")
             # Return 403 Forbidden for suspicious requests
             return Response(
                 content='{"detail":"Forbidden"}',
@@ -70,6 +164,11 @@ class APISecurityMiddleware(BaseHTTPMiddleware):
         # Add timing header (useful for monitoring)
         response.headers["X-Process-Time"] = str(process_time)
         
+        # Expose the cost of the suspicious-pattern scan for this request
+        scan_time = getattr(request.state, "security_scan_time", None)
+        if scan_time is not None:
+            response.headers["X-Security-Scan-Time"] = str(scan_time)
+        
         # If suspiciously fast automated request, add delay based on bot score
         if is_bot and process_time < 0.1 and bot_score > 0.7:
             delay = min(bot_score * 2, 1.0)  # Max 1 second delay
@@ -126,22 +225,32 @@ class APISecurityMiddleware(BaseHTTPMiddleware):
             del self.request_tracker[ip]
     
     def _has_suspicious_patterns(self, request: Request) -> bool:
-        """Check for suspicious patterns in the request"""
-        # Check path
+        """
+        Check for suspicious patterns in the request path and query string.
+        Exempt routes are skipped entirely; everything else is scanned in a
+        single pass per component and the scan time is recorded in scan_stats.
+        """
         path = request.url.path
+        query = request.scope.get("query_string", b"")
         
-        # Check query parameters
-        query_params = str(request.query_params)
+        # Fixed-shape routes with numeric parameters cannot carry a payload
+        if not query and self.scan_exempt_routes and self.scan_exempt_routes.match(path):
+            scan_stats.record_skip()
+            return False
         
-        # Combine data to check
-        data_to_check = f"{path} {query_params}"
+        start = time.perf_counter()
         
-        # Check for suspicious patterns
-        for pattern in self.suspicious_patterns:
-            if pattern.search(data_to_check):
-                return True
+        found = self.suspicious_pattern.search(path) is not None
+        if not found and query:
+            query_string = query.decode("latin-1")
+            if "%" in query_string or "+" in query_string:
+                query_string = unquote_plus(query_string)
+            found = self.suspicious_pattern.search(query_string) is not None
         
-        return False
+        elapsed = time.perf_counter() - start
+        request.state.security_scan_time = elapsed
+        scan_stats.record(elapsed, found)
+        return found
     
     def _check_automation(self, request: Request) -> tuple:
         """
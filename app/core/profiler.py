@@ -0,0 +1,180 @@
+# app/core/profiler.py
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+# Running task per event loop; read from the sampler thread to tell which
+# request the loop is executing when a sample is taken
+_current_tasks: Dict = getattr(asyncio.tasks, "_current_tasks", {})
+
+# Frames from these directories are event loop plumbing below the request
+_LOOP_DIRS = (os.path.dirname(asyncio.__file__),)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_qualname} ({filename})"
+
+class SamplingProfiler:
+    """
+    Statistical profiler for requests on the event loop thread.
+    While at least one profiled request is in flight a sampler thread wakes
+    every interval, reads the loop thread's stack and, if the running task
+    belongs to a profiled request, adds the stack to that route's counts.
+    Nothing runs while no request is being profiled.
+    """
+    
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)
+        self.samples = 0
+        self.requests = 0
+        # task -> ASGI scope of the profiled request it is running
+        self._active: Dict[asyncio.Task, dict] = {}
+        # event loop -> ident of the thread running it
+        self._loops: Dict[asyncio.AbstractEventLoop, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start_request(self, scope: dict) -> asyncio.Task:
+        """Profile the current task until finish_request is called"""
+        task = asyncio.current_task()
+        with self._lock:
+            self._active[task] = scope
+            self._loops[asyncio.get_running_loop()] = threading.get_ident()
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+                self._thread.start()
+        return task
+    
+    def finish_request(self, task: asyncio.Task):
+        with self._lock:
+            self._active.pop(task, None)
+    
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    # Stop until the next profiled request
+                    self._thread = None
+                    return
+                active = dict(self._active)
+                loops = list(self._loops.items())
+            
+            frames = sys._current_frames()
+            for loop, thread_id in loops:
+                scope = active.get(_current_tasks.get(loop))
+                frame = frames.get(thread_id)
+                if scope is None or frame is None:
+                    continue
+                route = getattr(scope.get("route"), "path", None) or scope["path"]
+                stack = self._collapse(frame)
+                with self._lock:
+                    self.stacks[route][stack] += 1
+                    self.samples += 1
+    
+    def _collapse(self, frame) -> str:
+        """Stack from outermost to innermost frame, joined with ;"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            names.append(frame)
+            frame = frame.f_back
+        names.reverse()
+        # Drop the server and event loop frames below the task being run
+        start = 0
+        in_loop = False
+        for index, stack_frame in enumerate(names):
+            if stack_frame.f_code.co_filename.startswith(_LOOP_DIRS):
+                in_loop = True
+            elif in_loop:
+                start = index
+                break
+        return ";".join(_frame_name(stack_frame) for stack_frame in names[start:]) or "(idle)"
+    
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """
+        Samples in collapsed-stack format ("route;frame;frame count" per
+        line), readable by flamegraph.pl, speedscope and inferno.
+        """
+        with self._lock:
+            snapshot = {name: dict(stacks) for name, stacks in self.stacks.items()}
+        lines = []
+        for name in sorted(snapshot):
+            if route is not None and name != route:
+                continue
+            for stack, count in sorted(snapshot[name].items(), key=lambda item: -item[1]):
+                lines.append(f"{name};{stack} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+    
+    def reset(self):
+        with self._lock:
+            self.stacks = defaultdict(Counter)
+            self.samples = 0
+            self.requests = 0
+
+# Global profiler used by ProfilerMiddleware and the /debug/profile endpoint
+profiler = SamplingProfiler()
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware choosing which requests to profile: a random
+    sample_rate fraction, plus any request carrying "X-Profile: 1" with a
+    valid X-Admin-Key. It must be the innermost middleware (added first) so
+    the endpoint runs in the task it registers.
+    """
+    
+    def __init__(
+        self,
+        app,
+        sample_rate: float = 0.0,
+        admin_key: Optional[str] = None,
+        profiler: SamplingProfiler = profiler
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.admin_key = admin_key
+        self.profiler = profiler
+    
+    def _requested(self, scope) -> bool:
+        if not self.admin_key:
+            return False
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1":
+            return False
+        key = headers.get(b"x-admin-key", b"")
+        return hmac.compare_digest(key, self.admin_key.encode())
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (
+            (self.sample_rate and random.random() < self.sample_rate) or self._requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        task = self.profiler.start_request(scope)
+        
+        async def send_and_finish(message):
+            # Background tasks run after the body; they are not part of the request
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                self.profiler.finish_request(task)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_and_finish)
+        finally:
+            self.profiler.finish_request(task)
@@ -0,0 +1,227 @@
+# app/core/provisioning.py
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import invalidate_leaderboard_cache
+from app.core.ranking import LeaderboardReranker
+from app.core.security import get_password_hash, is_password_hash
+from app.db.writer import single_writer
+from app.models.user import User
+from app.models.game import Leaderboard
+from app.schemas.auth import UserCreate
+
+# Dialect-specific INSERT constructs that support ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+class ProvisioningStats:
+    """Running totals for a bulk provisioning job"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.read = 0
+        self.invalid = 0
+        self.created = 0
+        self.skipped = 0
+        self.batches = 0
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.time() - self.started_at
+
+    @property
+    def users_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "read": self.read,
+            "created": self.created,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "users_per_second": round(self.users_per_second, 1)
+        }
+
+def read_user_records(lines: Iterable[str]) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Stream user records from NDJSON or CSV lines.
+
+    NDJSON lines are objects with "username" and either "password" or an
+    existing bcrypt "hashed_password". CSV lines are "username,password";
+    a header row naming the columns is honoured, so a "hashed_password"
+    column can be used instead of "password".
+    """
+    columns = ["username", "password"]
+    header_allowed = True
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {}
+            yield {
+                "username": record.get("username"),
+                "password": record.get("password"),
+                "hashed_password": record.get("hashed_password"),
+            }
+            continue
+
+        values = next(csv.reader([line]))
+        if header_allowed and values and values[0] == "username":
+            columns = values
+            header_allowed = False
+            continue
+        header_allowed = False
+
+        record = dict(zip(columns, values))
+        yield {
+            "username": record.get("username"),
+            "password": record.get("password"),
+            "hashed_password": record.get("hashed_password"),
+        }
+
+def _validate(record: Dict[str, Optional[str]]) -> bool:
+    """
+    Apply the same username/password rules as signup. A pre-hashed
+    password must be a hash login can verify, or the user could never log in.
+    """
+    if not record.get("username"):
+        return False
+    if record.get("hashed_password"):
+        return (
+            record["username"].isalnum() and len(record["username"]) >= 3
+            and is_password_hash(record["hashed_password"])
+        )
+    try:
+        UserCreate(username=record["username"], password=record.get("password") or "")
+    except ValidationError:
+        return False
+    return True
+
+def _batches(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _insert_batch(db: Session, rows: List[dict]) -> int:
+    """
+    Insert users and their initial leaderboard rows, skipping usernames
+    (and leaderboard entries) that already exist. Returns the number of
+    users created.
+    """
+    conflict_insert = _CONFLICT_INSERTS[db.get_bind().dialect.name]
+
+    user_ids = db.execute(
+        conflict_insert(User)
+        .on_conflict_do_nothing(index_elements=["username"])
+        .returning(User.id),
+        rows
+    ).scalars().all()
+
+    if user_ids:
+        db.execute(
+            conflict_insert(Leaderboard)
+            .on_conflict_do_nothing(index_elements=["user_id"]),
+            [{"user_id": user_id, "total_score": 0} for user_id in user_ids]
+        )
+
+    db.commit()
+    return len(user_ids)
+
+def provision_users(
+    db: Session,
+    records: Iterable[Dict[str, Optional[str]]],
+    batch_size: int = 5000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[ProvisioningStats], None]] = None
+) -> ProvisioningStats:
+    """
+    Bulk-create users from a stream of records.
+
+    Passwords are hashed in parallel on a process pool sized for the
+    machine (records with an existing hashed_password skip hashing), and
+    users plus their initial Leaderboard rows are inserted one batch per
+    transaction with conflict-skip semantics, so the job can be re-run.
+    The leaderboard is re-ranked and its cache cleared after the last batch.
+
+    Args:
+        db: Database session
+        records: User records, e.g. from read_user_records
+        batch_size: Users inserted per transaction
+        workers: Hashing processes (defaults to the CPU count)
+        progress: Called with the running stats after each batch
+
+    Returns:
+        Final provisioning stats
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in _CONFLICT_INSERTS:
+        raise ValueError(f"Bulk provisioning is not supported on {dialect}")
+
+    stats = ProvisioningStats()
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in _batches(records, batch_size):
+            stats.read += len(batch)
+            valid = [record for record in batch if _validate(record)]
+            stats.invalid += len(batch) - len(valid)
+
+            # Hash plain-text passwords across the pool
+            to_hash = [record for record in valid if not record.get("hashed_password")]
+            chunksize = max(1, len(to_hash) // (workers * 4))
+            hashes = executor.map(
+                get_password_hash,
+                [record["password"] for record in to_hash],
+                chunksize=chunksize
+            )
+            for record, hashed_password in zip(to_hash, hashes):
+                record["hashed_password"] = hashed_password
+
+            # Drop duplicate usernames within the batch; the database skips the rest
+            rows = {}
+            for record in valid:
+                rows.setdefault(record["username"], {
+                    "username": record["username"],
+                    "hashed_password": record["hashed_password"]
+                })
+
+            # On SQLite the inserts queue behind the API's writes
+            created = single_writer.call(db, _insert_batch, list(rows.values())) if rows else 0
+            stats.created += created
+            stats.skipped += len(valid) - created
+            stats.batches += 1
+
+            if progress:
+                progress(stats)
+
+    if stats.created:
+        # New players start unranked, which keeps them off /top and /rank
+        reranker = LeaderboardReranker(settings.RERANK_CHUNK_SIZE)
+        while single_writer.call(db, reranker.step):
+            pass
+        invalidate_leaderboard_cache()
+
+    return stats
@@ -0,0 +1,196 @@
+# app/core/query_stats.py
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements kept per request for the budget log (counts cover all of them)
+MAX_RECORDED_STATEMENTS = 200
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bind parameters become ?,
+    IN lists collapse to (?...) and whitespace is folded, so repeated
+    lookups that differ only by value group together.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _BIND_PARAM.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+class QueryStats:
+    """SQL statements, rows and database time attributed to one request"""
+    
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        # (raw statement, seconds); normalized only when reported
+        self.recorded: List[Tuple[str, float]] = []
+        self.active = True
+    
+    def record(self, statement: str, rowcount: int, elapsed: float):
+        self.statements += 1
+        self.db_seconds += elapsed
+        # Drivers report -1 when the count is unknown (SELECT on SQLite)
+        if rowcount > 0:
+            self.rows += rowcount
+        if len(self.recorded) < MAX_RECORDED_STATEMENTS:
+            self.recorded.append((statement, elapsed))
+    
+    @property
+    def db_ms(self) -> float:
+        return self.db_seconds * 1000
+    
+    def grouped(self) -> List[Tuple[str, int, float]]:
+        """(normalized sql, executions, total ms), most executed first"""
+        counts: Counter = Counter()
+        seconds: Counter = Counter()
+        for statement, elapsed in self.recorded:
+            normalized = normalize_sql(statement)
+            counts[normalized] += 1
+            seconds[normalized] += elapsed
+        return [(sql, count, seconds[sql] * 1000) for sql, count in counts.most_common()]
+    
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header"""
+        return f'db;dur={self.db_ms:.2f};desc="{self.statements} queries, {self.rows} rows"'
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats for the request being handled in this context, if any"""
+    return _current_stats.get()
+
+def detach_query_stats():
+    """
+    Stop attributing statements in this context to the current request.
+    Called by background tasks, which may start before the response has
+    passed back through every middleware.
+    """
+    _current_stats.set(None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None and stats.active and context is not None:
+        context._query_stats_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is None or start is None or not stats.active:
+        return
+    stats.record(statement, cursor.rowcount, time.perf_counter() - start)
+
+_hooks_installed = False
+
+def install_query_hooks():
+    """Attribute statements on every engine to the current request's QueryStats"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _hooks_installed = True
+
+@contextmanager
+def track_queries():
+    """Collect the statements run in this context (scripts and tests)"""
+    install_query_hooks()
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.active = False
+        _current_stats.reset(token)
+
+# Callbacks given (method, route, stats) when each request finishes
+_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+@contextmanager
+def observe_requests():
+    """
+    Collect (method, route, stats) for every request finished while the
+    block runs; used by tests to hold endpoints to a query budget.
+    """
+    finished: List[Tuple[str, str, QueryStats]] = []
+    observer = lambda method, route, stats: finished.append((method, route, stats))
+    _observers.append(observer)
+    try:
+        yield finished
+    finally:
+        _observers.remove(observer)
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware giving each request its own QueryStats.
+    Attribution stops once the response body is sent, so background tasks
+    (such as the re-rank after a submit) are not charged to the request.
+    Requests over the statement or DB-time budget are logged with their
+    normalized SQL; with server_timing the totals go in a Server-Timing header.
+    """
+    
+    def __init__(
+        self,
+        app,
+        max_statements: int = 0,
+        max_db_ms: float = 0,
+        server_timing: bool = False
+    ):
+        self.app = app
+        self.max_statements = max_statements
+        self.max_db_ms = max_db_ms
+        self.server_timing = server_timing
+        install_query_hooks()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", stats.server_timing().encode())
+                ]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                stats.active = False
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            stats.active = False
+            _current_stats.reset(token)
+            self._finish(scope, stats)
+    
+    def _finish(self, scope, stats: QueryStats):
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        for observer in list(_observers):
+            observer(scope["method"], route, stats)
+        
+        over_statements = self.max_statements and stats.statements > self.max_statements
+        over_time = self.max_db_ms and stats.db_ms > self.max_db_ms
+        if over_statements or over_time:
+            print(
+                f"Query budget exceeded: {scope['method']} {route} ran {stats.statements} queries "
+                f"in {stats.db_ms:.1f}ms (budget {self.max_statements} queries, {self.max_db_ms}ms)"
+            )
+            for sql, count, elapsed_ms in stats.grouped():
+                print(f"  {count}x {elapsed_ms:.1f}ms {sql}")
@@ -0,0 +1,122 @@
+# app/core/ranking.py
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.game import Leaderboard
+
+class RerankStats:
+    """Per-chunk and running totals for a full re-rank"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.chunks: List[dict] = []
+
+    @property
+    def scanned(self) -> int:
+        return sum(chunk["scanned"] for chunk in self.chunks)
+
+    @property
+    def changed(self) -> int:
+        return sum(chunk["changed"] for chunk in self.chunks)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.time() - self.started_at
+
+    def as_dict(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "changed": self.changed,
+            "chunks": len(self.chunks),
+            "elapsed_seconds": round(self.elapsed_seconds, 3)
+        }
+
+def rerank_chunk_query(db: Session, cursor: Optional[tuple], chunk_size: int):
+    """Next chunk of (id, total_score, rank) rows after the keyset cursor"""
+    query = db.query(Leaderboard.id, Leaderboard.total_score, Leaderboard.rank)
+    if cursor is not None:
+        query = query.filter(tuple_(Leaderboard.total_score, Leaderboard.id) < cursor)
+    return query.order_by(
+        Leaderboard.total_score.desc(), Leaderboard.id.desc()
+    ).limit(chunk_size)
+
+class LeaderboardReranker:
+    """
+    Full re-rank of the global leaderboard that only writes rows whose rank
+    changed, in chunks that each commit on their own so locks stay short.
+
+    Rows are walked in (total_score DESC, id DESC) order with a keyset
+    cursor. Rank is computed as in RANK(): one more than the number of rows
+    with a strictly higher score, carried across chunk boundaries. Scores
+    that change mid-pass are picked up by the next pass.
+    """
+
+    def __init__(self, chunk_size: int = 5000, progress: Optional[Callable[[dict], None]] = None):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.stats = RerankStats()
+        # Keyset cursor: last (total_score, id) processed
+        self._cursor = None
+        # Rows processed so far, and the score and rank of the last one
+        self._position = 0
+        self._previous_score = None
+        self._previous_rank = None
+
+    def step(self, db: Session) -> bool:
+        """
+        Re-rank the next chunk and commit it.
+
+        Returns:
+            True if there may be more rows, False once the pass is complete
+        """
+        started = time.perf_counter()
+        
+        if db.get_bind().dialect.name == "postgresql":
+            # Keep rank writers from interleaving within a chunk
+            db.execute(text("SELECT pg_advisory_xact_lock(42)"))
+        
+        rows = rerank_chunk_query(db, self._cursor, self.chunk_size).all()
+        
+        changes = []
+        for row_id, total_score, current_rank in rows:
+            self._position += 1
+            if total_score != self._previous_score:
+                self._previous_score = total_score
+                self._previous_rank = self._position
+            if current_rank != self._previous_rank:
+                changes.append({"id": row_id, "rank": self._previous_rank})
+        
+        if changes:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.execute(update(Leaderboard), changes)
+        db.commit()
+        
+        if rows:
+            last_id, last_score, _ = rows[-1]
+            self._cursor = (last_score, last_id)
+        
+        chunk = {
+            "chunk": len(self.stats.chunks) + 1,
+            "scanned": len(rows),
+            "changed": len(changes),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        self.stats.chunks.append(chunk)
+        if self.progress:
+            self.progress(chunk)
+        
+        return len(rows) == self.chunk_size
+
+def rerank_leaderboard(
+    db: Session,
+    chunk_size: int = 5000,
+    progress: Optional[Callable[[dict], None]] = None
+) -> RerankStats:
+    """Run a complete write-minimizing re-rank pass"""
+    reranker = LeaderboardReranker(chunk_size, progress)
+    while reranker.step(db):
+        pass
+    return reranker.stats
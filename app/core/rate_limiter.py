@@ -6,6 +6,9 @@ from fastapi import Request, HTTPException, status
 from pydantic import BaseModel
 import threading
 
+from app.core.metrics import rate_limit_rejections
+from app.core.tracing import span
+
 # Simple in-memory storage for rate limiting
 class RateLimitStorage:
     def __init__(self):
@@ -73,10 +76,13 @@ class RateLimiter:
         self,
         limit: int = 60,
         window: int = 60,
-        key_func: Optional[Callable] = None
+        key_func: Optional[Callable] = None,
+        name: str = "default"
     ):
         self.limit = limit
         self.window = window
+        # Label for the rate_limit_rejections_total metric
+        self.name = name
         self.key_func = key_func or (lambda request: request.client.host)
     
     async def __call__(self, request: Request):
@@ -84,10 +90,11 @@ class RateLimiter:
         key = f"ratelimit:{self.key_func(request)}"
         
         # Increment counter and check if limit exceeded
-        current = rate_limit_storage.increment(key, self.window)
-        
-        # Get remaining info for headers
-        remaining_info = rate_limit_storage.get_remaining(key, self.limit)
+        with span("rate_limit", limiter=self.name):
+            current = rate_limit_storage.increment(key, self.window)
+            
+            # Get remaining info for headers
+            remaining_info = rate_limit_storage.get_remaining(key, self.limit)
         
         # Set rate limit headers
         request.state.rate_limit_remaining = remaining_info["remaining"]
@@ -95,6 +102,7 @@ class RateLimiter:
         
         # Check if limit exceeded
         if current > self.limit:
+            rate_limit_rejections.inc(self.name)
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded. Please try again later.",
@@ -110,6 +118,6 @@ class RateLimiter:
     
 
 # Define rate limiters with different limits for different endpoints
-get_leaderboard_limiter = RateLimiter(limit=120, window=60)  # 120 requests per minute
-get_player_rank_limiter = RateLimiter(limit=60, window=60)   # 60 requests per minute
-submit_score_limiter = RateLimiter(limit=10, window=60)      # 10 requests per minute
\ No newline at end of file
+get_leaderboard_limiter = RateLimiter(limit=120, window=60, name="leaderboard")  # 120 requests per minute
+get_player_rank_limiter = RateLimiter(limit=60, window=60, name="player_rank")   # 60 requests per minute
+submit_score_limiter = RateLimiter(limit=10, window=60, name="submit_score")     # 10 requests per minute
\ No newline at end of file
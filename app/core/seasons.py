@@ -0,0 +1,169 @@
+# app/core/seasons.py
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, UniqueConstraint, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_leaderboard_cache, invalidate_player_rank_cache
+from app.models.game import GameSession, Leaderboard, ModeLeaderboard, Season
+
+# Tables that start empty every season; their rows move to per-season archives
+SEASON_TABLES = (Leaderboard.__table__, ModeLeaderboard.__table__)
+
+# Table objects for archived seasons, built on demand for history queries
+_archive_metadata = MetaData()
+
+def archive_table_name(name: str, season_id: int) -> str:
+    """Name of a table or index once archived with its season"""
+    return f"{name}_season_{season_id}"
+
+def archive_table(table: Table, season_id: int) -> Table:
+    """The archived copy of a season table, for querying"""
+    name = archive_table_name(table.name, season_id)
+    if name in _archive_metadata.tables:
+        return _archive_metadata.tables[name]
+    return table.to_metadata(_archive_metadata, name=name)
+
+def _index_names(table: Table, dialect: str) -> List[str]:
+    """Indexes whose names the fresh table needs back"""
+    names = [index.name for index in table.indexes]
+    if dialect == "postgresql":
+        # Unique constraints and the primary key are backed by named indexes
+        names += [
+            constraint.name for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint) and constraint.name
+        ]
+        names.append(f"{table.name}_pkey")
+    return names
+
+def _archive(db: Session, table: Table, season_id: int, dialect: str):
+    """Rename a season table to its archive and create an empty replacement"""
+    archive_name = archive_table_name(table.name, season_id)
+    db.execute(text(f"ALTER TABLE {table.name} RENAME TO {archive_name}"))
+    
+    for index_name in _index_names(table, dialect):
+        if dialect == "postgresql":
+            # Renaming keeps the archive indexed without rebuilding anything
+            db.execute(text(
+                f"ALTER INDEX IF EXISTS {index_name} RENAME TO {archive_table_name(index_name, season_id)}"
+            ))
+        else:
+            # SQLite index names are schema-wide and cannot be renamed
+            db.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    
+    table.create(bind=db.connection())
+    
+    if dialect != "postgresql":
+        for index in table.indexes:
+            columns = ", ".join(column.name for column in index.columns)
+            unique = "UNIQUE " if index.unique else ""
+            db.execute(text(
+                f"CREATE {unique}INDEX {archive_table_name(index.name, season_id)} "
+                f"ON {archive_name} ({columns})"
+            ))
+
+def rollover_season(db: Session, name: Optional[str] = None) -> Season:
+    """
+    Close the current season and start an empty one.
+
+    leaderboard and mode_leaderboard are renamed to per-season archive
+    tables and replaced by empty tables in a single transaction, so the
+    reset costs a brief exclusive lock instead of a full-table DELETE.
+    Ranking caches are cleared once the swap commits.
+
+    Args:
+        db: Database session
+        name: Name of the new season (defaults to "Season <n>")
+
+    Returns:
+        The season that was closed
+    """
+    dialect = db.get_bind().dialect.name
+    now = datetime.now(timezone.utc)
+    
+    try:
+        if dialect == "postgresql":
+            # Readers queue behind the exclusive lock, so never wait long for it
+            db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            db.execute(text("LOCK TABLE leaderboard, mode_leaderboard IN ACCESS EXCLUSIVE MODE"))
+        
+        current = db.query(Season).filter(
+            Season.ended_at.is_(None)
+        ).order_by(Season.id.desc()).with_for_update().first()
+        if current is None:
+            # First rollover: the season so far started with the first game
+            first_game = db.query(func.min(GameSession.timestamp)).scalar()
+            current = Season(name="Season 1", started_at=first_game or now)
+            db.add(current)
+        
+        current.players = db.query(func.count(Leaderboard.id)).scalar()
+        current.ended_at = now
+        # Flush so the DDL below runs inside the same transaction on SQLite
+        db.flush()
+        
+        for table in SEASON_TABLES:
+            _archive(db, table, current.id, dialect)
+        
+        db.add(Season(name=name or f"Season {current.id + 1}", started_at=now))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    # Only this process's caches: other workers serve the old season's
+    # standings until their TTL expires (see README, Seasons)
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    return current
+
+def get_archived_season(db: Session, season_id: int) -> Optional[Season]:
+    """A closed season, or None if it does not exist or is still running"""
+    return db.query(Season).filter(
+        Season.id == season_id, Season.ended_at.isnot(None)
+    ).first()
+
+def _archived_board(season_id: int, game_mode: Optional[str]):
+    """Archive table and row filters for a season's global or per-mode board"""
+    if game_mode:
+        board = archive_table(ModeLeaderboard.__table__, season_id)
+        return board, (board.c.game_mode == game_mode,)
+    return archive_table(Leaderboard.__table__, season_id), ()
+
+def season_page(
+    db: Session, season_id: int, game_mode: Optional[str], offset: int, limit: int
+) -> Tuple[int, list]:
+    """
+    Return (total_entries, rows) for one page of an archived season.
+    Final ranks are computed from total_score, as stored ranks may lag the
+    last submits of the season.
+    """
+    board, filters = _archived_board(season_id, game_mode)
+    total_entries = db.execute(
+        select(func.count()).select_from(board).where(*filters)
+    ).scalar()
+    rows = db.execute(
+        select(
+            func.rank().over(order_by=board.c.total_score.desc()).label('rank'),
+            board.c.total_score.label('total_score'),
+            board.c.user_id.label('user_id')
+        ).where(*filters).order_by(
+            board.c.total_score.desc(), board.c.user_id
+        ).offset(offset).limit(limit)
+    ).all()
+    return total_entries, rows
+
+def season_player_entry(
+    db: Session, season_id: int, user_id: int, game_mode: Optional[str]
+) -> Optional[Tuple[int, int]]:
+    """Return the user's final (rank, total_score) in an archived season, or None"""
+    board, filters = _archived_board(season_id, game_mode)
+    total_score = db.execute(
+        select(board.c.total_score).where(board.c.user_id == user_id, *filters)
+    ).scalar()
+    if total_score is None:
+        return None
+    ahead = db.execute(
+        select(func.count()).select_from(board).where(board.c.total_score > total_score, *filters)
+    ).scalar()
+    return ahead + 1, total_score
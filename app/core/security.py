@@ -1,15 +1,25 @@
 # app/core/security.py
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Optional, Union, Any, Tuple
 
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.core.errors import ServiceUnavailableError
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes created with a different cost are flagged for update on verify
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 # OAuth2 password bearer token scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
@@ -22,6 +32,98 @@ def get_password_hash(password: str) -> str:
     """Generate a hash from a password."""
     return pwd_context.hash(password)
 
+def is_password_hash(value: str) -> bool:
+    """Whether value is a well-formed hash pwd_context can verify (e.g. bcrypt)"""
+    scheme = pwd_context.identify(value)
+    if scheme is None:
+        return False
+    try:
+        pwd_context.handler(scheme).from_string(value)
+    except ValueError:
+        return False
+    return True
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one
+    was created with an outdated cost factor.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited process pool so login and
+    signup bursts do not starve the workers serving leaderboard reads.
+    
+    At most max_workers jobs run at once and max_pending more may queue;
+    beyond that callers get a ServiceUnavailableError (503) immediately.
+    """
+    
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+    
+    @property
+    def capacity(self) -> int:
+        """Total number of jobs allowed to run or wait at once"""
+        return max(self.max_workers, 1) + self.max_pending
+    
+    def _get_executor(self) -> Optional[Executor]:
+        """Create the process pool on first use"""
+        if self.max_workers <= 0:
+            return None
+        with self.lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+    
+    def _acquire(self):
+        with self.lock:
+            if self.in_flight >= self.capacity:
+                raise ServiceUnavailableError(
+                    detail="Authentication service is busy, please retry shortly"
+                )
+            self.in_flight += 1
+    
+    def _release(self):
+        with self.lock:
+            self.in_flight -= 1
+    
+    async def _run(self, func, *args):
+        self._acquire()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(func, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            self._release()
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool"""
+        return await self._run(get_password_hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password on the worker pool, returning (valid, new_hash)"""
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+    
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
 def create_access_token(
     subject: Union[str, Any], 
     expires_delta: Optional[timedelta] = None
@@ -0,0 +1,196 @@
+# app/core/sharding.py
+import asyncio
+import heapq
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.db.shards import ShardSet
+from app.models.game import GameSession, GameSessionDaily, Leaderboard, Season
+
+class RankedRow(NamedTuple):
+    """A global leaderboard row with its rank across all shards"""
+    rank: int
+    total_score: int
+    user_id: int
+
+def _count_entries(db: Session) -> int:
+    return db.query(func.count(Leaderboard.id)).scalar()
+
+def _top_totals(db: Session, limit: int) -> List[Tuple[int, int]]:
+    """This shard's best (total_score, user_id) rows in global order"""
+    return [
+        tuple(row) for row in db.query(Leaderboard.total_score, Leaderboard.user_id).order_by(
+            Leaderboard.total_score.desc(), Leaderboard.user_id
+        ).limit(limit).all()
+    ]
+
+def _total_for(db: Session, user_id: int) -> Optional[int]:
+    return db.query(Leaderboard.total_score).filter(Leaderboard.user_id == user_id).scalar()
+
+def _totals_for(db: Session, user_ids: List[int]) -> Dict[int, int]:
+    return dict(db.query(Leaderboard.user_id, Leaderboard.total_score).filter(
+        Leaderboard.user_id.in_(user_ids)
+    ).all())
+
+def _count_above(db: Session, total_score: int) -> int:
+    return db.query(func.count(Leaderboard.id)).filter(Leaderboard.total_score > total_score).scalar()
+
+def _count_above_each(db: Session, totals: List[int]) -> List[int]:
+    """Players above each of the totals, counted in one scan"""
+    return list(db.query(*(
+        func.count(case((Leaderboard.total_score > total_score, 1))) for total_score in totals
+    )).one())
+
+def add_shard_score(db: Session, user_id: int, score: int):
+    """Add a score to the user's total on its owning shard and commit"""
+    try:
+        entry = db.query(Leaderboard).filter(
+            Leaderboard.user_id == user_id
+        ).with_for_update().first()
+        if entry:
+            entry.total_score += score
+        else:
+            db.add(Leaderboard(user_id=user_id, total_score=score))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def set_shard_score(db: Session, user_id: int, total_score: int):
+    """Overwrite the user's total on its owning shard and commit"""
+    try:
+        entry = db.query(Leaderboard).filter(
+            Leaderboard.user_id == user_id
+        ).with_for_update().first()
+        if entry:
+            entry.total_score = total_score
+        else:
+            db.add(Leaderboard(user_id=user_id, total_score=total_score))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def season_total(db: Session, user_id: int) -> int:
+    """
+    The user's global total for the running season, rebuilt from the
+    primary's game sessions and the daily rollups of expired partitions
+    """
+    started_at = db.query(Season.started_at).filter(
+        Season.ended_at.is_(None)
+    ).order_by(Season.id.desc()).first()
+    
+    sessions = db.query(func.coalesce(func.sum(GameSession.score), 0)).filter(GameSession.user_id == user_id)
+    rollups = db.query(func.coalesce(func.sum(GameSessionDaily.total_score), 0)).filter(
+        GameSessionDaily.user_id == user_id
+    )
+    if started_at is not None:
+        sessions = sessions.filter(GameSession.timestamp >= started_at[0])
+        rollups = rollups.filter(GameSessionDaily.day >= started_at[0].date())
+    return sessions.scalar() + rollups.scalar()
+
+def copy_leaderboard_to_shards(db: Session, shards: ShardSet, batch_size: int = 5000) -> int:
+    """
+    Seed the shards from the primary's leaderboard table, e.g. when sharding
+    is switched on for an existing board. Users already on their shard are
+    skipped, so the copy can be re-run. Returns the number of rows copied.
+    """
+    copied = 0
+    last_user_id = None
+    while True:
+        query = db.query(Leaderboard.user_id, Leaderboard.total_score)
+        if last_user_id is not None:
+            query = query.filter(Leaderboard.user_id > last_user_id)
+        rows = query.order_by(Leaderboard.user_id).limit(batch_size).all()
+        if not rows:
+            return copied
+        last_user_id = rows[-1].user_id
+        
+        by_shard = defaultdict(list)
+        for user_id, total_score in rows:
+            by_shard[shards.index_for(user_id)].append((user_id, total_score))
+        
+        for index, shard_rows in by_shard.items():
+            shard_db = shards.session(index)
+            try:
+                existing = {
+                    user_id for user_id, in shard_db.query(Leaderboard.user_id).filter(
+                        Leaderboard.user_id.in_([user_id for user_id, _ in shard_rows])
+                    )
+                }
+                new_rows = [
+                    {"user_id": user_id, "total_score": total_score}
+                    for user_id, total_score in shard_rows if user_id not in existing
+                ]
+                if new_rows:
+                    shard_db.execute(Leaderboard.__table__.insert(), new_rows)
+                shard_db.commit()
+                copied += len(new_rows)
+            except Exception:
+                shard_db.rollback()
+                raise
+            finally:
+                shard_db.close()
+
+async def sharded_page(shards: ShardSet, offset: int, limit: int) -> Tuple[int, List[RankedRow]]:
+    """
+    Return (total_entries, rows) for one page of the sharded leaderboard.
+    Each shard returns its top offset + limit rows already sorted; a k-way
+    heap merge of those streams yields the exact global prefix, so RANK()
+    numbering can be assigned while merging.
+    """
+    counts, streams = await asyncio.gather(
+        shards.gather(_count_entries),
+        shards.gather(_top_totals, offset + limit)
+    )
+    
+    merged = heapq.merge(*streams, key=lambda row: (-row[0], row[1]))
+    rows = []
+    rank = 0
+    previous_score = None
+    for position, (total_score, user_id) in enumerate(islice(merged, offset + limit), start=1):
+        if total_score != previous_score:
+            rank = position
+            previous_score = total_score
+        if position > offset:
+            rows.append(RankedRow(rank, total_score, user_id))
+    return sum(counts), rows
+
+async def sharded_player_entry(shards: ShardSet, user_id: int) -> Optional[Tuple[int, int]]:
+    """
+    Return the user's (rank, total_score) on the sharded leaderboard, or None.
+    Rank is one more than the players ahead, counted on every shard in parallel.
+    """
+    total_score = await shards.run_for(user_id, _total_for, user_id)
+    if total_score is None:
+        return None
+    ahead = await shards.gather(_count_above, total_score)
+    return sum(ahead) + 1, total_score
+
+async def sharded_player_entries(shards: ShardSet, user_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Return {user_id: (rank, total_score)} on the sharded leaderboard for
+    the ranked users among user_ids. Totals are read with one IN query per
+    owning shard, then every shard counts the players above each distinct
+    total in one query; both rounds run on the shards in parallel.
+    """
+    by_shard = defaultdict(list)
+    for user_id in user_ids:
+        by_shard[shards.index_for(user_id)].append(user_id)
+    
+    totals = {}
+    for found in await asyncio.gather(*(
+        shards.run_on(index, _totals_for, shard_user_ids) for index, shard_user_ids in by_shard.items()
+    )):
+        totals.update(found)
+    if not totals:
+        return {}
+    
+    distinct = sorted(set(totals.values()))
+    ahead = await shards.gather(_count_above_each, distinct)
+    ranks = {total_score: sum(counts) + 1 for total_score, counts in zip(distinct, zip(*ahead))}
+    return {user_id: (ranks[total_score], total_score) for user_id, total_score in totals.items()}
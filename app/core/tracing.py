@@ -0,0 +1,303 @@
+# app/core/tracing.py
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.query_stats import normalize_sql
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+class Span:
+    """
+    A timed stage of a request. Used as a context manager it becomes the
+    current span, so spans opened inside it (in this task, child tasks, the
+    thread pool or the single writer) are its children.
+    """
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes", "links",
+        "start_time", "_start", "_end", "error", "_token", "_endpoint_end"
+    )
+    
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[dict] = None,
+        links: Optional[List["Span"]] = None,
+        start: Optional[float] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.links = [{"trace_id": link.trace_id, "span_id": link.span_id} for link in links or ()]
+        self._start = time.perf_counter() if start is None else start
+        self.start_time = time.time() - (time.perf_counter() - self._start)
+        self._end: Optional[float] = None
+        self.error: Optional[str] = None
+        self._token = None
+        self._endpoint_end: Optional[float] = None
+    
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+    
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(name, self.trace_id, self.span_id, attributes)
+    
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self._end is None else (self._end - self._start) * 1000
+    
+    def finish(self, end: Optional[float] = None):
+        """End the span and export it (only the first call counts)"""
+        if self._end is not None:
+            return
+        self._end = time.perf_counter() if end is None else end
+        tracer.export(self)
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.finish()
+        return False
+    
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start_time, 6),
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "links": self.links,
+            "error": self.error,
+        }
+
+class _NoopSpan:
+    """Stands in for a span when the request is not sampled"""
+    trace_id = span_id = None
+    
+    def set(self, **attributes):
+        pass
+    
+    def finish(self, end: Optional[float] = None):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def span(name: str, **attributes):
+    """
+    A child of the current span, or a shared no-op when this request is not
+    being traced (one ContextVar lookup, nothing allocated).
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+class RingBufferExporter:
+    """Keeps the most recent spans in memory"""
+    
+    def __init__(self, size: int = 1000):
+        self._spans: deque = deque(maxlen=size)
+    
+    def __call__(self, finished: Span):
+        self._spans.append(finished.as_dict())
+    
+    def spans(self, trace_id: Optional[str] = None) -> List[dict]:
+        spans = list(self._spans)
+        if trace_id is not None:
+            spans = [finished for finished in spans if finished["trace_id"] == trace_id]
+        return spans
+    
+    def clear(self):
+        self._spans.clear()
+
+class JsonLinesExporter:
+    """Appends each finished span to a file as one JSON object per line"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+    
+    def __call__(self, finished: Span):
+        line = json.dumps(finished.as_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class Tracer:
+    """Sampling decisions and the exporters finished spans are sent to"""
+    
+    def __init__(self, sample_rate: float = 0.0):
+        self.sample_rate = sample_rate
+        self.exporters: List[Callable[[Span], None]] = []
+    
+    def add_exporter(self, exporter: Callable[[Span], None]):
+        self.exporters.append(exporter)
+    
+    def remove_exporter(self, exporter: Callable[[Span], None]):
+        self.exporters.remove(exporter)
+    
+    def export(self, finished: Span):
+        for exporter in self.exporters:
+            try:
+                exporter(finished)
+            except Exception as e:
+                print(f"Error exporting span: {str(e)}")
+    
+    def start_trace(self, name: str, links: Optional[List[Span]] = None, **attributes):
+        """
+        A root span for a new trace, or NOOP_SPAN if it is not sampled.
+        Work linked to a sampled span (the re-rank after a traced submit)
+        is always sampled so the pair can be followed.
+        """
+        links = [link for link in links or () if link is not None]
+        if not links and not (self.sample_rate and random.random() < self.sample_rate):
+            return NOOP_SPAN
+        return Span(name, _new_id(128), None, attributes, links)
+
+# Global tracer; exporters are added in app/main.py and start_app.py
+tracer = Tracer()
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the root span of each sampled request.
+    The root span ends when the response body is sent, before any
+    background tasks run.
+    """
+    
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        root = self.tracer.start_trace("http.request", method=scope["method"], path=scope["path"])
+        if root is NOOP_SPAN:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_span(message):
+            if message["type"] == "http.response.start":
+                root.set(status=message["status"])
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                root.set(route=getattr(scope.get("route"), "path", None))
+                root.finish()
+        
+        with root:
+            await self.app(scope, receive, send_with_span)
+
+def _traced_endpoint(call: Callable) -> Callable:
+    """Wrap an endpoint in an "endpoint" span, noting when it returned"""
+    def mark_end():
+        parent = _current_span.get()
+        if parent is not None:
+            parent._endpoint_end = time.perf_counter()
+    
+    if asyncio.iscoroutinefunction(call):
+        @wraps(call)
+        async def endpoint(*args, **kwargs):
+            with span("endpoint"):
+                result = await call(*args, **kwargs)
+            mark_end()
+            return result
+    else:
+        @wraps(call)
+        def endpoint(*args, **kwargs):
+            with span("endpoint"):
+                result = call(*args, **kwargs)
+            mark_end()
+            return result
+    return endpoint
+
+class TracedRoute(APIRoute):
+    """
+    Route class adding "handler", "endpoint" and "serialize" spans. The
+    serialize span covers response validation and rendering, from the
+    endpoint returning until FastAPI has built the response.
+    """
+    
+    def get_route_handler(self) -> Callable:
+        self.dependant.call = _traced_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+        
+        async def traced_handler(request):
+            with span("handler", route=self.path) as handler_span:
+                response = await handler(request)
+                if handler_span is not NOOP_SPAN and handler_span._endpoint_end is not None:
+                    serialize = Span(
+                        "serialize", handler_span.trace_id, handler_span.span_id,
+                        start=handler_span._endpoint_end
+                    )
+                    serialize.finish()
+            return response
+        
+        return traced_handler
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is not None and context is not None:
+        context._trace_span = parent.child("db.query", statement=normalize_sql(statement))
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_span = getattr(context, "_trace_span", None)
+    if query_span is not None:
+        query_span.set(rows=cursor.rowcount)
+        query_span.finish()
+
+def _handle_error(exception_context):
+    query_span = getattr(exception_context.execution_context, "_trace_span", None)
+    if query_span is not None:
+        query_span.error = str(exception_context.original_exception)
+        query_span.finish()
+
+_db_tracing_installed = False
+
+def install_db_tracing():
+    """Add a db.query span for every statement run inside a traced request"""
+    global _db_tracing_installed
+    if _db_tracing_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _db_tracing_installed = True
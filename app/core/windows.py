@@ -0,0 +1,74 @@
+# app/core/windows.py
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.game import WindowLeaderboard
+
+# Time windows with their own leaderboards ("all" is the all-time board)
+WINDOWS = ("day", "week")
+
+# Period start of the last rotation per window, so expired periods are
+# deleted once per period rather than on every submit
+_last_rotation: Dict[str, date] = {}
+
+def period_start(window: str, now: Optional[datetime] = None) -> date:
+    """Start of the current period for a window (UTC day, ISO week starting Monday)"""
+    today = (now or datetime.now(timezone.utc)).date()
+    if window == "day":
+        return today
+    if window == "week":
+        return today - timedelta(days=today.weekday())
+    raise ValueError(f"Unknown leaderboard window: {window}")
+
+def expired_before(window: str, now: Optional[datetime] = None) -> date:
+    """Periods starting before this date are no longer retained"""
+    current = period_start(window, now)
+    step = timedelta(days=1 if window == "day" else 7)
+    return current - step * settings.WINDOW_RETAINED_PERIODS
+
+def add_window_scores(db: Session, user_id: int, score: int, now: Optional[datetime] = None):
+    """Add a score to the user's current day and week totals (caller commits)"""
+    for window in WINDOWS:
+        start = period_start(window, now)
+        entry = db.query(WindowLeaderboard).filter(
+            WindowLeaderboard.period == window,
+            WindowLeaderboard.period_start == start,
+            WindowLeaderboard.user_id == user_id
+        ).with_for_update().first()
+
+        if entry:
+            entry.total_score += score
+        else:
+            db.add(WindowLeaderboard(
+                period=window,
+                period_start=start,
+                user_id=user_id,
+                total_score=score
+            ))
+
+def rotate_windows(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete periods that fell out of the retention window.
+    Runs at most once per period per window; each delete is a range
+    on (period, period_start), never a full-table delete.
+
+    Returns:
+        Number of rows deleted
+    """
+    deleted = 0
+    for window in WINDOWS:
+        start = period_start(window, now)
+        if _last_rotation.get(window) == start:
+            continue
+
+        deleted += db.query(WindowLeaderboard).filter(
+            WindowLeaderboard.period == window,
+            WindowLeaderboard.period_start < expired_before(window, now)
+        ).delete(synchronize_session=False)
+        db.commit()
+        _last_rotation[window] = start
+
+    return deleted
@@ -0,0 +1,94 @@
+# app/db/replicas.py
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+class ReplicaRouter:
+    """
+    Picks a read replica for read-only endpoints.
+    Replicas that fail to connect are skipped for retry_seconds; when no
+    replica is usable the caller falls back to the primary. Users who
+    submitted within read_your_writes_seconds are kept on the primary so
+    they never read a rank older than their own write.
+    """
+    def __init__(
+        self,
+        engines: List[Engine],
+        strategy: str = "round_robin",
+        retry_seconds: int = 30,
+        read_your_writes_seconds: int = 0
+    ):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._sessions = sessionmaker(autocommit=False, autoflush=False)
+        self._recent_writes = (
+            TTLCache(maxsize=100000, ttl=read_your_writes_seconds)
+            if read_your_writes_seconds > 0 else None
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> List[Engine]:
+        """Healthy replicas in the order they should be tried"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                engine for index, engine in enumerate(self.engines)
+                if self._down_until.get(index, 0) <= now
+            ]
+        if not healthy:
+            return []
+        
+        if self.strategy == "least_connections":
+            # Pools without checkout tracking (e.g. StaticPool) count as idle
+            return sorted(healthy, key=lambda engine: getattr(engine.pool, "checkedout", lambda: 0)())
+        
+        start = next(self._next) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, engine: Engine):
+        """Skip a replica until retry_seconds have passed"""
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_seconds
+
+    def session(self) -> Optional[Session]:
+        """Open a session on the first replica that accepts a connection, or None"""
+        for engine in self.candidates():
+            db = self._sessions(bind=engine)
+            try:
+                # Connect eagerly so an unreachable replica is detected here
+                db.connection()
+                return db
+            except OperationalError as e:
+                db.close()
+                self.mark_down(engine)
+                print(f"Replica {engine.url!r} unavailable, skipping: {str(e)}")
+        return None
+
+    def record_write(self, user_id: int):
+        """Pin the user's reads to the primary for the read-your-writes window"""
+        if self._recent_writes is not None:
+            with self._lock:
+                self._recent_writes[str(user_id)] = True
+
+    def wrote_recently(self, user_id) -> bool:
+        """Whether the user is inside their read-your-writes window"""
+        if self._recent_writes is None or user_id is None:
+            return False
+        with self._lock:
+            return str(user_id) in self._recent_writes
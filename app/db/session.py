@@ -1,12 +1,62 @@
 # app/db/session.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
+from app.db.replicas import ReplicaRouter
+from app.db.shards import ShardSet
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+def configure_sqlite(engine):
+    """
+    Apply the SQLite performance settings to every new connection:
+    WAL so readers never block the writer, relaxed fsync, memory-mapped
+    I/O, a larger page cache and a busy timeout for cross-process writers.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def make_engine(url: str):
+    """Create an engine, applying the SQLite settings for sqlite URLs"""
+    if url.startswith("sqlite"):
+        # Sessions are handed between the event loop, the thread pool and the
+        # single writer thread, so connections must not be pinned to one thread
+        sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+        configure_sqlite(sqlite_engine)
+        return sqlite_engine
+    return create_engine(url)
+
+# Create SQLAlchemy engine (the primary; all writes go here)
+engine = make_engine(settings.DATABASE_URL)
+
+# Read replicas for read-only endpoints
+replica_router = ReplicaRouter(
+    [make_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    strategy=settings.REPLICA_SELECTION,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS
+)
+
+# Shards for the global leaderboard (empty when it lives in the primary)
+leaderboard_shards = ShardSet(
+    [make_engine(url.strip()) for url in settings.LEADERBOARD_SHARD_URLS.split(",") if url.strip()]
+)
+
+def named_engines() -> dict:
+    """Every engine the app holds, labelled for pool metrics"""
+    engines = {"primary": engine}
+    engines.update({f"replica{index}": replica for index, replica in enumerate(replica_router.engines)})
+    engines.update({f"shard{index}": shard for index, shard in enumerate(leaderboard_shards.engines)})
+    return engines
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -20,4 +70,26 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get a read-only database session
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Yield a replica session when one is configured and reachable,
+    otherwise the primary session. Requests for a user_id inside its
+    read-your-writes window stay on the primary.
+    """
+    user_id = request.path_params.get("user_id")
+    if not replica_router or replica_router.wrote_recently(user_id):
+        yield db
+        return
+    
+    replica = replica_router.session()
+    if replica is None:
+        yield db
+        return
+    
+    try:
+        yield replica
+    finally:
+        replica.close()
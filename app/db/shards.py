@@ -0,0 +1,87 @@
+# app/db/shards.py
+import asyncio
+import zlib
+from typing import Any, Callable, List
+
+from sqlalchemy import Column, Index, MetaData, Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+def shard_index(user_id: int, shard_count: int) -> int:
+    """Owning shard of a user; stable across processes and restarts"""
+    return zlib.crc32(int(user_id).to_bytes(8, "little", signed=True)) % shard_count
+
+def shard_table(table: Table) -> Table:
+    """
+    Copy of a table for a shard database: same columns and indexes, but no
+    foreign keys, since users live in the primary database.
+    """
+    metadata = MetaData()
+    columns = [
+        Column(
+            column.name, column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+            default=column.default.arg if column.default is not None else None
+        ) for column in table.columns
+    ]
+    shard = Table(table.name, metadata, *columns)
+    for index in table.indexes:
+        Index(index.name, *[shard.c[column.name] for column in index.columns], unique=index.unique)
+    return shard
+
+class ShardSet:
+    """
+    Databases holding one slice each of a table sharded by user_id hash.
+    Scatter queries run on every shard in parallel, each in its own session.
+    """
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self._sessions = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in engines
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def session(self, index: int) -> Session:
+        return self._sessions[index]()
+
+    def session_for(self, user_id: int) -> Session:
+        """A new session on the shard owning the user"""
+        return self.session(self.index_for(user_id))
+
+    def _run(self, index: int, func: Callable[..., Any], *args) -> Any:
+        db = self.session(index)
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+
+    def index_for(self, user_id: int) -> int:
+        """Index of the shard owning the user"""
+        return shard_index(user_id, len(self))
+
+    async def run_on(self, index: int, func: Callable[..., Any], *args) -> Any:
+        """Run func(db, *args) on one shard"""
+        return await run_in_threadpool(self._run, index, func, *args)
+
+    async def run_for(self, user_id: int, func: Callable[..., Any], *args) -> Any:
+        """Run func(db, *args) on the shard owning the user"""
+        return await self.run_on(self.index_for(user_id), func, *args)
+
+    async def gather(self, func: Callable[..., Any], *args) -> List[Any]:
+        """Run func(db, *args) on every shard in parallel; results in shard order"""
+        return await asyncio.gather(*(
+            run_in_threadpool(self._run, index, func, *args) for index in range(len(self))
+        ))
+
+    def create_schema(self, tables: List[Table]):
+        """Create the sharded tables on every shard"""
+        for engine in self.engines:
+            for table in tables:
+                shard_table(table).create(bind=engine, checkfirst=True)
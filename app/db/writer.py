@@ -0,0 +1,93 @@
+# app/db/writer.py
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.tracing import span
+
+class SingleWriter:
+    """
+    Runs write transactions one at a time on a dedicated thread when the
+    database is SQLite. SQLite allows a single writer per database, so
+    queueing writes in-process avoids SQLITE_BUSY waits on the event loop.
+    On other databases the function runs on the thread pool, so row and
+    advisory lock waits never block the event loop.
+    """
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of writes waiting for the writer thread"""
+        return self._queue.qsize()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._work, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            func, args, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    async def run(self, db: Session, func: Callable[..., Any], *args) -> Any:
+        """
+        Run func(db, *args) as the only writer, returning its result.
+        func owns the transaction: it commits, or rolls back and raises.
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            return await run_in_threadpool(func, db, *args)
+
+        # The span covers the queue wait; spans opened by func are its children
+        with span("single_writer", queued=self.pending):
+            return await asyncio.wrap_future(self._submit(db, func, *args))
+
+    def call(self, db: Session, func: Callable[..., Any], *args) -> Any:
+        """
+        Blocking run() for code outside the event loop, e.g. sync endpoints
+        on the thread pool and command-line jobs.
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            return func(db, *args)
+
+        with span("single_writer", queued=self.pending):
+            return self._submit(db, func, *args).result()
+
+    def _submit(self, db: Session, func: Callable[..., Any], *args) -> Future:
+        future: Future = Future()
+        self._ensure_thread()
+        # Run in the caller's context so per-request state (query stats) follows the write
+        context = contextvars.copy_context()
+        self._queue.put((context.run, (func, db) + args, future))
+        return future
+
+    def shutdown(self):
+        """Finish queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+# Global writer for score submits and rank maintenance
+single_writer = SingleWriter()
@@ -1,14 +1,28 @@
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
+import time
 
-import newrelic.agent
-from starlette.middleware.base import BaseHTTPMiddleware
+# Measured from here so startup timing covers framework and app imports
+IMPORT_STARTED = time.perf_counter()
 
-import time
+import os
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api import api_router
-from app.core.middleware import APISecurityMiddleware
+from app.api.dependencies import require_admin
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, pool_collector, registry
+from app.core.middleware import APISecurityMiddleware, DEFAULT_SCAN_EXEMPT_ROUTES
+from app.core.profiler import ProfilerMiddleware, profiler
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.tracing import (
+    JsonLinesExporter, RingBufferExporter, TracingMiddleware, install_db_tracing, tracer
+)
+from app.core.security import password_hasher
+from app.db.session import named_engines
+from app.db.writer import single_writer
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,6 +34,16 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Add the sampling profiler first so it is the innermost middleware and
+# the endpoint runs in the task it profiles; not installed when disabled
+if settings.PROFILER_ENABLED:
+    profiler.interval = settings.PROFILE_INTERVAL_MS / 1000
+    app.add_middleware(
+        ProfilerMiddleware,
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        admin_key=settings.ADMIN_API_KEY
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,19 +54,47 @@ app.add_middleware(
 )
 
 # Add API security middleware
-app.add_middleware(APISecurityMiddleware)
+# Routes listed here skip the suspicious-pattern scan: fixed paths and
+# routes whose parameters are all integers
+app.add_middleware(
+    APISecurityMiddleware,
+    scan_exempt_routes=DEFAULT_SCAN_EXEMPT_ROUTES + [
+        "/metrics",
+        f"{settings.API_V1_PREFIX}/leaderboard/rank/{{user_id}}",
+    ]
+)
 
-# Add request timing middleware for performance monitoring
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Attribute SQL statements and DB time to each request, logging requests
+# over the query budget
+app.add_middleware(
+    QueryStatsMiddleware,
+    max_statements=settings.QUERY_BUDGET_STATEMENTS,
+    max_db_ms=settings.QUERY_BUDGET_DB_MS,
+    server_timing=settings.SERVER_TIMING
+)
+
+# Trace a sample of requests: spans for the rate limiter, security scan,
+# caches, DB statements, locks, serialization and the background re-rank.
+# Unsampled requests only pay a ContextVar lookup per instrumented stage.
+tracer.sample_rate = settings.TRACE_SAMPLE_RATE
+trace_buffer = RingBufferExporter(settings.TRACE_BUFFER_SIZE)
+tracer.add_exporter(trace_buffer)
+trace_file = JsonLinesExporter(settings.TRACE_FILE) if settings.TRACE_FILE else None
+if trace_file:
+    tracer.add_exporter(trace_file)
+install_db_tracing()
+app.add_middleware(TracingMiddleware)
+
+# Record request latency and in-flight requests for /metrics.
+# Added last so it is the outermost middleware and times the whole stack;
+# X-Process-Time is set by APISecurityMiddleware.
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+    registry.register_collector(pool_collector(named_engines))
 
 
 # Add New Relic middleware for tracking requests
+# (New Relic is only imported by start_app.py; see run.py serve --newrelic)
 # class NewRelicMiddleware(BaseHTTPMiddleware):
 #     async def dispatch(self, request, call_next):
 #         start_time = time.time()
@@ -66,6 +118,45 @@ async def add_process_time_header(request: Request, call_next):
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+@app.get("/debug/traces", include_in_schema=False, dependencies=[Depends(require_admin)])
+def traces(trace_id: Optional[str] = None):
+    """Recently finished spans, optionally for one trace."""
+    return {"spans": trace_buffer.spans(trace_id)}
+
+# Imports and app construction are done
+IMPORT_FINISHED = time.perf_counter()
+
+@app.on_event("startup")
+def report_startup_time():
+    """Log how long this worker took to import the app and become ready."""
+    ready = time.perf_counter()
+    app.state.startup_seconds = ready - IMPORT_STARTED
+    message = (
+        f"Worker {os.getpid()} ready in {app.state.startup_seconds:.2f}s "
+        f"(imports {IMPORT_FINISHED - IMPORT_STARTED:.2f}s)"
+    )
+    # Set by run.py serve, so the time spent spawning the worker is included
+    launched_at = os.getenv("SERVE_LAUNCHED_AT")
+    if launched_at:
+        message += f", {time.time() - float(launched_at):.2f}s after launch"
+    print(message)
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    """Stop the bcrypt worker processes."""
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_single_writer():
+    """Flush queued SQLite writes and stop the writer thread."""
+    single_writer.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_trace_file():
+    """Flush and close the trace file."""
+    if trace_file:
+        trace_file.close()
+
 @app.get("/")
 async def root():
     """Root endpoint for health check."""
@@ -80,6 +171,21 @@ async def health():
     """Health check endpoint."""
     return {"status": "ok"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics in the text exposition format."""
+        return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+if settings.PROFILER_ENABLED:
+    @app.get("/debug/profile", include_in_schema=False, dependencies=[Depends(require_admin)])
+    def profile(route: Optional[str] = None, reset: bool = False):
+        """Profiler samples in collapsed-stack format, optionally for one route template."""
+        output = profiler.collapsed(route)
+        if reset:
+            profiler.reset()
+        return PlainTextResponse(output)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,5 @@
 # app/models/game.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, UniqueConstraint, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -12,7 +12,8 @@ class GameSession(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     score = Column(Integer, nullable=False)
     game_mode = Column(String, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # On PostgreSQL the table is range-partitioned by timestamp (see scripts/partitions.py)
+    timestamp = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # Relationship with User model
     user = relationship("User", backref="game_sessions")
@@ -25,15 +26,86 @@ class GameSession(Base):
 class Leaderboard(Base):
     __tablename__ = "leaderboard"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
-    total_score = Column(Integer, nullable=False, default=0, index=True)
-    rank = Column(Integer, index=True)
+    # Every index here is paid for on each score submit, so only the
+    # indexes serving /top, /rank and re-ranking are kept
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    total_score = Column(Integer, nullable=False, default=0)
+    rank = Column(Integer)
     
     # Relationship with User model
     user = relationship("User", backref="leaderboard_entry")
     
     __table_args__ = (
-        # Index for efficient ranking queries
-        UniqueConstraint('user_id', name='uix_leaderboard_user'),
+        # /top: index-only scan in rank order, carrying everything LeaderboardEntry
+        # needs from this table (usernames come from the username cache)
+        Index('idx_leaderboard_rank_covering', 'rank', 'total_score', 'user_id'),
+        # /rank and submit lookups by user; covering on PostgreSQL
+        Index('uix_leaderboard_user_covering', 'user_id', unique=True,
+              postgresql_include=['rank', 'total_score']),
+        # Ordered scan for re-ranking
+        Index('idx_leaderboard_total_score', 'total_score'),
+    )
+
+class ModeLeaderboard(Base):
+    """Per-game-mode leaderboard, maintained incrementally at submit time"""
+    __tablename__ = "mode_leaderboard"
+    
+    id = Column(Integer, primary_key=True)
+    game_mode = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    total_score = Column(Integer, nullable=False, default=0)
+    rank = Column(Integer)
+    
+    __table_args__ = (
+        UniqueConstraint('game_mode', 'user_id', name='uix_mode_leaderboard_mode_user'),
+        # Page reads within a mode (covering), and re-ranking within a mode
+        Index('idx_mode_leaderboard_mode_rank', 'game_mode', 'rank', 'total_score', 'user_id'),
+        Index('idx_mode_leaderboard_mode_score', 'game_mode', 'total_score'),
+    )
+
+class WindowLeaderboard(Base):
+    """Per-period (day/week) score totals, maintained incrementally at submit time"""
+    __tablename__ = "window_leaderboard"
+    
+    id = Column(Integer, primary_key=True)
+    period = Column(String, nullable=False)
+    period_start = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    total_score = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('period', 'period_start', 'user_id', name='uix_window_leaderboard_period_user'),
+        # Ordered reads within a period (covering), and range deletes of expired periods
+        Index('idx_window_leaderboard_period_score', 'period', 'period_start', 'total_score', 'user_id'),
+    )
+
+class Season(Base):
+    """
+    A leaderboard season. The open season has no ended_at; closed seasons
+    keep their final standings in archive tables (see app/core/seasons.py).
+    """
+    __tablename__ = "seasons"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    ended_at = Column(DateTime(timezone=True), nullable=True)
+    # Ranked players when the season was archived
+    players = Column(Integer, nullable=True)
+
+class GameSessionDaily(Base):
+    """Per-user daily aggregates of game sessions rolled up from expired partitions"""
+    __tablename__ = "game_session_daily"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    game_mode = Column(String, nullable=False, default="default")
+    sessions = Column(Integer, nullable=False, default=0)
+    total_score = Column(BigInteger, nullable=False, default=0)
+    max_score = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', 'game_mode', name='uix_game_session_daily'),
     )
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app/models/user.py
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, expression
 
 from app.db.session import Base
 
@@ -10,4 +10,5 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
-    join_date = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    join_date = Column(DateTime(timezone=True), server_default=func.now())
+    is_active = Column(Boolean, nullable=False, default=True, server_default=expression.true())
\ No newline at end of file
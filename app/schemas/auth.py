@@ -45,4 +45,14 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     """Schema for token payload."""
-    sub: Optional[int] = None
\ No newline at end of file
+    sub: Optional[int] = None
+
+class ProvisioningResult(BaseModel):
+    """Schema for a bulk provisioning summary."""
+    read: int
+    created: int
+    skipped: int
+    invalid: int
+    batches: int
+    elapsed_seconds: float
+    users_per_second: float
\ No newline at end of file
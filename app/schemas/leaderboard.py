@@ -1,21 +1,28 @@
 # app/schemas/leaderboard.py
+from datetime import datetime
 from pydantic import BaseModel, field_validator, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.core.errors import BadRequestError
 
+MIN_SCORE = 0
+MAX_SCORE = 10000
+
 class ScoreSubmit(BaseModel):
     """Schema for score submission."""
     user_id: int 
-    score: int = Field(..., ge=0, le=10000)
+    # The range is checked once, by the validator below, so an out-of-range
+    # score is a 400 with a readable message; the bounds are only declared
+    # for the OpenAPI schema
+    score: int = Field(..., json_schema_extra={"minimum": MIN_SCORE, "maximum": MAX_SCORE})
     game_mode: Optional[str] = "default"
     
     @field_validator('score')
     def score_must_be_in_valid_range(cls, v):
-        if v < 0 or v > 10000:
-             raise BadRequestError(f"Score must be between 0 and 10000, got {v}")
+        if v < MIN_SCORE or v > MAX_SCORE:
+            raise BadRequestError(f"Score must be between {MIN_SCORE} and {MAX_SCORE}, got {v}")
         return v
-    
+
 class LeaderboardEntry(BaseModel):
     """Schema for a leaderboard entry."""
     rank: int
@@ -42,4 +49,34 @@ class PlayerRank(BaseModel):
     total_score: int
     
     class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Most user IDs one bulk rank lookup may ask for (a full friend list)
+MAX_RANK_BATCH = 200
+
+class RankBatchRequest(BaseModel):
+    """Schema for a bulk rank lookup."""
+    user_ids: List[int] = Field(..., min_length=1, max_length=MAX_RANK_BATCH)
+
+class RankBatchEntry(BaseModel):
+    """
+    Schema for one player in a bulk rank lookup. status is "ok", or marks a
+    user that does not exist or has not been ranked yet (rank fields null).
+    """
+    user_id: int
+    status: Literal["ok", "user_not_found", "not_ranked"]
+    username: Optional[str] = None
+    rank: Optional[int] = None
+    total_score: Optional[int] = None
+
+class RankBatchResponse(BaseModel):
+    """Schema for bulk rank lookup response, in request order."""
+    results: List[RankBatchEntry]
+
+class SeasonInfo(BaseModel):
+    """Schema for a leaderboard season."""
+    id: int
+    name: str
+    started_at: datetime
+    ended_at: Optional[datetime] = None
+    players: Optional[int] = None
@@ -20,8 +20,129 @@ def setup_database():
         print(f"Error setting up database: {e}")
         sys.exit(1)
 
+def maintain_partitions():
+    """Create upcoming game_sessions partitions and roll up expired ones"""
+    try:
+        from scripts.partitions import maintain_partitions as run_maintenance
+        
+        print("Maintaining game_sessions partitions...")
+        run_maintenance()
+        print("Partition maintenance completed successfully!")
+    except Exception as e:
+        print(f"Error maintaining partitions: {e}")
+        sys.exit(1)
+
+def provision_users(args):
+    """Bulk-create users from an NDJSON or CSV file"""
+    import argparse
+    from app.db.session import SessionLocal
+    from app.core.provisioning import provision_users as run_provisioning, read_user_records
+    
+    parser = argparse.ArgumentParser(prog="run.py provision-users")
+    parser.add_argument("file", help="NDJSON or CSV file of users")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Users inserted per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="Password hashing processes")
+    options = parser.parse_args(args)
+    
+    def report(stats):
+        print(
+            f"{stats.read} read, {stats.created} created, {stats.skipped} skipped, "
+            f"{stats.invalid} invalid - {stats.users_per_second:.0f} users/s"
+        )
+    
+    db = SessionLocal()
+    try:
+        with open(options.file, encoding="utf-8") as lines:
+            stats = run_provisioning(
+                db,
+                read_user_records(lines),
+                batch_size=options.batch_size,
+                workers=options.workers,
+                progress=report
+            )
+        print(f"Provisioning completed in {stats.elapsed_seconds:.1f}s")
+    except Exception as e:
+        print(f"Error provisioning users: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+def rerank(args):
+    """Re-rank the global leaderboard in chunks, writing only changed ranks"""
+    import argparse
+    from app.config import settings
+    from app.db.session import SessionLocal
+    from app.core.ranking import rerank_leaderboard
+    
+    parser = argparse.ArgumentParser(prog="run.py rerank")
+    parser.add_argument("--chunk-size", type=int, default=settings.RERANK_CHUNK_SIZE, help="Rows per transaction")
+    options = parser.parse_args(args)
+    
+    def report(chunk):
+        print(
+            f"chunk {chunk['chunk']}: {chunk['scanned']} scanned, "
+            f"{chunk['changed']} changed in {chunk['elapsed_ms']:.1f}ms"
+        )
+    
+    db = SessionLocal()
+    try:
+        stats = rerank_leaderboard(db, chunk_size=options.chunk_size, progress=report)
+        print(
+            f"Re-rank completed: {stats.scanned} scanned, {stats.changed} changed "
+            f"in {stats.elapsed_seconds:.1f}s"
+        )
+    except Exception as e:
+        print(f"Error re-ranking leaderboard: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+def season_rollover(args):
+    """Archive the current season's leaderboards and start an empty season"""
+    import argparse
+    from app.db.session import SessionLocal
+    from app.core.seasons import rollover_season
+    
+    parser = argparse.ArgumentParser(prog="run.py season-rollover")
+    parser.add_argument("--name", default=None, help="Name of the new season")
+    options = parser.parse_args(args)
+    
+    db = SessionLocal()
+    try:
+        closed = rollover_season(db, name=options.name)
+        print(f"{closed.name} archived with {closed.players} players")
+    except Exception as e:
+        print(f"Error rolling over season: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+def loadtest(args):
+    """Generate load against the app and report latency percentiles as JSON"""
+    from scripts.loadtest import main as run_loadtest
+    
+    sys.exit(run_loadtest(args))
+
+def bench(args):
+    """Run the hot-path microbenchmarks and compare against a stored baseline"""
+    from scripts.microbench import main as run_bench
+    
+    sys.exit(run_bench(args))
+
+def explain(args):
+    """EXPLAIN the hot SQL paths and compare against a stored baseline"""
+    from scripts.explain import main as run_explain
+    
+    sys.exit(run_explain(args))
+
+def serve(args):
+    """Run the API in production mode: multiple workers, no reload"""
+    from scripts.serve import main as run_serve
+    
+    sys.exit(run_serve(args))
+
 def run_server():
-    """Run the FastAPI server"""
+    """Run the FastAPI server with auto-reload (development)"""
     print("Starting server...")
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
 
@@ -31,9 +152,33 @@ if __name__ == "__main__":
             setup_database()
         elif sys.argv[1] == "run":
             run_server()
+        elif sys.argv[1] == "serve":
+            serve(sys.argv[2:])
+        elif sys.argv[1] == "provision-users":
+            provision_users(sys.argv[2:])
+        elif sys.argv[1] == "maintain-partitions":
+            maintain_partitions()
+        elif sys.argv[1] == "rerank":
+            rerank(sys.argv[2:])
+        elif sys.argv[1] == "season-rollover":
+            season_rollover(sys.argv[2:])
+        elif sys.argv[1] == "explain":
+            explain(sys.argv[2:])
+        elif sys.argv[1] == "loadtest":
+            loadtest(sys.argv[2:])
+        elif sys.argv[1] == "bench":
+            bench(sys.argv[2:])
         else:
-            print("Unknown command. Use 'setup-db' or 'run'")
+            print("Unknown command. Use 'setup-db', 'run', 'serve', 'provision-users', 'maintain-partitions', 'rerank', 'season-rollover', 'explain', 'loadtest' or 'bench'")
     else:
-        print("Usage: python run.py [setup-db|run]")
+        print("Usage: python run.py [setup-db|run|serve|provision-users|maintain-partitions|rerank|season-rollover|explain|loadtest|bench]")
         print("  setup-db: Initialize the database")
-        print("  run: Start the API server")
\ No newline at end of file
+        print("  run: Start the API server with auto-reload (development)")
+        print("  serve: Start the API server for production (workers per CPU, no reload)")
+        print("  provision-users FILE: Bulk-create users from an NDJSON or CSV file")
+        print("  maintain-partitions: Create future game_sessions partitions and apply retention")
+        print("  rerank: Re-rank the leaderboard, reporting rows scanned and changed per chunk")
+        print("  season-rollover: Archive the current season and start an empty leaderboard")
+        print("  explain: EXPLAIN the hot SQL paths and flag plan regressions")
+        print("  loadtest: Drive submit/top/rank traffic and report p50/p95/p99/p999 latencies")
+        print("  bench: Microbenchmark the per-request hot paths and flag regressions")
\ No newline at end of file
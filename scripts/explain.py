@@ -0,0 +1,250 @@
+# scripts/explain.py
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.core.ranking import rerank_chunk_query
+from app.db.session import Base
+from app.models.user import User
+from app.models.game import Leaderboard
+
+# A statement regresses when its buffers or execution time grow by more than these factors
+BUFFER_REGRESSION_FACTOR = 2.0
+TIME_REGRESSION_FACTOR = 3.0
+# Timings below this are too noisy to compare
+MIN_COMPARABLE_MS = 1.0
+
+# Ranks the whole seeded board in one statement; the API re-ranks in
+# chunks (rerank_chunk), which is what gets explained
+SEED_RERANK_SQL = text("""
+    UPDATE leaderboard
+    SET rank = ranks.rank
+    FROM (
+        SELECT
+            user_id,
+            RANK() OVER (ORDER BY total_score DESC) as rank
+        FROM leaderboard
+    ) ranks
+    WHERE leaderboard.user_id = ranks.user_id
+      AND (leaderboard.rank IS NULL OR leaderboard.rank <> ranks.rank)
+""")
+
+def _compile(db: Session, query) -> str:
+    """Render an ORM query as SQL with inlined parameters"""
+    return str(query.statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    ))
+
+def hot_statements(db: Session, user_id: int, limit: int = 10, page: int = 1) -> Dict[str, str]:
+    """
+    SQL for each hot path, built the same way as app/api/leaderboard.py.
+    DML statements are explained inside a transaction that is rolled back.
+    """
+    return {
+        "top_page": _compile(db, db.query(
+            Leaderboard.rank.label('rank'),
+            Leaderboard.total_score.label('total_score'),
+            Leaderboard.user_id.label('user_id')
+        ).filter(Leaderboard.rank.isnot(None)).order_by(
+            Leaderboard.rank
+        ).offset((page - 1) * limit).limit(limit)),
+        "top_count": _compile(db, db.query(func.count(Leaderboard.id)).filter(Leaderboard.rank.isnot(None))),
+        "rank_lookup": _compile(db, db.query(
+            Leaderboard.rank.label('rank'),
+            Leaderboard.total_score.label('total_score')
+        ).filter(Leaderboard.user_id == user_id)),
+        "submit_lock": _compile(db, db.query(Leaderboard).filter(
+            Leaderboard.user_id == user_id
+        ).with_for_update().limit(1)),
+        "submit_upsert": (
+            f"UPDATE leaderboard SET total_score = total_score + 100 WHERE user_id = {int(user_id)}"
+        ),
+        "rerank_chunk": _compile(db, rerank_chunk_query(db, (500000, user_id), 5000)),
+    }
+
+def seed_dataset(db: Session, users: int, batch_size: int = 10000):
+    """Top the leaderboard up to the given number of synthetic players, then rank them"""
+    existing = db.query(func.count(Leaderboard.id)).scalar()
+    if existing >= users:
+        return
+
+    print(f"Seeding {users - existing} players...")
+    offset = db.query(func.coalesce(func.max(User.id), 0)).scalar()
+    for start in range(existing, users, batch_size):
+        count = min(batch_size, users - start)
+        user_ids = db.execute(
+            insert(User).returning(User.id),
+            [
+                {"username": f"explainuser{offset + start + i}", "hashed_password": "x"}
+                for i in range(count)
+            ]
+        ).scalars().all()
+        db.execute(insert(Leaderboard), [
+            {"user_id": user_id, "total_score": random.randint(0, 1000000)}
+            for user_id in user_ids
+        ])
+        db.commit()
+
+    db.execute(SEED_RERANK_SQL)
+    db.commit()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("ANALYZE leaderboard"))
+        db.commit()
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+def summarize_postgresql_plan(explain_json: list) -> dict:
+    """Extract timings, buffers, node types and seq scans from EXPLAIN (FORMAT JSON)"""
+    root = explain_json[0]
+    plan = root["Plan"]
+    nodes = list(_walk(plan))
+    return {
+        "planning_ms": root.get("Planning Time", 0.0),
+        "execution_ms": root.get("Execution Time", 0.0),
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "node_types": sorted({node["Node Type"] for node in nodes}),
+        "seq_scans": sorted({
+            node.get("Relation Name", "?") for node in nodes if node["Node Type"] == "Seq Scan"
+        }),
+    }
+
+def summarize_sqlite_plan(plan_rows: List[str], execution_ms: float) -> dict:
+    """Summarize EXPLAIN QUERY PLAN output; full table scans count as seq scans"""
+    seq_scans = set()
+    for detail in plan_rows:
+        words = detail.split()
+        # "SCAN leaderboard" is a table scan; "SCAN leaderboard USING ... INDEX" is not,
+        # and scans of subqueries are not table scans either
+        if (len(words) >= 2 and words[0] == "SCAN" and "USING" not in words
+                and words[1] in Base.metadata.tables):
+            seq_scans.add(words[1])
+    return {
+        "planning_ms": 0.0,
+        "execution_ms": execution_ms,
+        "buffers": None,
+        "node_types": plan_rows,
+        "seq_scans": sorted(seq_scans),
+    }
+
+def explain_statement(db: Session, sql: str) -> dict:
+    """Run EXPLAIN on one statement and roll back any changes it made"""
+    dialect = db.get_bind().dialect.name
+    try:
+        if dialect == "postgresql":
+            result = db.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)).scalar()
+            explain_json = json.loads(result) if isinstance(result, str) else result
+            summary = summarize_postgresql_plan(explain_json)
+            summary["plan"] = explain_json
+            return summary
+
+        plan_rows = [row[-1] for row in db.execute(text("EXPLAIN QUERY PLAN " + sql)).all()]
+        start = time.perf_counter()
+        db.execute(text(sql))
+        execution_ms = (time.perf_counter() - start) * 1000
+        summary = summarize_sqlite_plan(plan_rows, execution_ms)
+        summary["plan"] = plan_rows
+        return summary
+    finally:
+        db.rollback()
+
+def run_explain(db: Session, user_id: Optional[int] = None) -> Dict[str, dict]:
+    """Explain every hot statement against the current dataset"""
+    if user_id is None:
+        # A player from the middle of the board
+        total = db.query(func.count(Leaderboard.id)).scalar()
+        user_id = db.query(Leaderboard.user_id).order_by(Leaderboard.id).offset(total // 2).limit(1).scalar() or 1
+
+    return {
+        name: explain_statement(db, sql)
+        for name, sql in hot_statements(db, user_id).items()
+    }
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict]) -> List[str]:
+    """Return a description of each regression against the stored baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        new_seq_scans = set(current["seq_scans"]) - set(previous["seq_scans"])
+        if new_seq_scans:
+            regressions.append(f"{name}: new seq scan on {', '.join(sorted(new_seq_scans))}")
+
+        if current["buffers"] is not None and previous.get("buffers"):
+            if current["buffers"] > previous["buffers"] * BUFFER_REGRESSION_FACTOR:
+                regressions.append(
+                    f"{name}: buffers {previous['buffers']} -> {current['buffers']}"
+                )
+
+        if previous["execution_ms"] >= MIN_COMPARABLE_MS:
+            if current["execution_ms"] > previous["execution_ms"] * TIME_REGRESSION_FACTOR:
+                regressions.append(
+                    f"{name}: execution {previous['execution_ms']:.2f}ms -> {current['execution_ms']:.2f}ms"
+                )
+
+    return regressions
+
+def main(args: List[str]):
+    """Entry point for python run.py explain"""
+    import argparse
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="run.py explain")
+    parser.add_argument("--seed", type=int, default=0, help="Top the leaderboard up to this many players first")
+    parser.add_argument("--output", default="explain_results.json", help="Where to write plans and timings")
+    parser.add_argument("--baseline", default="explain_baseline.json", help="Baseline to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    options = parser.parse_args(args)
+
+    db = SessionLocal()
+    try:
+        if options.seed:
+            seed_dataset(db, options.seed)
+        results = run_explain(db)
+    finally:
+        db.close()
+
+    with open(options.output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    for name, summary in results.items():
+        seq = f" seq scans: {', '.join(summary['seq_scans'])}" if summary["seq_scans"] else ""
+        buffers = f" buffers={summary['buffers']}" if summary["buffers"] is not None else ""
+        print(f"{name}: {summary['execution_ms']:.2f}ms{buffers}{seq}")
+
+    if options.update_baseline:
+        with open(options.baseline, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print(f"No baseline at {options.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(options.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No plan regressions against the baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
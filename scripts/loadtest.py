@@ -0,0 +1,338 @@
+# scripts/loadtest.py
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+ENDPOINTS = ("submit", "top", "rank")
+DEFAULT_MIX = "submit=0.2,top=0.4,rank=0.4"
+PERCENTILES = (50, 95, 99, 99.9)
+
+class LoadRequest(NamedTuple):
+    """One request to issue; at is its offset in seconds when replaying a recording"""
+    endpoint: str
+    method: str
+    path: str
+    json: Optional[dict] = None
+    params: Optional[dict] = None
+    at: Optional[float] = None
+
+class LatencyHistogram:
+    """
+    Latency histogram in the style of HdrHistogram: values are recorded in
+    microseconds and bucketed to a fixed number of significant digits, so
+    memory stays bounded and percentiles are exact to that precision.
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        self.significant_digits = significant_digits
+        self.counts: Dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.max = 0
+        self._sum = 0
+
+    def _bucket(self, micros: int) -> int:
+        """Highest value equivalent to micros at the histogram's precision"""
+        digits = len(str(micros))
+        if digits <= self.significant_digits:
+            return micros
+        scale = 10 ** (digits - self.significant_digits)
+        return (micros // scale) * scale + scale - 1
+
+    def record(self, seconds: float):
+        micros = max(0, int(seconds * 1_000_000))
+        self.counts[self._bucket(micros)] += 1
+        self.count += 1
+        self._sum += micros
+        self.max = max(self.max, micros)
+
+    def percentile(self, percentile: float) -> int:
+        """Value in microseconds at or below which the given percentage of samples fall"""
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(bucket, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Percentiles, max and mean in milliseconds"""
+        summary = {
+            f"p{str(p).replace('.', '')}": round(self.percentile(p) / 1000, 3)
+            for p in PERCENTILES
+        }
+        summary["max"] = round(self.max / 1000, 3)
+        summary["mean"] = round(self._sum / self.count / 1000, 3) if self.count else 0.0
+        return summary
+
+class EndpointStats:
+    """Latencies and status codes for one endpoint"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, seconds: float, status: Optional[int]):
+        self.latency.record(seconds)
+        self.statuses[str(status) if status is not None else "error"] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+class ZipfUsers:
+    """User IDs 1..users drawn from a Zipf distribution (user 1 is the hottest)"""
+
+    def __init__(self, users: int, exponent: float = 1.1, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self._cdf: List[float] = []
+        total = 0.0
+        for k in range(1, users + 1):
+            total += 1.0 / (k ** exponent)
+            self._cdf.append(total)
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self._cdf, self.rng.random() * self._cdf[-1]) + 1
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "submit=0.2,top=0.4,rank=0.4" into endpoint weights"""
+    weights = {}
+    for part in mix.split(","):
+        endpoint, _, weight = part.partition("=")
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+        weights[endpoint] = float(weight)
+    if not any(weights.values()):
+        raise ValueError("Request mix has no positive weights")
+    return weights
+
+def generate_requests(
+    mix: Dict[str, float],
+    users: ZipfUsers,
+    rng: random.Random,
+    prefix: str = "/api"
+) -> Iterator[LoadRequest]:
+    """Endless synthetic traffic following the read/write mix"""
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+    while True:
+        endpoint = rng.choices(endpoints, weights)[0]
+        if endpoint == "submit":
+            yield LoadRequest("submit", "POST", f"{prefix}/leaderboard/submit", json={
+                "user_id": users.sample(),
+                "score": rng.randint(0, 10000)
+            })
+        elif endpoint == "top":
+            # Most readers look at the first page
+            page = 1 if rng.random() < 0.8 else rng.randint(2, 10)
+            yield LoadRequest("top", "GET", f"{prefix}/leaderboard/top", params={"limit": 10, "page": page})
+        else:
+            yield LoadRequest("rank", "GET", f"{prefix}/leaderboard/rank/{users.sample()}")
+
+def _endpoint_for(path: str) -> str:
+    if path.rstrip("/").endswith("/submit"):
+        return "submit"
+    if "/top" in path:
+        return "top"
+    if "/rank/" in path:
+        return "rank"
+    return "other"
+
+def read_replay(lines) -> Iterator[LoadRequest]:
+    """
+    Read a recorded request log, one JSON object per line:
+    {"method": "POST", "path": "/api/leaderboard/submit", "json": {...},
+     "params": {...}, "at": 0.25}
+    "at" is the offset in seconds from the start of the run; without it the
+    request is sent as soon as the rate and concurrency allow.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        path = record["path"]
+        yield LoadRequest(
+            _endpoint_for(path),
+            record.get("method", "GET").upper(),
+            path,
+            json=record.get("json"),
+            params=record.get("params"),
+            at=record.get("at")
+        )
+
+async def run_load(
+    client: httpx.AsyncClient,
+    requests: Iterator[LoadRequest],
+    total_requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    rate: float = 0.0,
+    concurrency: int = 10,
+    rng: Optional[random.Random] = None
+) -> dict:
+    """
+    Issue requests and return the JSON report.
+
+    With rate > 0 (or replay offsets) arrivals are open-loop: requests are
+    scheduled independently of responses and latency is measured from the
+    scheduled send time, so queueing behind a slow server is counted rather
+    than hidden. With rate 0 the run is closed-loop with `concurrency`
+    requests in flight.
+    """
+    rng = rng or random.Random()
+    stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+    in_flight = asyncio.Semaphore(concurrency)
+    pending = set()
+    issued = 0
+    started = time.perf_counter()
+    next_arrival = started
+
+    async def send(request: LoadRequest, scheduled: float):
+        async with in_flight:
+            try:
+                response = await client.request(
+                    request.method, request.path, json=request.json, params=request.params
+                )
+                status = response.status_code
+            except Exception:
+                # Transport failures, or app exceptions raised in-process
+                status = None
+        stats[request.endpoint].record(time.perf_counter() - scheduled, status)
+
+    for request in requests:
+        if total_requests is not None and issued >= total_requests:
+            break
+        now = time.perf_counter()
+        if duration is not None and now - started >= duration:
+            break
+
+        if request.at is not None or rate > 0:
+            if request.at is not None:
+                scheduled = started + request.at
+            else:
+                next_arrival += rng.expovariate(rate)
+                scheduled = next_arrival
+            if scheduled > now:
+                await asyncio.sleep(scheduled - now)
+        else:
+            # Finished tasks remove themselves from pending
+            while len(pending) >= concurrency:
+                await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+            scheduled = time.perf_counter()
+
+        task = asyncio.create_task(send(request, scheduled))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        issued += 1
+
+    if pending:
+        await asyncio.wait(set(pending))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, endpoint_stats in sorted(stats.items()):
+        endpoints[endpoint] = {
+            "requests": endpoint_stats.latency.count,
+            "errors": endpoint_stats.errors,
+            "throughput_rps": round(endpoint_stats.latency.count / elapsed, 1) if elapsed else 0.0,
+            "statuses": dict(endpoint_stats.statuses),
+            "latency_ms": endpoint_stats.latency.summary(),
+        }
+    completed = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": completed,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+def in_process_client(disable_rate_limits: bool = True) -> httpx.AsyncClient:
+    """Client that calls the app directly over ASGI, without a server"""
+    from app.main import app
+    from app.core.rate_limiter import (
+        get_leaderboard_limiter, get_player_rank_limiter, submit_score_limiter
+    )
+
+    if disable_rate_limits:
+        # Every simulated player shares one client address
+        for limiter in (get_leaderboard_limiter, get_player_rank_limiter, submit_score_limiter):
+            app.dependency_overrides[limiter] = lambda: True
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+
+def main(args: List[str]):
+    """Entry point for python run.py loadtest"""
+    parser = argparse.ArgumentParser(prog="run.py loadtest")
+    parser.add_argument("--url", default=None, help="Server to load, e.g. http://localhost:8000 (in-process app if omitted)")
+    parser.add_argument("--prefix", default="/api", help="API prefix for synthetic requests")
+    parser.add_argument("--requests", type=int, default=1000, help="Stop after this many requests")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrival rate in requests/s (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum requests in flight")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights")
+    parser.add_argument("--users", type=int, default=1000, help="User IDs are drawn from 1..users")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for user IDs")
+    parser.add_argument("--replay", default=None, help="Replay a JSONL request log instead of synthetic traffic")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable runs")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep rate limiting in in-process mode")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout")
+    options = parser.parse_args(args)
+
+    rng = random.Random(options.seed)
+
+    async def run():
+        if options.url:
+            client = httpx.AsyncClient(base_url=options.url, timeout=30)
+        else:
+            client = in_process_client(disable_rate_limits=not options.keep_rate_limits)
+
+        replay_file = open(options.replay, encoding="utf-8") if options.replay else None
+        try:
+            if replay_file:
+                requests = read_replay(replay_file)
+            else:
+                users = ZipfUsers(options.users, options.zipf, rng)
+                requests = generate_requests(parse_mix(options.mix), users, rng, options.prefix)
+            async with client:
+                report = await run_load(
+                    client,
+                    requests,
+                    total_requests=options.requests,
+                    duration=options.duration,
+                    rate=options.rate,
+                    concurrency=options.concurrency,
+                    rng=rng
+                )
+        finally:
+            if replay_file:
+                replay_file.close()
+
+        report["target"] = options.url or "in-process"
+        return report
+
+    report = asyncio.run(run())
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,341 @@
+# scripts/microbench.py
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+
+# A benchmark regresses when its median time per op grows by more than this factor
+REGRESSION_FACTOR = 1.5
+# Medians below this are dominated by timer and loop overhead
+MIN_COMPARABLE_NS = 50.0
+# Client address the rate limit benchmarks count against
+BENCH_CLIENT = "203.0.113.250"
+
+class Benchmark(NamedTuple):
+    """A zero-argument callable (or coroutine function) timed per call"""
+    name: str
+    func: Callable
+    is_async: bool = False
+
+def make_request(
+    path: str,
+    query_string: bytes = b"",
+    headers: Optional[Dict[str, str]] = None,
+    client: str = "203.0.113.7"
+) -> Request:
+    """A bare Starlette request, as seen by dependencies and middleware"""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "client": (client, 50000),
+    })
+
+BROWSER_HEADERS = {
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0 Safari/537.36",
+    "accept": "application/json",
+    "referer": "https://example.com/leaderboard",
+    "cookie": "session=abc123",
+}
+
+def _leaderboard_response(entries: int):
+    from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+
+    return LeaderboardResponse(
+        total_entries=1000000,
+        leaderboard=[
+            LeaderboardEntry(rank=i + 1, user_id=100000 + i, username=f"player{100000 + i}", total_score=1000000 - i * 7)
+            for i in range(entries)
+        ]
+    )
+
+class _PageRow(NamedTuple):
+    """Stands in for a SQLAlchemy row from _leaderboard_page"""
+    rank: int
+    total_score: int
+    user_id: int
+
+def _page_rows(entries: int):
+    rows = [_PageRow(i + 1, 1000000 - i * 7, 100000 + i) for i in range(entries)]
+    return rows, {row.user_id: f"player{row.user_id}" for row in rows}
+
+def build_benchmarks() -> List[Benchmark]:
+    """The hot-path pieces every request pays for"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.config import settings
+    from app.core.cache import (
+        cached_leaderboard, cached_player_rank, invalidate_leaderboard_cache, invalidate_player_rank_cache
+    )
+    from app.core.middleware import APISecurityMiddleware, DEFAULT_SCAN_EXEMPT_ROUTES
+    from app.core.rate_limiter import RateLimiter, rate_limit_storage
+    from app.api.leaderboard import _leaderboard_json
+    from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse, PlayerRank, ScoreSubmit
+
+    benchmarks = []
+
+    # Rate limiting
+    # The global storage: every new RateLimitStorage starts a cleanup thread
+    benchmarks.append(Benchmark(
+        "rate_limit_storage_increment",
+        lambda: rate_limit_storage.increment(f"ratelimit:{BENCH_CLIENT}", 60)
+    ))
+    limiter = RateLimiter(limit=10 ** 12, window=60)
+    limiter_request = make_request("/api/leaderboard/top", client=BENCH_CLIENT)
+    benchmarks.append(Benchmark("rate_limiter_call", lambda: limiter(limiter_request), is_async=True))
+
+    # Response caches: a hit returns the stored value; a miss builds the key,
+    # awaits the endpoint and stores the result (evicting once full)
+    page = _leaderboard_response(10)
+    rank = PlayerRank(user_id=1, username="player1", rank=1, total_score=5000)
+
+    @cached_leaderboard
+    async def leaderboard_endpoint(**kwargs):
+        return page
+
+    @cached_player_rank
+    async def player_rank_endpoint(**kwargs):
+        return rank
+
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    counter = iter(range(1, 10 ** 12))
+    benchmarks.append(Benchmark(
+        "cached_leaderboard_hit",
+        lambda: leaderboard_endpoint(limit=10, page=1, game_mode=None, window="all"),
+        is_async=True
+    ))
+    benchmarks.append(Benchmark(
+        "cached_leaderboard_miss",
+        lambda: leaderboard_endpoint(limit=10, page=next(counter), game_mode=None, window="all"),
+        is_async=True
+    ))
+    benchmarks.append(Benchmark(
+        "cached_player_rank_hit",
+        lambda: player_rank_endpoint(user_id=1, game_mode=None, window="all"),
+        is_async=True
+    ))
+    benchmarks.append(Benchmark(
+        "cached_player_rank_miss",
+        lambda: player_rank_endpoint(user_id=next(counter), game_mode=None, window="all"),
+        is_async=True
+    ))
+
+    # Security middleware checks, configured as in app/main.py
+    middleware = APISecurityMiddleware(
+        app=None,
+        scan_exempt_routes=DEFAULT_SCAN_EXEMPT_ROUTES + [f"{settings.API_V1_PREFIX}/leaderboard/rank/{{user_id}}"]
+    )
+    scanned_request = make_request(
+        "/api/leaderboard/top", b"limit=100&page=3&game_mode=ranked", BROWSER_HEADERS
+    )
+    exempt_request = make_request("/api/leaderboard/rank/123456", headers=BROWSER_HEADERS)
+    benchmarks.append(Benchmark(
+        "suspicious_patterns_scan",
+        lambda: middleware._has_suspicious_patterns(scanned_request)
+    ))
+    benchmarks.append(Benchmark(
+        "suspicious_patterns_exempt",
+        lambda: middleware._has_suspicious_patterns(exempt_request)
+    ))
+    benchmarks.append(Benchmark(
+        "check_automation",
+        lambda: middleware._check_automation(scanned_request)
+    ))
+
+    # Request validation
+    submit_payload = {"user_id": 123456, "score": 4200, "game_mode": "ranked"}
+    submit_json = json.dumps(submit_payload).encode()
+    benchmarks.append(Benchmark("score_submit_validate", lambda: ScoreSubmit.model_validate(submit_payload)))
+    benchmarks.append(Benchmark("score_submit_validate_json", lambda: ScoreSubmit.model_validate_json(submit_json)))
+
+    # Response serialization at the maximum page size, both the model alone
+    # and the path FastAPI takes for a response_model endpoint
+    full_page = _leaderboard_response(100)
+    response_field = create_response_field(name="bench_leaderboard", type_=LeaderboardResponse)
+
+    async def serialize_full_page():
+        content = await serialize_response(field=response_field, response_content=full_page)
+        return JSONResponse(content=content)
+
+    benchmarks.append(Benchmark("leaderboard_response_dump_json_100", full_page.model_dump_json))
+    benchmarks.append(Benchmark("leaderboard_response_serialize_100", serialize_full_page, is_async=True))
+
+    # CPU per /top cache miss once the rows and usernames are loaded: the
+    # old path built a pydantic model per row and let FastAPI validate and
+    # render it again; the endpoint now encodes the rows with orjson
+    rows, usernames = _page_rows(100)
+
+    async def page_via_models():
+        response = LeaderboardResponse(
+            total_entries=1000000,
+            leaderboard=[
+                LeaderboardEntry(
+                    rank=row.rank, user_id=row.user_id, username=usernames[row.user_id], total_score=row.total_score
+                ) for row in rows if row.user_id in usernames
+            ]
+        )
+        content = await serialize_response(field=response_field, response_content=response)
+        return JSONResponse(content=content)
+
+    benchmarks.append(Benchmark("leaderboard_page_models_100", page_via_models, is_async=True))
+    benchmarks.append(Benchmark("leaderboard_page_orjson_100", lambda: _leaderboard_json(1000000, rows, usernames)))
+
+    return benchmarks
+
+def _time_loops(benchmark: Benchmark, loops: int, loop: asyncio.AbstractEventLoop) -> float:
+    """Seconds taken by `loops` consecutive calls"""
+    func = benchmark.func
+    if benchmark.is_async:
+        async def batch():
+            start = time.perf_counter()
+            for _ in range(loops):
+                await func()
+            return time.perf_counter() - start
+        return loop.run_until_complete(batch())
+
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - start
+
+def measure(benchmark: Benchmark, min_time: float = 0.1, repeat: int = 5) -> dict:
+    """
+    Time one benchmark: calibrate the loop count so each sample runs for at
+    least min_time, then take `repeat` samples.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        loops = 1
+        while True:
+            elapsed = _time_loops(benchmark, loops, loop)
+            if elapsed >= min_time or loops >= 10 ** 7:
+                break
+            loops *= 10 if elapsed < min_time / 10 else 2
+
+        samples = [_time_loops(benchmark, loops, loop) / loops * 1e9 for _ in range(repeat)]
+    finally:
+        loop.close()
+
+    median = statistics.median(samples)
+    return {
+        "ns_per_op": round(median, 1),
+        "ns_per_op_min": round(min(samples), 1),
+        "ops_per_second": round(1e9 / median) if median else None,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+def run_benchmarks(
+    names: Optional[List[str]] = None,
+    min_time: float = 0.1,
+    repeat: int = 5,
+    progress: Optional[Callable[[str, dict], None]] = None
+) -> Dict[str, dict]:
+    """
+    Run every benchmark (or those whose name contains one of `names`).
+    The cache benchmarks go through the real decorators, so the response
+    caches are cleared afterwards rather than left holding fake pages and
+    ranks under keys real requests use.
+    """
+    from app.core.cache import invalidate_leaderboard_cache, invalidate_player_rank_cache
+    from app.core.rate_limiter import rate_limit_storage
+
+    results = {}
+    try:
+        for benchmark in build_benchmarks():
+            if names and not any(name in benchmark.name for name in names):
+                continue
+            results[benchmark.name] = measure(benchmark, min_time, repeat)
+            if progress:
+                progress(benchmark.name, results[benchmark.name])
+    finally:
+        invalidate_leaderboard_cache()
+        invalidate_player_rank_cache()
+        with rate_limit_storage.lock:
+            rate_limit_storage.storage.pop(f"ratelimit:{BENCH_CLIENT}", None)
+    return results
+
+def compare_to_baseline(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    factor: float = REGRESSION_FACTOR
+) -> List[str]:
+    """Return a description of each benchmark that slowed down by more than factor"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or previous["ns_per_op"] < MIN_COMPARABLE_NS:
+            continue
+        if current["ns_per_op"] > previous["ns_per_op"] * factor:
+            regressions.append(
+                f"{name}: {previous['ns_per_op']:.0f}ns -> {current['ns_per_op']:.0f}ns per op "
+                f"({current['ns_per_op'] / previous['ns_per_op']:.2f}x)"
+            )
+    return regressions
+
+def main(args: List[str]):
+    """Entry point for python run.py bench"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="run.py bench")
+    parser.add_argument("names", nargs="*", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Minimum seconds per sample")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write results")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="Baseline to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--factor", type=float, default=REGRESSION_FACTOR, help="Slowdown factor that counts as a regression")
+    options = parser.parse_args(args)
+
+    def report(name, result):
+        print(f"{name}: {result['ns_per_op']:.0f}ns/op ({result['ops_per_second']:,} ops/s)")
+
+    results = run_benchmarks(options.names, options.min_time, options.repeat, progress=report)
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": results,
+    }
+    with open(options.output, "w") as f:
+        json.dump(document, f, indent=2)
+
+    if options.update_baseline:
+        with open(options.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print(f"No baseline at {options.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(options.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline["benchmarks"], options.factor)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,255 @@
+# scripts/partitions.py
+import os
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.session import SessionLocal
+
+PARENT_TABLE = "game_sessions"
+LEGACY_PARTITION = "game_sessions_legacy"
+DEFAULT_PARTITION = "game_sessions_default"
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+def month_start(day: date) -> date:
+    """First day of the month containing day"""
+    return day.replace(day=1)
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month that is months after day's month"""
+    month_index = day.year * 12 + (day.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def partition_name(start: date) -> str:
+    """Monthly partition name, e.g. game_sessions_202501"""
+    return f"{PARENT_TABLE}_{start:%Y%m}"
+
+def monthly_partitions(today: date, months_ahead: int) -> List[Tuple[str, date, date]]:
+    """(name, start, end) for the current month and months_ahead following months"""
+    first = month_start(today)
+    return [
+        (partition_name(add_months(first, i)), add_months(first, i), add_months(first, i + 1))
+        for i in range(months_ahead + 1)
+    ]
+
+def parse_upper_bound(bound_expr: str) -> Optional[datetime]:
+    """Upper bound of a range partition from pg_get_expr(relpartbound), or None (DEFAULT/MAXVALUE)"""
+    match = _UPPER_BOUND.search(bound_expr)
+    if not match:
+        return None
+    return datetime.fromisoformat(match.group(1))
+
+def _utc(day: date) -> str:
+    return f"{day:%Y-%m-%d} 00:00:00+00"
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _table_kind(db: Session, table: str) -> Optional[str]:
+    """pg_class.relkind of a table: 'p' partitioned, 'r' regular, None if missing"""
+    return db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    ).scalar()
+
+def create_partitioned_game_sessions(db: Session):
+    """
+    Create game_sessions as a table range-partitioned by timestamp.
+
+    An existing unpartitioned table is kept as game_sessions_legacy and
+    attached as the partition covering everything up to the end of the
+    current month; monthly partitions take over from the next month.
+    Requires the users table to exist.
+    """
+    kind = _table_kind(db, PARENT_TABLE)
+    if kind == "p":
+        return
+
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), 1)
+
+    if kind == "r":
+        print("Converting game_sessions to a partitioned table...")
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_PARTITION}"))
+        # Free the index names used by the new parent table
+        db.execute(text(f"ALTER TABLE {LEGACY_PARTITION} RENAME CONSTRAINT game_sessions_pkey TO game_sessions_legacy_pkey"))
+        db.execute(text("ALTER INDEX IF EXISTS idx_game_sessions_user_timestamp RENAME TO idx_game_sessions_legacy_user_timestamp"))
+        db.execute(text("DROP INDEX IF EXISTS idx_game_sessions_user_id"))
+        db.execute(text(f"ALTER TABLE {LEGACY_PARTITION} ALTER COLUMN timestamp SET NOT NULL"))
+
+    # The partition key must be part of the primary key
+    db.execute(text(f"""
+        CREATE TABLE {PARENT_TABLE} (
+            id SERIAL,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            score INTEGER NOT NULL,
+            game_mode VARCHAR,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT check_score_range CHECK (score >= 0 AND score <= 10000),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """))
+    db.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_game_sessions_user_timestamp
+        ON {PARENT_TABLE} (user_id, timestamp DESC)
+    """))
+    # Catches rows outside every monthly partition so inserts never fail
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    if kind == "r":
+        db.execute(text(f"""
+            ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {LEGACY_PARTITION}
+            FOR VALUES FROM (MINVALUE) TO ('{_utc(cutoff)}')
+        """))
+        # Continue ids after the legacy rows
+        db.execute(text(f"""
+            SELECT setval(
+                pg_get_serial_sequence('{PARENT_TABLE}', 'id'),
+                COALESCE((SELECT MAX(id) FROM {LEGACY_PARTITION}), 0) + 1,
+                false
+            )
+        """))
+
+    db.commit()
+
+def _create_partition(db: Session, name: str, start: date, end: date) -> int:
+    """
+    Create the partition for [start, end) without committing.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition
+    holds rows in its range, so those rows are moved into a new table that
+    is then attached in their place. Returns the number of rows moved.
+    """
+    in_range = f"timestamp >= '{_utc(start)}' AND timestamp < '{_utc(end)}'"
+    moved = db.execute(text(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION} WHERE {in_range}")).scalar()
+
+    if not moved:
+        db.execute(text(f"""
+            CREATE TABLE {name} PARTITION OF {PARENT_TABLE}
+            FOR VALUES FROM ('{_utc(start)}') TO ('{_utc(end)}')
+        """))
+        return 0
+
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """))
+    db.execute(text(f"""
+        ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name}
+        FOR VALUES FROM ('{_utc(start)}') TO ('{_utc(end)}')
+    """))
+    return moved
+
+def ensure_partitions(db: Session, months_ahead: int = None, today: date = None):
+    """Create monthly partitions for the current month and the months ahead"""
+    months_ahead = settings.GAME_SESSION_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    today = today or datetime.now(timezone.utc).date()
+
+    for name, start, end in monthly_partitions(today, months_ahead):
+        if _table_kind(db, name) is not None:
+            continue
+        # Ranges already covered by another partition (e.g. the legacy one) fail and are skipped
+        try:
+            moved = _create_partition(db, name, start, end)
+            db.commit()
+            if moved:
+                print(f"Created partition {name}, moving {moved} rows out of {DEFAULT_PARTITION}")
+            else:
+                print(f"Created partition {name}")
+        except Exception as e:
+            db.rollback()
+            print(f"Skipped partition {name}: {e}")
+
+def rollup_expired_partitions(db: Session, retention_days: int = None, mode: str = None, now: datetime = None) -> List[str]:
+    """
+    Roll expired partitions up into game_session_daily, then drop or detach them.
+
+    A partition expires once its upper bound is older than the retention
+    window. The rollup and the drop/detach of each partition run in one
+    transaction, so a partition is never counted twice.
+
+    Returns:
+        Names of the partitions that were removed
+    """
+    retention_days = settings.GAME_SESSION_RETENTION_DAYS if retention_days is None else retention_days
+    mode = mode or settings.GAME_SESSION_RETENTION_MODE
+    if mode not in ("drop", "detach"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+
+    partitions = db.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+    """), {"parent": PARENT_TABLE}).all()
+
+    removed = []
+    for name, bound_expr in sorted(partitions):
+        upper = parse_upper_bound(bound_expr or "")
+        if upper is None or upper > cutoff:
+            continue
+
+        try:
+            db.execute(text(f"""
+                INSERT INTO game_session_daily (user_id, day, game_mode, sessions, total_score, max_score)
+                SELECT
+                    user_id,
+                    (timestamp AT TIME ZONE 'UTC')::date,
+                    COALESCE(game_mode, 'default'),
+                    COUNT(*),
+                    SUM(score),
+                    MAX(score)
+                FROM {name}
+                GROUP BY 1, 2, 3
+                ON CONFLICT (user_id, day, game_mode) DO UPDATE SET
+                    sessions = game_session_daily.sessions + EXCLUDED.sessions,
+                    total_score = game_session_daily.total_score + EXCLUDED.total_score,
+                    max_score = GREATEST(game_session_daily.max_score, EXCLUDED.max_score)
+            """))
+            if mode == "drop":
+                db.execute(text(f"DROP TABLE {name}"))
+            else:
+                db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            db.commit()
+            removed.append(name)
+            print(f"Rolled up and {'dropped' if mode == 'drop' else 'detached'} partition {name}")
+        except Exception as e:
+            db.rollback()
+            print(f"Error rolling up partition {name}: {e}")
+
+    return removed
+
+def maintain_partitions():
+    """Create upcoming partitions and apply the retention policy"""
+    db = SessionLocal()
+
+    try:
+        if not _is_postgresql(db):
+            print("game_sessions partitioning is only supported on PostgreSQL, skipping")
+            return
+
+        if _table_kind(db, PARENT_TABLE) != "p":
+            create_partitioned_game_sessions(db)
+        ensure_partitions(db)
+        rollup_expired_partitions(db)
+        db.execute(text(f"ANALYZE {PARENT_TABLE}"))
+        db.commit()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    maintain_partitions()
@@ -0,0 +1,129 @@
+# scripts/serve.py
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+APP = "app.main:app"
+# start_app.py initializes the New Relic agent before importing the app
+NEWRELIC_APP = "start_app:app"
+
+# Printed when serving with several workers: this state lives in each process
+PER_WORKER_WARNING = (
+    "Rate limits, response caches and their invalidation are per worker: with {workers} workers "
+    "each limit allows up to {workers}x its rate per client, and a submit only clears the rank "
+    "and leaderboard caches of the worker that handled it (others refresh on TTL expiry)"
+)
+
+def default_workers(database_url: str, cpu_count: Optional[int] = None) -> int:
+    """
+    One worker per CPU. SQLite stays at one worker: its writes are
+    serialized by a single in-process writer thread, and several processes
+    would contend for the database lock instead.
+    """
+    if database_url.startswith("sqlite"):
+        return 1
+    return max(1, cpu_count or os.cpu_count() or 1)
+
+def fastest_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def fastest_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def build_config(options: argparse.Namespace, database_url: str) -> dict:
+    """
+    Keyword arguments for uvicorn.run in production mode.
+    Raises ValueError for more than one worker on SQLite.
+    """
+    workers = options.workers or int(os.getenv("WEB_CONCURRENCY", "0")) or default_workers(database_url)
+    if workers > 1 and database_url.startswith("sqlite"):
+        raise ValueError(
+            f"SQLite is served by a single worker (got {workers} from --workers/WEB_CONCURRENCY): "
+            "its writes go through one in-process writer thread"
+        )
+    return {
+        "host": options.host,
+        "port": options.port,
+        "workers": workers,
+        "reload": False,
+        "loop": fastest_loop(),
+        "http": fastest_http(),
+        "backlog": options.backlog,
+        "timeout_keep_alive": options.keep_alive,
+        "timeout_graceful_shutdown": options.graceful_timeout,
+        "limit_concurrency": options.limit_concurrency,
+        "access_log": options.access_log,
+        "proxy_headers": True,
+    }
+
+def measure_startup(app: str = APP, runs: int = 3) -> List[float]:
+    """Seconds taken to import the app in a fresh interpreter, per run"""
+    module = app.split(":")[0]
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="run.py serve")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: WEB_CONCURRENCY or one per CPU)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Pending connections the socket queues")
+    parser.add_argument("--keep-alive", type=int, default=15, help="Seconds an idle keep-alive connection stays open")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--limit-concurrency", type=int, default=None, help="Connections per worker before 503s")
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    parser.add_argument("--newrelic", action="store_true", help="Run with the New Relic agent (also set by NEW_RELIC_CONFIG_FILE)")
+    parser.add_argument("--measure-startup", action="store_true", help="Report app import time and exit")
+    return parser.parse_args(args)
+
+def main(args: List[str]):
+    """Entry point for python run.py serve"""
+    options = parse_args(args)
+    app = NEWRELIC_APP if options.newrelic or os.getenv("NEW_RELIC_CONFIG_FILE") else APP
+
+    if options.measure_startup:
+        timings = measure_startup(app)
+        print(
+            f"{app} imports in {min(timings):.2f}s "
+            f"(runs: {', '.join(f'{timing:.2f}s' for timing in timings)})"
+        )
+        return 0
+
+    import uvicorn
+    from app.config import settings
+
+    try:
+        config = build_config(options, settings.DATABASE_URL)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return 1
+    if config["workers"] > 1:
+        print(f"Warning: {PER_WORKER_WARNING.format(workers=config['workers'])}")
+    print(
+        f"Serving {app} on {config['host']}:{config['port']} with {config['workers']} "
+        f"worker(s), loop={config['loop']}, http={config['http']}"
+    )
+    # Each worker reports its startup time relative to this
+    os.environ["SERVE_LAUNCHED_AT"] = str(time.time())
+    uvicorn.run(app, **config)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,32 @@
+import os
+
 import newrelic.agent
-newrelic.agent.initialize('newrelic.ini')
+newrelic.agent.initialize(os.getenv("NEW_RELIC_CONFIG_FILE", "newrelic.ini"))
 
 from app.main import app
+from app.core.tracing import tracer
+
+def record_span(span):
+    """Send each finished trace span to New Relic as a custom event"""
+    event = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentId": span.parent_id,
+        "name": span.name,
+        "durationMs": span.duration_ms,
+        "error": span.error,
+    }
+    event.update({f"attr.{key}": value for key, value in span.attributes.items()})
+    newrelic.agent.record_custom_event("LeaderboardSpan", event, application=newrelic.agent.application())
 
+tracer.add_exporter(record_span)
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    import sys
+    from scripts.serve import main as serve
+    
+    # Production mode with the New Relic agent loaded in every worker
+    sys.exit(serve(["--newrelic"] + sys.argv[1:]))
 
 
     # 8fe21eca4872cf9d834d3559e34e0c5dFFFFNRAL
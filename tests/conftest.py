@@ -12,6 +12,7 @@ from pathlib import Path
 os.environ["TESTING"] = "True"
 
 # Import this after setting TESTING env var to ensure rate limiting is disabled
+from fastapi import Request
 from app.core.rate_limiter import RateLimiter
 
 # Override rate limiter for testing to avoid test failures due to rate limits
@@ -21,7 +22,8 @@ def disable_rate_limiter(monkeypatch):
     """Override the rate limiter call method to always return True during tests"""
     original_call = RateLimiter.__call__
     
-    async def mock_call(*args, **kwargs):
+    # Keep the request parameter so FastAPI still resolves it as a dependency
+    async def mock_call(self, request: Request):
         return True
     
     monkeypatch.setattr(RateLimiter, "__call__", mock_call)
@@ -0,0 +1,67 @@
+# tests/test_explain.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from scripts.explain import (
+    compare_to_baseline, run_explain, seed_dataset, summarize_postgresql_plan
+)
+
+def test_hot_statements_have_no_seq_scans():
+    """Against a seeded dataset, only the full re-rank may touch every row"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        seed_dataset(db, 500)
+        results = run_explain(db)
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    assert set(results) == {
+        "top_page", "top_count", "rank_lookup", "submit_lock", "submit_upsert", "rerank_chunk"
+    }
+    for name, summary in results.items():
+        assert summary["seq_scans"] == [], name
+
+def test_summarize_postgresql_plan():
+    """Seq scans, node types and buffers are read from EXPLAIN JSON"""
+    explain_json = [{
+        "Plan": {
+            "Node Type": "Limit",
+            "Shared Hit Blocks": 40,
+            "Shared Read Blocks": 2,
+            "Plans": [{"Node Type": "Seq Scan", "Relation Name": "leaderboard"}],
+        },
+        "Planning Time": 0.1,
+        "Execution Time": 12.5,
+    }]
+
+    summary = summarize_postgresql_plan(explain_json)
+
+    assert summary["buffers"] == 42
+    assert summary["execution_ms"] == 12.5
+    assert summary["node_types"] == ["Limit", "Seq Scan"]
+    assert summary["seq_scans"] == ["leaderboard"]
+
+def test_compare_to_baseline_flags_regressions():
+    """New seq scans, buffer blowups and slowdowns are reported"""
+    baseline = {
+        "top_page": {"seq_scans": [], "buffers": 10, "execution_ms": 2.0},
+        "rank_lookup": {"seq_scans": [], "buffers": 4, "execution_ms": 0.1},
+    }
+    results = {
+        "top_page": {"seq_scans": ["leaderboard"], "buffers": 5000, "execution_ms": 90.0},
+        "rank_lookup": {"seq_scans": [], "buffers": 5, "execution_ms": 0.5},
+    }
+
+    regressions = compare_to_baseline(results, baseline)
+
+    assert len(regressions) == 3
+    assert all(regression.startswith("top_page") for regression in regressions)
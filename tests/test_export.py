@@ -0,0 +1,102 @@
+# tests/test_export.py
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.config import settings
+from app.db.session import Base, get_db
+from app.core.export import accepts_gzip, export_query, stream_rows
+from app.models.user import User
+from app.models.game import Leaderboard, ModeLeaderboard
+
+client = TestClient(app)
+
+ADMIN = {"X-Admin-Key": "admin-key"}
+
+@pytest.fixture
+def export_db(tmp_path, monkeypatch):
+    """Four ranked players, one not yet ranked, and a ranked mode board"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'export.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    for user_id in range(1, 6):
+        username = 'smith, "jr"' if user_id == 3 else f"player{user_id}"
+        db.add(User(id=user_id, username=username, hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=600 - user_id * 100, rank=user_id if user_id < 5 else None))
+    db.add(ModeLeaderboard(game_mode="ranked", user_id=4, total_score=50, rank=1))
+    db.add(ModeLeaderboard(game_mode="ranked", user_id=2, total_score=20, rank=2))
+    db.commit()
+    db.close()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+    monkeypatch.setattr(settings, "EXPORT_BATCH_ROWS", 2)
+    yield engine
+    engine.dispose()
+
+def test_ndjson_export_streams_ranked_rows_in_order(export_db):
+    response = client.get("/api/leaderboard/export", headers={**ADMIN, "Accept-Encoding": "identity"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["rank"] for row in rows] == [1, 2, 3, 4]
+    assert rows[2] == {"rank": 3, "user_id": 3, "username": 'smith, "jr"', "total_score": 300}
+
+def test_csv_export_with_rank_range_is_gzipped(export_db):
+    with client.stream(
+        "GET", "/api/leaderboard/export?format=csv&min_rank=2&max_rank=3",
+        headers={**ADMIN, "Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-disposition"] == 'attachment; filename="leaderboard.csv"'
+        body = gzip.decompress(b"".join(response.iter_raw())).decode()
+    
+    assert list(csv.reader(io.StringIO(body))) == [
+        ["rank", "user_id", "username", "total_score"],
+        ["2", "2", "player2", "400"],
+        ["3", "3", 'smith, "jr"', "300"],
+    ]
+
+def test_export_by_game_mode(export_db):
+    response = client.get("/api/leaderboard/export?format=csv&game_mode=ranked", headers=ADMIN)
+    assert response.text.splitlines() == ["rank,user_id,username,total_score", "1,4,player4,50", "2,2,player2,20"]
+    
+    response = client.get("/api/leaderboard/export?format=csv&game_mode=unknown", headers=ADMIN)
+    assert response.text.splitlines() == ["rank,user_id,username,total_score"]
+
+def test_export_rejects_bad_requests(export_db):
+    assert client.get("/api/leaderboard/export").status_code == 403
+    assert client.get("/api/leaderboard/export?min_rank=3&max_rank=2", headers=ADMIN).status_code == 400
+    assert client.get("/api/leaderboard/export?format=xml", headers=ADMIN).status_code == 422
+
+def test_rows_are_fetched_in_batches(export_db):
+    batches = list(stream_rows(export_db, export_query(), batch_rows=3))
+    assert [len(batch) for batch in batches] == [3, 1]
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip(None)
@@ -0,0 +1,95 @@
+# tests/test_loadtest.py
+import asyncio
+import io
+import random
+from collections import Counter
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.session import Base, get_db
+from app.models.user import User
+from scripts.loadtest import (
+    LatencyHistogram, ZipfUsers, generate_requests, parse_mix, read_replay, run_load
+)
+
+def test_histogram_percentiles_at_three_significant_digits():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+    
+    summary = histogram.summary()
+    
+    assert summary["p50"] == pytest.approx(500, rel=0.01)
+    assert summary["p99"] == pytest.approx(990, rel=0.01)
+    assert summary["p999"] == pytest.approx(999, rel=0.01)
+    assert summary["max"] == 1000
+    # 1000 distinct values fit in far fewer buckets than samples at high values
+    assert len(histogram.counts) <= 1000
+
+def test_zipf_users_favour_low_ids():
+    users = ZipfUsers(1000, rng=random.Random(1))
+    
+    counts = Counter(users.sample() for _ in range(5000))
+    
+    assert counts.most_common(1)[0][0] == 1
+    assert all(1 <= user_id <= 1000 for user_id in counts)
+
+def test_parse_mix_rejects_unknown_endpoints():
+    assert parse_mix("submit=1,top=3") == {"submit": 1.0, "top": 3.0}
+    with pytest.raises(ValueError):
+        parse_mix("delete=1")
+
+def test_read_replay_classifies_endpoints():
+    log = io.StringIO(
+        '{"method": "post", "path": "/api/leaderboard/submit", "json": {"user_id": 1, "score": 5}, "at": 0.5}\n'
+        '\n'
+        '{"path": "/api/leaderboard/rank/7"}\n'
+    )
+    
+    requests = list(read_replay(log))
+    
+    assert [(r.endpoint, r.method, r.at) for r in requests] == [("submit", "POST", 0.5), ("rank", "GET", None)]
+
+@pytest.fixture
+def in_process_client(tmp_path, monkeypatch, disable_rate_limiter):
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    db.add_all(User(id=user_id, username=f"player{user_id}", hashed_password="x") for user_id in range(1, 21))
+    db.commit()
+    db.close()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    yield lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+    engine.dispose()
+
+def test_run_load_reports_per_endpoint_latencies(in_process_client):
+    """A short closed-loop run against the in-process app"""
+    rng = random.Random(5)
+    requests = generate_requests(parse_mix("submit=0.5,top=0.25,rank=0.25"), ZipfUsers(20, rng=rng), rng)
+    
+    async def run():
+        async with in_process_client() as client:
+            return await run_load(client, requests, total_requests=60, concurrency=4, rng=rng)
+    
+    report = asyncio.run(run())
+    
+    assert report["requests"] == 60
+    assert set(report["endpoints"]) == {"submit", "top", "rank"}
+    for endpoint in report["endpoints"].values():
+        assert set(endpoint["latency_ms"]) == {"p50", "p95", "p99", "p999", "max", "mean"}
+        # Unranked players may 404; nothing should fail on the server
+        assert not any(status.startswith("5") or status == "error" for status in endpoint["statuses"])
+    assert report["endpoints"]["submit"]["statuses"] == {"201": report["endpoints"]["submit"]["requests"]}
@@ -0,0 +1,93 @@
+# tests/test_metrics.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.main import app
+from app.core.metrics import Counter, Histogram, Registry, pool_collector, registry
+from app.core.rate_limiter import RateLimiter
+from scripts.microbench import make_request
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+def test_counter_sums_across_threads():
+    """Each thread records into its own shard; collection adds them up"""
+    test_registry = Registry()
+    counter = test_registry.register(Counter("jobs_total", "Jobs", ("kind",)))
+    
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert 'jobs_total{kind="a"} 4000' in test_registry.render()
+
+def test_histogram_renders_cumulative_buckets():
+    test_registry = Registry()
+    histogram = test_registry.register(Histogram("op_seconds", "Ops", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    
+    output = test_registry.render()
+    
+    assert "# TYPE op_seconds histogram" in output
+    assert 'op_seconds_bucket{le="0.1"} 1' in output
+    assert 'op_seconds_bucket{le="1"} 3' in output
+    assert 'op_seconds_bucket{le="+Inf"} 4' in output
+    assert "op_seconds_count 4" in output
+    assert "op_seconds_sum 4.05" in output
+
+def test_requests_are_labelled_by_route_template():
+    """Path parameters do not create a series per value"""
+    client.get("/health")
+    client.get("/health")
+    client.get("/no-such-page")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"} 2' in response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in response.text
+    assert 'http_requests_in_flight{method="GET"} 0' in response.text
+    # Scrapes are not recorded
+    assert 'route="/metrics"' not in response.text
+
+def test_security_blocks_are_counted():
+    response = client.get("/health", params={"q": "<script>alert(1)</script>"})
+    
+    assert response.status_code == 403
+    assert 'security_blocks_total{reason="suspicious_pattern"} 1' in client.get("/metrics").text
+
+def test_rate_limit_rejections_are_counted_per_limiter():
+    limiter = RateLimiter(limit=1, window=60, name="metrics_test")
+    request = make_request("/api/leaderboard/top", client="198.51.100.99")
+    
+    asyncio.run(limiter(request))
+    with pytest.raises(HTTPException):
+        asyncio.run(limiter(request))
+    
+    assert 'rate_limit_rejections_total{limiter="metrics_test"} 1' in registry.render()
+
+def test_pool_collector_reports_queue_pools(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    with engine.connect():
+        families = {name: samples for name, _, _, samples in pool_collector(lambda: {"primary": engine})()}
+    
+    assert families["db_pool_checked_out"] == [({"engine": "primary"}, 1)]
+    assert families["db_pool_size"] == [({"engine": "primary"}, engine.pool.size())]
@@ -0,0 +1,54 @@
+# tests/test_microbench.py
+import threading
+
+from app.core.cache import leaderboard_cache, player_rank_cache
+from scripts.microbench import build_benchmarks, compare_to_baseline, run_benchmarks
+
+def test_every_benchmark_runs():
+    """Each hot-path benchmark executes and reports a time per op"""
+    results = run_benchmarks(min_time=0.001, repeat=1)
+    
+    assert {
+        "rate_limit_storage_increment", "rate_limiter_call",
+        "cached_leaderboard_hit", "cached_leaderboard_miss",
+        "cached_player_rank_hit", "cached_player_rank_miss",
+        "suspicious_patterns_scan", "suspicious_patterns_exempt", "check_automation",
+        "score_submit_validate", "leaderboard_response_serialize_100",
+    } <= set(results)
+    assert all(result["ns_per_op"] > 0 for result in results.values())
+
+def test_run_benchmarks_filters_by_name():
+    results = run_benchmarks(["cached_player_rank"], min_time=0.001, repeat=1)
+    
+    assert set(results) == {"cached_player_rank_hit", "cached_player_rank_miss"}
+
+def test_compare_to_baseline_flags_slowdowns():
+    baseline = {
+        "check_automation": {"ns_per_op": 2000.0},
+        "rate_limit_storage_increment": {"ns_per_op": 900.0},
+        # Too fast to compare reliably
+        "suspicious_patterns_exempt": {"ns_per_op": 20.0},
+    }
+    results = {
+        "check_automation": {"ns_per_op": 4000.0},
+        "rate_limit_storage_increment": {"ns_per_op": 1000.0},
+        "suspicious_patterns_exempt": {"ns_per_op": 200.0},
+        "score_submit_validate": {"ns_per_op": 2500.0},
+    }
+    
+    regressions = compare_to_baseline(results, baseline)
+    
+    assert len(regressions) == 1
+    assert regressions[0].startswith("check_automation")
+
+def test_benchmarks_leave_no_shared_state_behind():
+    """Fake pages and ranks written through the real cache decorators are cleared"""
+    run_benchmarks(["cached_"], min_time=0.001, repeat=1)
+    
+    assert len(leaderboard_cache) == 0
+    assert len(player_rank_cache) == 0
+    
+    # Building the benchmarks starts no extra rate limit cleanup threads
+    threads = threading.active_count()
+    build_benchmarks()
+    assert threading.active_count() == threads
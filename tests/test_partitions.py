@@ -0,0 +1,69 @@
+# tests/test_partitions.py
+from datetime import date, datetime, timezone
+
+from scripts.partitions import add_months, ensure_partitions, monthly_partitions, parse_upper_bound
+
+class RecordingSession:
+    """Records executed SQL; COUNT(*) on the DEFAULT partition returns default_rows"""
+
+    def __init__(self, default_rows):
+        self.default_rows = default_rows
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        value = self.default_rows if sql.startswith("SELECT COUNT(*) FROM game_sessions_default") else None
+        return type("Result", (), {"scalar": lambda _: value})()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        raise AssertionError("unexpected rollback")
+
+def test_monthly_partitions_cross_year():
+    """Partitions cover the current month plus the months ahead, across year ends"""
+    partitions = monthly_partitions(date(2024, 11, 17), months_ahead=2)
+
+    assert partitions == [
+        ("game_sessions_202411", date(2024, 11, 1), date(2024, 12, 1)),
+        ("game_sessions_202412", date(2024, 12, 1), date(2025, 1, 1)),
+        ("game_sessions_202501", date(2025, 1, 1), date(2025, 2, 1)),
+    ]
+    assert add_months(date(2024, 1, 31), -1) == date(2023, 12, 1)
+
+def test_parse_upper_bound():
+    """Upper bounds are read from pg_get_expr output; DEFAULT has none"""
+    bound = "FOR VALUES FROM ('2024-01-01 01:00:00+01') TO ('2024-02-01 01:00:00+01')"
+
+    assert parse_upper_bound(bound) == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert parse_upper_bound("DEFAULT") is None
+
+def test_ensure_partitions_creates_empty_ranges_directly():
+    """Without rows in DEFAULT the partition is created in place"""
+    db = RecordingSession(default_rows=0)
+    ensure_partitions(db, months_ahead=0, today=date(2025, 3, 10))
+
+    assert db.statements[-1] == (
+        "CREATE TABLE game_sessions_202503 PARTITION OF game_sessions "
+        "FOR VALUES FROM ('2025-03-01 00:00:00+00') TO ('2025-04-01 00:00:00+00')"
+    )
+    assert db.commits == 1
+
+def test_ensure_partitions_moves_rows_out_of_default():
+    """Rows already in DEFAULT for the month are moved into the new partition before it is attached"""
+    db = RecordingSession(default_rows=3)
+    ensure_partitions(db, months_ahead=0, today=date(2025, 3, 10))
+
+    in_range = "timestamp >= '2025-03-01 00:00:00+00' AND timestamp < '2025-04-01 00:00:00+00'"
+    assert db.statements[-3:] == [
+        "CREATE TABLE game_sessions_202503 (LIKE game_sessions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS ( DELETE FROM game_sessions_default WHERE {in_range} RETURNING * ) "
+        "INSERT INTO game_sessions_202503 SELECT * FROM moved",
+        "ALTER TABLE game_sessions ATTACH PARTITION game_sessions_202503 "
+        "FOR VALUES FROM ('2025-03-01 00:00:00+00') TO ('2025-04-01 00:00:00+00')",
+    ]
+    assert not any("PARTITION OF" in sql for sql in db.statements)
+    assert db.commits == 1
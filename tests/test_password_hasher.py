@@ -0,0 +1,103 @@
+# tests/test_password_hasher.py
+import asyncio
+import pytest
+from passlib.context import CryptContext
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import auth
+from app.config import settings
+from app.core.errors import ServiceUnavailableError
+from app.core.security import PasswordHasher, password_hasher
+from app.db.session import Base, get_db
+from app.main import app
+
+
+def test_hash_and_verify_on_process_pool():
+    """Hashes produced by the worker pool verify with the configured cost"""
+    hasher = PasswordHasher(max_workers=1, max_pending=4)
+    try:
+        hashed = asyncio.run(hasher.hash("password123"))
+        verified, new_hash = asyncio.run(hasher.verify_and_update("password123", hashed))
+        assert verified is True
+        assert new_hash is None
+        assert f"${settings.BCRYPT_ROUNDS:02d}$" in hashed
+
+        verified, _ = asyncio.run(hasher.verify_and_update("wrong-password", hashed))
+        assert verified is False
+    finally:
+        hasher.shutdown()
+
+
+def test_rehash_when_cost_changes():
+    """A hash created with a different cost factor is replaced on verify"""
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=settings.BCRYPT_ROUNDS - 1)
+    old_hash = old_context.hash("password123")
+
+    hasher = PasswordHasher(max_workers=0, max_pending=4)
+    verified, new_hash = asyncio.run(hasher.verify_and_update("password123", old_hash))
+
+    assert verified is True
+    assert new_hash is not None
+    assert f"${settings.BCRYPT_ROUNDS:02d}$" in new_hash
+
+
+def test_rejects_when_saturated():
+    """Requests beyond the queue-depth limit get a 503 instead of waiting"""
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+    hasher.in_flight = hasher.capacity
+
+    with pytest.raises(ServiceUnavailableError) as exc_info:
+        asyncio.run(hasher.hash("password123"))
+
+    assert exc_info.value.status_code == 503
+    assert "Retry-After" in exc_info.value.headers
+    assert hasher.in_flight == hasher.capacity
+
+
+def test_signup_and_login_run_queries_off_the_event_loop(tmp_path, monkeypatch):
+    """The async auth endpoints must not block the loop on SQLAlchemy calls"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    calls = []
+
+    def recorded(helper):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                calls.append((helper.__name__, "event loop"))
+            except RuntimeError:
+                calls.append((helper.__name__, "thread pool"))
+            return helper(*args)
+        return wrapper
+
+    for name in ("_get_user_by_username", "_create_user"):
+        monkeypatch.setattr(auth, name, recorded(getattr(auth, name)))
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(password_hasher, "max_workers", 0)
+    client = TestClient(app)
+
+    response = client.post("/api/auth/signup", json={"username": "offloop", "password": "password123"})
+    assert response.status_code == 201
+    response = client.post("/api/auth/login", data={"username": "offloop", "password": "password123"})
+    assert response.status_code == 200
+    assert client.post("/api/auth/signup", json={"username": "offloop", "password": "password123"}).status_code == 409
+
+    assert calls == [
+        ("_get_user_by_username", "thread pool"),
+        ("_create_user", "thread pool"),
+        ("_get_user_by_username", "thread pool"),
+        ("_get_user_by_username", "thread pool"),
+    ]
+    engine.dispose()
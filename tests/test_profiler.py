@@ -0,0 +1,57 @@
+# tests/test_profiler.py
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.profiler import ProfilerMiddleware, SamplingProfiler
+
+def _spin(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+async def busy_app(scope, receive, send):
+    _spin(0.2)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+def _client(profiler, **kwargs):
+    return TestClient(ProfilerMiddleware(busy_app, profiler=profiler, **kwargs))
+
+def test_sampled_requests_are_aggregated_per_route():
+    profiler = SamplingProfiler(interval=0.001)
+    client = _client(profiler, sample_rate=1.0)
+    
+    client.get("/busy")
+    
+    assert profiler.requests == 1
+    assert profiler.samples > 10
+    lines = profiler.collapsed().splitlines()
+    assert all(line.startswith("/busy;") for line in lines)
+    # Collapsed format: frames joined by ; then a space and the sample count
+    top_stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "_spin (tests/test_profiler.py)" in top_stack
+    assert profiler.collapsed("/other") == ""
+
+def test_unsampled_requests_are_not_profiled():
+    profiler = SamplingProfiler(interval=0.001)
+    client = _client(profiler, sample_rate=0.0, admin_key="admin-key")
+    
+    client.get("/busy")
+    client.get("/busy", headers={"X-Profile": "1", "X-Admin-Key": "wrong"})
+    
+    assert profiler.requests == 0
+    assert profiler.collapsed() == ""
+
+def test_admin_header_profiles_one_request():
+    profiler = SamplingProfiler(interval=0.001)
+    client = _client(profiler, sample_rate=0.0, admin_key="admin-key")
+    
+    client.get("/busy", headers={"X-Profile": "1", "X-Admin-Key": "admin-key"})
+    
+    assert profiler.requests == 1
+    assert "_spin" in profiler.collapsed()
+    
+    profiler.reset()
+    assert profiler.collapsed() == ""
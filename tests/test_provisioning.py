@@ -0,0 +1,131 @@
+# tests/test_provisioning.py
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.main import app
+import app.core.provisioning as provisioning
+from app.core.cache import leaderboard_cache
+from app.core.provisioning import provision_users, read_user_records
+from app.core.security import get_password_hash, verify_password
+from app.db.session import Base
+from app.models.user import User
+from app.models.game import Leaderboard
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add(User(username="existing1", hashed_password="x"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+def test_read_user_records_formats():
+    """NDJSON and CSV (with or without a header) produce the same records"""
+    prehashed = get_password_hash("password123")
+    lines = [
+        '{"username": "player1", "password": "password123"}',
+        "username,hashed_password",
+        f"player2,{prehashed}",
+        "",
+    ]
+    records = list(read_user_records(lines))
+
+    assert records[0] == {"username": "player1", "password": "password123", "hashed_password": None}
+    assert records[1]["username"] == "player2"
+    assert records[1]["hashed_password"] == prehashed
+
+def test_provision_users_skips_conflicts(db):
+    """Users and leaderboard rows are inserted in batches; existing and invalid users are skipped"""
+    lines = [
+        "player1,password123",
+        "player2,password456",
+        "existing1,password789",   # Already registered
+        "player1,password000",     # Duplicate within the file
+        "x,short",                 # Invalid
+    ]
+    progress = []
+
+    stats = provision_users(
+        db, read_user_records(lines), batch_size=2, workers=1, progress=progress.append
+    )
+
+    assert stats.read == 5
+    assert stats.created == 2
+    assert stats.skipped == 2
+    assert stats.invalid == 1
+    assert stats.batches == 3
+    assert len(progress) == 3
+
+    user = db.query(User).filter(User.username == "player1").one()
+    assert verify_password("password123", user.hashed_password)
+
+    entries = db.query(Leaderboard).all()
+    assert len(entries) == 2
+    assert all(entry.total_score == 0 for entry in entries)
+
+def test_prehashed_passwords_must_be_verifiable(db):
+    """Hashes login could not verify are counted as invalid instead of imported"""
+    prehashed = get_password_hash("password123")
+    lines = [
+        "username,hashed_password",
+        f"player3,{prehashed}",
+        "player4,not-a-hash",
+        "player5,$2b$12$short",
+    ]
+
+    stats = provision_users(db, read_user_records(lines), batch_size=10, workers=1)
+
+    assert (stats.created, stats.invalid) == (1, 2)
+    user = db.query(User).filter(User.username == "player3").one()
+    assert verify_password("password123", user.hashed_password)
+
+def test_provision_endpoint_caps_workers(monkeypatch):
+    """One request cannot fork more hashing processes than there are CPUs"""
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/auth/provision",
+        params={"workers": (os.cpu_count() or 1) + 1},
+        files={"file": ("users.csv", b"player6,password123\n")},
+        headers={"X-Admin-Key": "admin-key"},
+    )
+
+    assert response.status_code == 422
+
+def test_provisioned_players_are_ranked_and_cached_pages_dropped(db, monkeypatch):
+    """Inserts queue on the SQLite writer, then the board is re-ranked and its cache cleared"""
+    threads = []
+    insert_batch = provisioning._insert_batch
+
+    def recording_insert(db, rows):
+        threads.append(threading.current_thread().name)
+        return insert_batch(db, rows)
+
+    monkeypatch.setattr(provisioning, "_insert_batch", recording_insert)
+    leaderboard_cache["leaderboard:None:all:10:1"] = "stale page"
+
+    stats = provision_users(db, read_user_records(["player7,password123", "player8,password123"]), batch_size=1, workers=1)
+
+    assert stats.created == 2
+    assert threads == ["sqlite-writer", "sqlite-writer"]
+    assert [entry.rank for entry in db.query(Leaderboard).all()] == [1, 1]
+    assert not leaderboard_cache
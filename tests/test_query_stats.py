@@ -0,0 +1,131 @@
+# tests/test_query_stats.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.session import Base, get_db
+from app.core.cache import (
+    invalidate_leaderboard_cache, invalidate_player_rank_cache, invalidate_username_cache
+)
+from app.core.query_stats import (
+    QueryStatsMiddleware, normalize_sql, observe_requests, track_queries
+)
+from app.models.user import User
+from app.models.game import Leaderboard
+
+client = TestClient(app)
+
+# Most statements each endpoint may run with cold caches
+QUERY_BUDGETS = {
+    "/api/leaderboard/top": 3,
+    "/api/leaderboard/rank/{user_id}": 2,
+    "/api/leaderboard/rank/batch": 1,
+    "/api/leaderboard/submit": 10,
+}
+
+@pytest.fixture
+def stats_db(tmp_path, monkeypatch, disable_rate_limiter):
+    """Three ranked players, with every cache cold"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stats.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    for user_id, score, rank in ((1, 300, 2), (2, 500, 1), (3, 100, 3)):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=score, rank=rank))
+    db.commit()
+    db.close()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    yield engine
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    engine.dispose()
+
+def test_normalize_sql_groups_by_shape():
+    first = normalize_sql("SELECT users.id FROM users\n  WHERE users.id IN (?, ?, ?) AND name = 'bob'")
+    second = normalize_sql("SELECT users.id FROM users WHERE users.id IN (?, ?) AND name = 'alice'")
+    
+    assert first == second == "SELECT users.id FROM users WHERE users.id IN (?...) AND name = ?"
+    assert normalize_sql("SELECT * FROM t WHERE id = :id LIMIT 10") == "SELECT * FROM t WHERE id = ? LIMIT ?"
+    assert normalize_sql("SELECT * FROM t WHERE id = %(id)s") == "SELECT * FROM t WHERE id = ?"
+
+def test_track_queries_counts_statements_and_rows(stats_db):
+    with track_queries() as stats:
+        with stats_db.begin() as conn:
+            conn.execute(text("UPDATE leaderboard SET rank = rank"))
+            conn.execute(text("SELECT * FROM leaderboard")).all()
+    
+    assert stats.statements == 2
+    assert stats.rows == 3
+    assert stats.db_seconds > 0
+    assert [count for _, count, _ in stats.grouped()] == [1, 1]
+    
+    # Nothing is recorded outside the block
+    with stats_db.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert stats.statements == 2
+
+def test_endpoints_stay_within_query_budget(stats_db):
+    with observe_requests() as finished:
+        assert client.get("/api/leaderboard/top").status_code == 200
+        assert client.get("/api/leaderboard/rank/1").status_code == 200
+        assert client.post("/api/leaderboard/rank/batch", json={"user_ids": [1, 2, 3]}).status_code == 200
+        assert client.post("/api/leaderboard/submit", json={"user_id": 1, "score": 50}).status_code == 201
+    
+    statements = {route: stats.statements for _, route, stats in finished}
+    assert set(statements) == set(QUERY_BUDGETS)
+    for route, budget in QUERY_BUDGETS.items():
+        assert 0 < statements[route] <= budget, (route, statements[route])
+
+def test_cached_read_runs_no_queries(stats_db):
+    client.get("/api/leaderboard/top")
+    
+    with observe_requests() as finished:
+        client.get("/api/leaderboard/top")
+    
+    assert finished[0][2].statements == 0
+
+def test_budget_overrun_is_logged_with_normalized_sql(capsys):
+    middleware = QueryStatsMiddleware(app=None, max_statements=1)
+    with track_queries() as stats:
+        stats.record("SELECT * FROM users WHERE id = 1", -1, 0.001)
+        stats.record("SELECT * FROM users WHERE id = 2", -1, 0.001)
+    
+    middleware._finish({"method": "GET", "path": "/api/leaderboard/top"}, stats)
+    
+    output = capsys.readouterr().out
+    assert "Query budget exceeded: GET /api/leaderboard/top ran 2 queries" in output
+    assert "2x" in output and "SELECT * FROM users WHERE id = ?" in output
+
+def test_server_timing_header(stats_db):
+    """The header carries the DB time and statement count of the request"""
+    async def endpoint(scope, receive, send):
+        with stats_db.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    
+    timed = TestClient(QueryStatsMiddleware(endpoint, server_timing=True))
+    response = timed.get("/")
+    
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="2 queries, 0 rows"')
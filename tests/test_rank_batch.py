@@ -0,0 +1,100 @@
+# tests/test_rank_batch.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.session import Base, get_db
+from app.core.cache import invalidate_player_rank_cache, invalidate_username_cache, player_rank_cache
+from app.core.query_stats import observe_requests
+from app.core.rate_limiter import RateLimiter, get_player_rank_limiter
+from app.models.user import User
+from app.models.game import Leaderboard, ModeLeaderboard
+
+client = TestClient(app)
+
+# Saved before disable_rate_limiter replaces it
+LIMITER_CALL = RateLimiter.__call__
+
+@pytest.fixture
+def batch_db(tmp_path, monkeypatch, disable_rate_limiter):
+    """Three ranked players, one not yet ranked and one ranked in "ranked" mode"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'batch.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    for user_id, score, rank in ((1, 300, 2), (2, 500, 1), (3, 100, 3), (4, 50, None)):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=score, rank=rank))
+    db.add(ModeLeaderboard(game_mode="ranked", user_id=3, total_score=100, rank=1))
+    db.commit()
+    db.close()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    yield engine
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    engine.dispose()
+
+def test_results_follow_request_order_with_markers(batch_db):
+    response = client.post("/api/leaderboard/rank/batch", json={"user_ids": [3, 999, 2, 4, 3]})
+    
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"user_id": 3, "status": "ok", "username": "player3", "rank": 3, "total_score": 100},
+        {"user_id": 999, "status": "user_not_found", "username": None, "rank": None, "total_score": None},
+        {"user_id": 2, "status": "ok", "username": "player2", "rank": 1, "total_score": 500},
+        {"user_id": 4, "status": "not_ranked", "username": "player4", "rank": None, "total_score": None},
+        {"user_id": 3, "status": "ok", "username": "player3", "rank": 3, "total_score": 100},
+    ]
+
+def test_misses_take_one_query_and_share_the_rank_cache(batch_db):
+    # Cached by the single-player endpoint
+    assert client.get("/api/leaderboard/rank/1").status_code == 200
+    
+    with observe_requests() as finished:
+        response = client.post("/api/leaderboard/rank/batch", json={"user_ids": [1, 2, 3, 999]})
+        assert [result["rank"] for result in response.json()["results"]] == [2, 1, 3, None]
+        client.post("/api/leaderboard/rank/batch", json={"user_ids": [2, 3, 1]})
+    
+    assert [stats.statements for _, _, stats in finished] == [1, 0]
+    assert player_rank_cache[(2, None, "all")].rank == 1
+    
+    # The single-player endpoint now hits the entries the batch cached
+    with observe_requests() as finished:
+        assert client.get("/api/leaderboard/rank/3").json()["rank"] == 3
+    assert finished[0][2].statements == 0
+
+def test_game_mode_batch(batch_db):
+    response = client.post("/api/leaderboard/rank/batch?game_mode=ranked", json={"user_ids": [3, 1]})
+    
+    assert [(result["status"], result["rank"]) for result in response.json()["results"]] == [
+        ("ok", 1), ("not_ranked", None)
+    ]
+
+def test_batch_size_is_validated(batch_db):
+    assert client.post("/api/leaderboard/rank/batch", json={"user_ids": []}).status_code == 422
+    assert client.post("/api/leaderboard/rank/batch", json={"user_ids": list(range(1, 202))}).status_code == 422
+    assert client.post("/api/leaderboard/rank/batch", json={"user_ids": list(range(1, 201))}).status_code == 200
+
+def test_batch_counts_as_one_rate_limited_request(batch_db, monkeypatch):
+    monkeypatch.setattr(RateLimiter, "__call__", LIMITER_CALL)
+    monkeypatch.setattr(get_player_rank_limiter, "limit", 1)
+    monkeypatch.setattr(get_player_rank_limiter, "key_func", lambda request: "rank-batch-test")
+    
+    assert client.post("/api/leaderboard/rank/batch", json={"user_ids": list(range(1, 201))}).status_code == 200
+    assert client.post("/api/leaderboard/rank/batch", json={"user_ids": [1]}).status_code == 429
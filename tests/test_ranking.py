@@ -0,0 +1,77 @@
+# tests/test_ranking.py
+import random
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.core.ranking import rerank_leaderboard
+from app.models.user import User
+from app.models.game import Leaderboard
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    
+    scores = random.Random(7).choices(range(20), k=50)
+    for user_id, score in enumerate(scores, start=1):
+        session.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        session.add(Leaderboard(user_id=user_id, total_score=score))
+    session.commit()
+    
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def expected_ranks(db):
+    return dict(db.execute(text(
+        "SELECT id, RANK() OVER (ORDER BY total_score DESC) FROM leaderboard"
+    )).all())
+
+def current_ranks(db):
+    return dict(db.query(Leaderboard.id, Leaderboard.rank).all())
+
+def test_chunked_rerank_matches_rank_window_function(db):
+    """Ties spanning chunk boundaries get the same rank as RANK()"""
+    stats = rerank_leaderboard(db, chunk_size=7)
+    
+    assert current_ranks(db) == expected_ranks(db)
+    assert stats.scanned == 50
+    assert stats.changed == 50
+    assert len(stats.chunks) == 8
+
+def test_rerank_only_writes_changed_rows(db):
+    """A second pass writes nothing; a score change writes only the rows it moved"""
+    rerank_leaderboard(db, chunk_size=7)
+    
+    assert rerank_leaderboard(db, chunk_size=7).changed == 0
+    
+    # A one-point bump only moves the player past those tied one point above
+    player = db.query(Leaderboard).order_by(Leaderboard.total_score, Leaderboard.id).offset(25).first()
+    player.total_score += 1
+    db.commit()
+    before = current_ranks(db)
+    
+    stats = rerank_leaderboard(db, chunk_size=7)
+    after = current_ranks(db)
+    
+    assert after == expected_ranks(db)
+    assert stats.changed == sum(1 for row_id in after if after[row_id] != before[row_id])
+    assert stats.changed < stats.scanned
+
+def test_rerank_reports_each_chunk(db):
+    """Progress is reported with rows scanned, changed and elapsed time per chunk"""
+    reported = []
+    
+    rerank_leaderboard(db, chunk_size=20, progress=reported.append)
+    
+    assert [chunk["scanned"] for chunk in reported] == [20, 20, 10]
+    assert all(chunk["elapsed_ms"] >= 0 for chunk in reported)
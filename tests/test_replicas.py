@@ -0,0 +1,115 @@
+# tests/test_replicas.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.api.leaderboard as leaderboard_api
+import app.db.session as db_session
+from app.main import app
+from app.db.session import Base, get_db
+from app.db.replicas import ReplicaRouter
+from app.core.cache import invalidate_leaderboard_cache, invalidate_player_rank_cache, invalidate_username_cache
+from app.models.user import User
+from app.models.game import Leaderboard
+
+def make_database(path, scores):
+    """A file-backed database with one leaderboard entry per score"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for user_id, score in enumerate(scores, start=1):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=score, rank=user_id))
+    db.commit()
+    db.close()
+    return engine
+
+@pytest.fixture
+def primary_and_replica(tmp_path, monkeypatch, disable_rate_limiter):
+    """Primary and replica databases whose leaderboards differ"""
+    primary = make_database(tmp_path / "primary.db", [900, 800])
+    replica = make_database(tmp_path / "replica.db", [300, 200])
+    router = ReplicaRouter([replica], read_your_writes_seconds=60)
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=primary)
+    
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    monkeypatch.setattr(db_session, "replica_router", router)
+    monkeypatch.setattr(leaderboard_api, "replica_router", router)
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    yield router
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    primary.dispose()
+    replica.dispose()
+
+def test_round_robin_rotates_replicas():
+    """Each selection starts from the next replica"""
+    engines = [create_engine("sqlite://") for _ in range(3)]
+    router = ReplicaRouter(engines)
+    
+    firsts = [router.candidates()[0] for _ in range(4)]
+    
+    assert firsts == [engines[0], engines[1], engines[2], engines[0]]
+
+def test_unreachable_replica_is_skipped(tmp_path):
+    """A replica that cannot connect is marked down and the next one is used"""
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    healthy = create_engine("sqlite://")
+    router = ReplicaRouter([broken, healthy])
+    
+    db = router.session()
+    try:
+        assert db.get_bind() is healthy
+        assert router.candidates() == [healthy]
+    finally:
+        db.close()
+
+def test_no_usable_replica_returns_none(tmp_path):
+    """With every replica down the caller falls back to the primary"""
+    router = ReplicaRouter([create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")])
+    
+    assert router.session() is None
+
+def test_reads_are_served_by_replica(primary_and_replica):
+    """/top and /rank read from the replica"""
+    client = TestClient(app)
+    
+    top = client.get("/api/leaderboard/top")
+    rank = client.get("/api/leaderboard/rank/1")
+    
+    assert [entry["total_score"] for entry in top.json()["leaderboard"]] == [300, 200]
+    assert rank.json()["total_score"] == 300
+
+def test_read_your_writes_after_submit(primary_and_replica):
+    """After a submit the user's rank is read from the primary"""
+    client = TestClient(app)
+    
+    response = client.post("/api/leaderboard/submit", json={"user_id": 2, "score": 500})
+    assert response.status_code == 201
+    
+    # The submitter sees their write; other users still read the replica
+    assert client.get("/api/leaderboard/rank/2").json()["total_score"] == 1300
+    assert client.get("/api/leaderboard/rank/1").json()["total_score"] == 300
+
+def test_rank_batch_reads_recent_writers_from_primary(primary_and_replica):
+    """A batch lookup keeps the submitter on the primary and caches the fresh rank"""
+    client = TestClient(app)
+    
+    assert client.post("/api/leaderboard/submit", json={"user_id": 2, "score": 500}).status_code == 201
+    
+    response = client.post("/api/leaderboard/rank/batch", json={"user_ids": [1, 2]})
+    assert [result["total_score"] for result in response.json()["results"]] == [300, 1300]
+    
+    # The entry cached by the batch is the primary's, so /rank serves it too
+    assert client.get("/api/leaderboard/rank/2").json()["total_score"] == 1300
@@ -0,0 +1,113 @@
+# tests/test_seasons.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.config import settings
+from app.db.session import Base, get_db
+from app.core.cache import invalidate_leaderboard_cache, invalidate_player_rank_cache
+from app.core.seasons import rollover_season
+from app.models.user import User
+from app.models.game import Leaderboard, ModeLeaderboard, Season
+
+client = TestClient(app)
+
+@pytest.fixture
+def season_db(tmp_path, monkeypatch, disable_rate_limiter):
+    """A database with three ranked players, wired into the app"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'seasons.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    for user_id, score, rank in ((1, 300, 2), (2, 500, 1), (3, 100, 3)):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=score, rank=rank))
+        db.add(ModeLeaderboard(game_mode="ranked", user_id=user_id, total_score=score // 10))
+    db.commit()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    yield db
+    db.close()
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    engine.dispose()
+
+def test_rollover_swaps_in_empty_tables(season_db):
+    """The season's rows move to archive tables and the live tables start empty"""
+    closed = rollover_season(season_db)
+    
+    assert (closed.id, closed.players) == (1, 3)
+    assert closed.ended_at is not None
+    assert season_db.query(Leaderboard).count() == 0
+    assert season_db.query(ModeLeaderboard).count() == 0
+    assert [(s.name, s.ended_at is None) for s in season_db.query(Season).order_by(Season.id)] == [
+        ("Season 1", False), ("Season 2", True)
+    ]
+    
+    inspector = inspect(season_db.get_bind())
+    live_indexes = {index["name"] for index in inspector.get_indexes("leaderboard")}
+    archive_indexes = {index["name"] for index in inspector.get_indexes("leaderboard_season_1")}
+    assert "idx_leaderboard_rank_covering" in live_indexes
+    assert "idx_leaderboard_rank_covering_season_1" in archive_indexes
+
+def test_consecutive_rollovers(season_db):
+    """Each rollover archives into its own season tables"""
+    rollover_season(season_db)
+    season_db.add(Leaderboard(user_id=1, total_score=42))
+    season_db.commit()
+    
+    closed = rollover_season(season_db, name="Winter")
+    
+    assert (closed.id, closed.players) == (2, 1)
+    assert season_db.query(Season).filter(Season.ended_at.is_(None)).one().name == "Winter"
+    assert inspect(season_db.get_bind()).has_table("leaderboard_season_2")
+
+def test_rollover_requires_admin_key(season_db):
+    response = client.post("/api/leaderboard/seasons/rollover")
+    
+    assert response.status_code == 403
+
+def test_season_history_endpoints(season_db):
+    """Archived standings are queryable per season and caches are reset"""
+    assert client.get("/api/leaderboard/top").json()["total_entries"] == 3
+    
+    response = client.post(
+        "/api/leaderboard/seasons/rollover",
+        params={"name": "Season Two"},
+        headers={"X-Admin-Key": "admin-key"}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["players"] == 3
+    
+    # The cached all-time page was dropped with the swap
+    assert client.get("/api/leaderboard/top").json()["total_entries"] == 0
+    
+    seasons = client.get("/api/leaderboard/seasons").json()
+    assert [season["name"] for season in seasons] == ["Season Two", "Season 1"]
+    
+    top = client.get("/api/leaderboard/seasons/1/top").json()
+    assert [(e["rank"], e["username"], e["total_score"]) for e in top["leaderboard"]] == [
+        (1, "player2", 500), (2, "player1", 300), (3, "player3", 100)
+    ]
+    
+    rank = client.get("/api/leaderboard/seasons/1/rank/1", params={"game_mode": "ranked"}).json()
+    assert (rank["rank"], rank["total_score"]) == (2, 30)
+    
+    # The running season has no archive yet
+    assert client.get("/api/leaderboard/seasons/2/top").status_code == 404
@@ -0,0 +1,48 @@
+# tests/test_serve.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from scripts.serve import build_config, default_workers, measure_startup, parse_args
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_workers_follow_cpu_count_except_on_sqlite():
+    assert default_workers("postgresql://db/leaderboard", cpu_count=8) == 8
+    assert default_workers("postgresql://db/leaderboard", cpu_count=None) >= 1
+    assert default_workers("sqlite:///./leaderboard_db", cpu_count=8) == 1
+
+def test_production_config(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    config = build_config(parse_args([]), "postgresql://db/leaderboard")
+    
+    assert config["reload"] is False
+    assert config["workers"] == default_workers("postgresql://db/leaderboard")
+    assert config["loop"] in ("uvloop", "asyncio")
+    assert config["http"] in ("httptools", "h11")
+    assert (config["backlog"], config["timeout_keep_alive"], config["timeout_graceful_shutdown"]) == (2048, 15, 30)
+    assert config["access_log"] is False
+
+def test_worker_overrides(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert build_config(parse_args([]), "postgresql://db/leaderboard")["workers"] == 3
+    assert build_config(parse_args(["--workers", "5"]), "postgresql://db/leaderboard")["workers"] == 5
+
+def test_sqlite_refuses_several_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    with pytest.raises(ValueError):
+        build_config(parse_args([]), "sqlite:///./leaderboard_db")
+    with pytest.raises(ValueError):
+        build_config(parse_args(["--workers", "2"]), "sqlite:///./leaderboard_db")
+    assert build_config(parse_args(["--workers", "1"]), "sqlite:///./leaderboard_db")["workers"] == 1
+
+def test_app_import_is_measured_without_newrelic():
+    """app.main no longer pulls in the New Relic agent"""
+    code = "import sys, app.main; print('newrelic' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "False"
+    
+    timings = measure_startup(runs=1)
+    assert len(timings) == 1 and timings[0] > 0
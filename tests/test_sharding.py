@@ -0,0 +1,167 @@
+# tests/test_sharding.py
+import random
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import app.api.leaderboard as leaderboard_api
+from app.main import app
+from app.db.session import Base, get_db
+from app.db.shards import ShardSet, shard_index, shard_table
+from app.core.cache import invalidate_leaderboard_cache, invalidate_player_rank_cache
+from app.core.sharding import copy_leaderboard_to_shards
+from app.models.user import User
+from app.models.game import Leaderboard
+
+client = TestClient(app)
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch, disable_rate_limiter):
+    """A primary with 30 users and the global leaderboard split over three shards"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=primary)
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=primary)
+    db = PrimarySession()
+    for user_id in range(1, 31):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+    db.commit()
+    db.close()
+    
+    shards = ShardSet([
+        create_engine(f"sqlite:///{tmp_path / f'shard{i}.db'}", connect_args={"check_same_thread": False})
+        for i in range(3)
+    ])
+    shards.create_schema([Leaderboard.__table__])
+    
+    def override_get_db():
+        session = PrimarySession()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(leaderboard_api, "leaderboard_shards", shards)
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    yield shards
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    for engine in shards.engines + [primary]:
+        engine.dispose()
+
+def test_shard_index_is_stable_and_spread():
+    counts = Counter(shard_index(user_id, 4) for user_id in range(1, 4001))
+    
+    assert shard_index(12345, 4) == shard_index(12345, 4)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 800
+
+def test_shard_table_drops_foreign_keys():
+    table = shard_table(Leaderboard.__table__)
+    
+    assert not table.foreign_keys
+    assert {index.name for index in table.indexes} == {index.name for index in Leaderboard.__table__.indexes}
+
+def test_sharded_endpoints_match_single_table_ranking(sharded):
+    """Submits land on the owning shard; /top and /rank see the merged board"""
+    rng = random.Random(3)
+    totals = Counter()
+    for _ in range(60):
+        user_id = rng.randint(1, 30)
+        # Coarse scores so ties span shards
+        score = rng.choice((100, 200, 300))
+        response = client.post("/api/leaderboard/submit", json={"user_id": user_id, "score": score})
+        assert response.status_code == 201
+        totals[user_id] += score
+    
+    # Every user's total is on its owning shard only
+    for index, engine in enumerate(sharded.engines):
+        db = sharded.session(index)
+        try:
+            for user_id, total in db.query(Leaderboard.user_id, Leaderboard.total_score):
+                assert shard_index(user_id, 3) == index
+                assert totals[user_id] == total
+        finally:
+            db.close()
+    
+    ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    expected = [
+        (1 + sum(1 for _, other in ordered if other > total), user_id, total)
+        for user_id, total in ordered
+    ]
+    
+    pages = []
+    for page in (1, 2, 3):
+        body = client.get("/api/leaderboard/top", params={"limit": 10, "page": page}).json()
+        assert body["total_entries"] == len(totals)
+        pages += [(e["rank"], e["user_id"], e["total_score"]) for e in body["leaderboard"]]
+    assert pages == expected
+    
+    for rank, user_id, total in expected:
+        body = client.get(f"/api/leaderboard/rank/{user_id}").json()
+        assert (body["rank"], body["total_score"]) == (rank, total)
+
+def test_sharded_rank_batch_queries_each_shard_once_per_round(sharded, monkeypatch):
+    """Totals take one IN query per owning shard, ranks one query per shard"""
+    totals = {user_id: (user_id % 7) * 100 for user_id in range(1, 31)}
+    for user_id, total in totals.items():
+        db = sharded.session_for(user_id)
+        db.add(Leaderboard(user_id=user_id, total_score=total))
+        db.commit()
+        db.close()
+    
+    runs = []
+    run = sharded._run
+    monkeypatch.setattr(sharded, "_run", lambda index, func, *args: runs.append(func.__name__) or run(index, func, *args))
+    
+    user_ids = list(range(1, 31)) + [999]
+    response = client.post("/api/leaderboard/rank/batch", json={"user_ids": user_ids})
+    
+    assert sorted(runs) == ["_count_above_each"] * 3 + ["_totals_for"] * 3
+    for user_id, result in zip(user_ids, response.json()["results"]):
+        if user_id == 999:
+            assert result["status"] == "user_not_found"
+            continue
+        rank = 1 + sum(1 for other in totals.values() if other > totals[user_id])
+        assert (result["rank"], result["total_score"]) == (rank, totals[user_id])
+
+def test_failed_shard_write_is_reconciled_not_reported(sharded, monkeypatch):
+    """A committed score is never reported as failed; its shard total is rebuilt instead"""
+    assert client.post("/api/leaderboard/submit", json={"user_id": 5, "score": 300}).status_code == 201
+    
+    def fail(db, user_id, score):
+        raise OperationalError("UPDATE leaderboard", {}, Exception("shard unavailable"))
+    
+    monkeypatch.setattr(leaderboard_api, "add_shard_score", fail)
+    response = client.post("/api/leaderboard/submit", json={"user_id": 5, "score": 200})
+    
+    assert response.status_code == 201
+    assert client.get("/api/leaderboard/rank/5").json()["total_score"] == 500
+
+def test_copy_leaderboard_to_shards(sharded, tmp_path):
+    """Existing totals land on their owning shard, once"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    db = sessionmaker(bind=primary)()
+    db.add_all(Leaderboard(user_id=user_id, total_score=user_id * 10) for user_id in range(1, 31))
+    db.commit()
+    
+    try:
+        assert copy_leaderboard_to_shards(db, sharded, batch_size=7) == 30
+        assert copy_leaderboard_to_shards(db, sharded, batch_size=7) == 0
+    finally:
+        db.close()
+        primary.dispose()
+    
+    for index in range(3):
+        shard_db = sharded.session(index)
+        try:
+            for user_id, total in shard_db.query(Leaderboard.user_id, Leaderboard.total_score):
+                assert shard_index(user_id, 3) == index
+                assert total == user_id * 10
+        finally:
+            shard_db.close()
@@ -0,0 +1,84 @@
+# tests/test_sqlite_mode.py
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import configure_sqlite
+from app.db.writer import SingleWriter
+
+@pytest.fixture
+def sqlite_session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'leaderboard.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    configure_sqlite(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+def test_configure_sqlite_sets_pragmas(sqlite_session):
+    """Every connection gets WAL and the tuned pragmas"""
+    connection = sqlite_session.connection()
+    
+    assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    # NORMAL
+    assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+    assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+def test_single_writer_runs_writes_in_order_on_one_thread(sqlite_session):
+    """Queued writes run one at a time on the writer thread"""
+    writer = SingleWriter()
+    seen = []
+    
+    def write(db, value):
+        seen.append((value, threading.current_thread().name))
+        return value * 2
+    
+    async def submit_all():
+        return await asyncio.gather(*(writer.run(sqlite_session, write, i) for i in range(5)))
+    
+    try:
+        results = asyncio.run(submit_all())
+    finally:
+        writer.shutdown()
+    
+    assert results == [0, 2, 4, 6, 8]
+    assert [value for value, _ in seen] == [0, 1, 2, 3, 4]
+    assert {thread for _, thread in seen} == {"sqlite-writer"}
+
+def test_single_writer_propagates_errors(sqlite_session):
+    """Exceptions from the write are raised in the caller"""
+    writer = SingleWriter()
+    
+    def fail(db):
+        raise ValueError("write failed")
+    
+    try:
+        with pytest.raises(ValueError, match="write failed"):
+            asyncio.run(writer.run(sqlite_session, fail))
+    finally:
+        writer.shutdown()
+
+def test_single_writer_runs_other_databases_on_the_thread_pool():
+    """Without SQLite, writes run concurrently off the event loop thread"""
+    writer = SingleWriter()
+    postgres = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    db = SimpleNamespace(get_bind=lambda: postgres)
+    
+    def write(db, value):
+        return value, threading.current_thread()
+    
+    async def submit():
+        return await writer.run(db, write, 7), threading.current_thread()
+    
+    (value, write_thread), loop_thread = asyncio.run(submit())
+    
+    assert value == 7
+    assert write_thread is not loop_thread
+    assert writer.pending == 0
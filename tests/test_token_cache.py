@@ -0,0 +1,126 @@
+# tests/test_token_cache.py
+import asyncio
+import pytest
+from datetime import timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import settings
+from app.api.dependencies import get_current_user
+from app.core.cache import token_cache, revoked_tokens, revoke_token, invalidate_token_cache
+from app.core.errors import UnauthorizedError
+from app.core.security import create_access_token
+from app.db.session import Base, get_db
+from app.models.user import User
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+statements = []
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statements(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add(User(id=1, username="cacheduser", hashed_password="x"))
+    session.add(User(id=2, username="inactiveuser", hashed_password="x", is_active=False))
+    session.commit()
+    invalidate_token_cache()
+    # Tokens issued in the same second are identical across tests
+    revoked_tokens.clear()
+    statements.clear()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+def test_cached_token_skips_database(db):
+    """Second request with the same token is served from the token cache"""
+    token = create_access_token(subject=1)
+
+    user = asyncio.run(get_current_user(db=db, token=token))
+    assert user.username == "cacheduser"
+    queries_after_first = len(statements)
+    assert queries_after_first > 0
+
+    cached = asyncio.run(get_current_user(db=db, token=token))
+    assert cached is user
+    assert len(statements) == queries_after_first
+
+def test_cache_entry_expires_with_token(db):
+    """A cached entry never outlives the token's exp claim"""
+    token = create_access_token(subject=1, expires_delta=timedelta(seconds=-1))
+
+    with pytest.raises(UnauthorizedError):
+        asyncio.run(get_current_user(db=db, token=token))
+    assert len(token_cache) == 0
+
+def test_revoked_token_is_rejected(db):
+    """Revocation evicts the token and rejects it afterwards"""
+    token = create_access_token(subject=1)
+    asyncio.run(get_current_user(db=db, token=token))
+
+    revoke_token(token)
+
+    with pytest.raises(UnauthorizedError):
+        asyncio.run(get_current_user(db=db, token=token))
+
+def test_inactive_user_is_rejected(db):
+    """Inactive users are rejected and never cached"""
+    token = create_access_token(subject=2)
+
+    with pytest.raises(UnauthorizedError):
+        asyncio.run(get_current_user(db=db, token=token))
+    assert len(token_cache) == 0
+
+@pytest.fixture
+def client(db, monkeypatch):
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+    return TestClient(app)
+
+def test_logout_revokes_the_token(db, client):
+    """A cached token stops working once its owner logs out"""
+    token = create_access_token(subject=1)
+    asyncio.run(get_current_user(db=db, token=token))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+
+    with pytest.raises(UnauthorizedError):
+        asyncio.run(get_current_user(db=db, token=token))
+    assert client.post("/api/auth/logout", headers=headers).status_code == 401
+
+def test_deactivation_drops_cached_tokens(db, client):
+    """A deactivated user's cached token is rejected on the next request"""
+    token = create_access_token(subject=1)
+    asyncio.run(get_current_user(db=db, token=token))
+
+    response = client.post("/api/auth/users/1/deactivate", headers={"X-Admin-Key": "admin-key"})
+    assert response.status_code == 200
+    assert len(token_cache) == 0
+
+    db.expire_all()
+    with pytest.raises(UnauthorizedError) as rejected:
+        asyncio.run(get_current_user(db=db, token=token))
+    assert rejected.value.detail == "Inactive user"
+    assert client.post("/api/auth/users/99/deactivate", headers={"X-Admin-Key": "admin-key"}).status_code == 404
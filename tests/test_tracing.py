@@ -0,0 +1,128 @@
+# tests/test_tracing.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, trace_buffer
+from app.db.session import Base, get_db
+from app.core.cache import (
+    invalidate_leaderboard_cache, invalidate_player_rank_cache, invalidate_username_cache
+)
+from app.core.rate_limiter import RateLimiter
+from app.core.tracing import JsonLinesExporter, NOOP_SPAN, span, tracer
+from app.models.user import User
+from app.models.game import Leaderboard
+from scripts.microbench import make_request
+
+client = TestClient(app)
+
+@pytest.fixture
+def traced_db(tmp_path, monkeypatch, disable_rate_limiter):
+    """Two ranked players, with every request traced"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'tracing.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    for user_id, score, rank in ((1, 300, 2), (2, 500, 1)):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+        db.add(Leaderboard(user_id=user_id, total_score=score, rank=rank))
+    db.commit()
+    db.close()
+    
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    trace_buffer.clear()
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    yield engine
+    trace_buffer.clear()
+    invalidate_leaderboard_cache()
+    invalidate_player_rank_cache()
+    invalidate_username_cache()
+    engine.dispose()
+
+def _by_name(spans):
+    return {finished["name"]: finished for finished in spans}
+
+def test_read_request_spans(traced_db):
+    client.get("/api/leaderboard/top")
+    
+    spans = trace_buffer.spans()
+    names = _by_name(spans)
+    root = names["http.request"]
+    assert root["parent_id"] is None
+    assert root["attributes"] == {
+        "method": "GET", "path": "/api/leaderboard/top", "status": 200, "route": "/api/leaderboard/top"
+    }
+    assert {finished["trace_id"] for finished in spans} == {root["trace_id"]}
+    assert names["cache_lookup"]["attributes"] == {"cache": "leaderboard", "hit": False}
+    assert names["security_scan"]["attributes"] == {"blocked": False}
+    assert names["endpoint"]["parent_id"] == names["handler"]["span_id"]
+    assert names["serialize"]["parent_id"] == names["handler"]["span_id"]
+    assert any(
+        finished["name"] == "db.query" and finished["attributes"]["statement"].startswith("SELECT count")
+        for finished in spans
+    )
+
+def test_submit_spans_show_locks_and_commit(traced_db):
+    response = client.post("/api/leaderboard/submit", json={"user_id": 1, "score": 50})
+    assert response.status_code == 201
+    
+    spans = trace_buffer.spans()
+    root = _by_name(spans)["http.request"]
+    request_spans = _by_name(finished for finished in spans if finished["trace_id"] == root["trace_id"])
+    writer = request_spans["single_writer"]
+    for name in ("lock.leaderboard_row", "lock.mode_row", "db.commit"):
+        assert request_spans[name]["parent_id"] == writer["span_id"], name
+    
+    # The background re-rank is its own trace, linked to the submit
+    rank_update = _by_name(spans)["rank_update"]
+    assert rank_update["trace_id"] != root["trace_id"]
+    assert rank_update["links"] == [{"trace_id": root["trace_id"], "span_id": root["span_id"]}]
+    assert rank_update["attributes"] == {"game_mode": "default"}
+    assert any(
+        finished["trace_id"] == rank_update["trace_id"] and finished["name"] == "db.query"
+        for finished in spans
+    )
+
+def test_unsampled_requests_record_nothing(traced_db, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    
+    client.get("/api/leaderboard/top")
+    
+    assert trace_buffer.spans() == []
+    assert span("anything") is NOOP_SPAN
+
+def test_rate_limit_span_and_jsonl_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    exporter = JsonLinesExporter(str(tmp_path / "spans.jsonl"))
+    tracer.add_exporter(exporter)
+    limiter = RateLimiter(limit=100, window=60, name="tracing_test")
+    try:
+        with tracer.start_trace("job") as root:
+            asyncio.run(limiter(make_request("/api/leaderboard/top", client="198.51.100.77")))
+    finally:
+        tracer.remove_exporter(exporter)
+        exporter.close()
+    
+    lines = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    names = _by_name(lines)
+    assert names["rate_limit"]["attributes"] == {"limiter": "tracing_test"}
+    assert names["rate_limit"]["parent_id"] == root.span_id
+    assert names["job"]["duration_ms"] >= names["rate_limit"]["duration_ms"]
@@ -0,0 +1,102 @@
+# tests/test_username_cache.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.session import Base, get_db
+from app.core.cache import get_usernames, invalidate_player_rank_cache, invalidate_username_cache, username_cache
+from app.models.user import User
+from app.models.game import Leaderboard
+
+client = TestClient(app)
+
+@pytest.fixture
+def users_db(tmp_path, monkeypatch, disable_rate_limiter):
+    """Three users, only the first of them ranked; yields (session factory, executed statements)"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'usernames.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    for user_id in (1, 2, 3):
+        db.add(User(id=user_id, username=f"player{user_id}", hashed_password="x"))
+    db.add(Leaderboard(user_id=1, total_score=100, rank=1))
+    db.commit()
+    db.close()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    invalidate_username_cache()
+    invalidate_player_rank_cache()
+    yield SessionLocal, statements
+    invalidate_username_cache()
+    invalidate_player_rank_cache()
+    engine.dispose()
+
+def test_misses_are_loaded_with_one_in_query(users_db):
+    SessionLocal, statements = users_db
+    db = SessionLocal()
+    try:
+        assert get_usernames(db, [1, 2]) == {1: "player1", 2: "player2"}
+        assert len(statements) == 1
+        assert " IN " in statements[0]
+
+        # Hits cost nothing; only the new ID is queried
+        statements.clear()
+        assert get_usernames(db, [1, 2]) == {1: "player1", 2: "player2"}
+        assert statements == []
+        assert get_usernames(db, [2, 3]) == {2: "player2", 3: "player3"}
+        assert len(statements) == 1
+    finally:
+        db.close()
+
+def test_unknown_ids_are_left_out(users_db):
+    SessionLocal, _ = users_db
+    db = SessionLocal()
+    try:
+        assert get_usernames(db, [1, 999]) == {1: "player1"}
+        assert 999 not in username_cache
+    finally:
+        db.close()
+
+def test_signup_seeds_the_cache(users_db):
+    SessionLocal, statements = users_db
+    response = client.post("/api/auth/signup", json={"username": "newplayer", "password": "password123"})
+    assert response.status_code == 201
+    user_id = response.json()["data"]["id"]
+
+    statements.clear()
+    db = SessionLocal()
+    try:
+        assert get_usernames(db, [user_id]) == {user_id: "newplayer"}
+    finally:
+        db.close()
+    assert statements == []
+
+def test_rank_tells_unknown_users_from_unranked_players(users_db):
+    response = client.get("/api/leaderboard/rank/999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
+    response = client.get("/api/leaderboard/rank/2")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Player has not yet been ranked"
+
+    assert client.get("/api/leaderboard/rank/1").json()["username"] == "player1"